@@ -33,12 +33,19 @@
 from typing import Optional, Dict, Callable, List, Any, Union
 import os
 import sys
-from shutil import rmtree
+import subprocess
+import warnings
+from importlib.machinery import EXTENSION_SUFFIXES
+from importlib.util import spec_from_file_location, module_from_spec
+from shutil import rmtree, move
+from tempfile import mkdtemp
+from types import ModuleType
 import numpy as np
 from numpy import f2py
 
 # pyrates internal imports
-from .numpy_backend import NumpyBackend, PyRatesAssignOp, PyRatesIndexOp, PyRatesOp, CodeGen, extract_lhs_var
+from .numpy_backend import NumpyBackend, PyRatesAssignOp, PyRatesIndexOp, PyRatesOp, CodeGen, extract_lhs_var, \
+    get_build_key, cached_build, build_cache_enabled
 
 # meta infos
 __author__ = "Richard Gast"
@@ -63,6 +70,8 @@ class FortranOp(PyRatesOp):
 
 class FortranIndexOp(PyRatesIndexOp):
 
+    constants_to_num = True
+
     def __init__(self, op: str, short_name: str, name, *args, **kwargs) -> None:
         self.build_dir = kwargs.pop('build_dir', '')
         super().__init__(op, short_name, name, *args, **kwargs)
@@ -73,6 +82,8 @@ class FortranIndexOp(PyRatesIndexOp):
 
 class FortranAssignOp(PyRatesAssignOp):
 
+    constants_to_num = True
+
     def __init__(self, op: str, short_name: str, name, *args, **kwargs) -> None:
         self.build_dir = kwargs.pop('build_dir', '')
         super().__init__(op, short_name, name, *args, **kwargs)
@@ -96,6 +107,10 @@ class FortranBackend(NumpyBackend):
 
     idx_l, idx_r = "(", ")"
     idx_start = 1
+    ring_buffer = False
+    reuse_compiled = False
+    input_block_size = None
+    unsupported_optimizations = ('ring_buffer', 'reuse_compiled')
 
     def __init__(self,
                  ops: Optional[Dict[str, str]] = None,
@@ -104,7 +119,8 @@ class FortranBackend(NumpyBackend):
                  float_default_type: str = 'float32',
                  imports: Optional[List[str]] = None,
                  build_dir: Optional[str] = None,
-                 auto_compat: bool = False
+                 auto_compat: bool = False,
+                 **kwargs
                  ) -> None:
         """Instantiates numpy backend, i.e. a compute graph with numpy operations.
         """
@@ -174,18 +190,21 @@ class FortranBackend(NumpyBackend):
                  "interpolate": {'name': "pyrates_interpolate", 'call': ""},
                  "interpolate_1d": {'name': "pyrates_interpolate_1d", 'call': ""},
                  "interpolate_nd": {'name': "pyrates_interpolate_nd", 'call': ""},
+                 "segment_sum": {'name': "pyrates_segment_sum", 'call': ""},
+                 "sparse_dot": {'name': "pyrates_sparse_dot", 'call': ""},
                  }
         if ops:
             ops_f.update(ops)
         self.pyauto_compat = auto_compat
         super().__init__(ops=ops_f, dtypes=dtypes, name=name, float_default_type=float_default_type,
-                         imports=imports, build_dir=build_dir)
+                         imports=imports, build_dir=build_dir, **kwargs)
         self._imports = []
         self.npar = 0
         self.ndim = 0
         self._auto_files_generated = False
 
-    def compile(self, build_dir: Optional[str] = None, decorator: Optional[Callable] = None, **kwargs) -> tuple:
+    def compile(self, build_dir: Optional[str] = None, decorator: Optional[Callable] = None, fused: bool = False,
+                n_threads: int = 1, **kwargs) -> tuple:
         """Compile the graph layers/operations. Creates python files containing the functions in each layer.
 
         Parameters
@@ -194,6 +213,10 @@ class FortranBackend(NumpyBackend):
             Directory in which to create the file structure for the simulation.
         decorator
             Decorator function that should be applied to the right-hand side evaluation function.
+        fused
+            Not supported by the Fortran backend. The right-hand side evaluation is already compiled via f2py.
+        n_threads
+            Not supported by the Fortran backend.
         kwargs
             decorator keyword arguments
 
@@ -207,6 +230,14 @@ class FortranBackend(NumpyBackend):
         # preparations
         ##############
 
+        if fused:
+            warnings.warn('WARNING! A fused integration loop is not available for the Fortran backend. The standard '
+                          'integration loop is used instead.')
+        if n_threads > 1:
+            warnings.warn('WARNING! Multi-threaded right-hand side evaluations are not available for the Fortran '
+                          'backend. The right-hand side is evaluated by a single thread instead.')
+        self._rhs_loop = None
+
         # remove empty layers and operators
         new_layer_idx = 0
         for layer_idx, layer in enumerate(self.layers.copy()):
@@ -218,10 +249,6 @@ class FortranBackend(NumpyBackend):
             else:
                 new_layer_idx += 1
 
-        # remove previously imported rhs_funcs from system
-        if 'rhs_func' in sys.modules:
-            del sys.modules['rhs_func']
-
         # collect state variable and parameter vectors
         state_vars, params, var_map = self._process_vars()
 
@@ -231,7 +258,7 @@ class FortranBackend(NumpyBackend):
             var = self.get_var(key)
             if vtype == 'state_var' and var.short_name != 'y':
                 var.args[0] = y
-                var.build_op(var.args)
+                var.set_args(var.args)
 
         # create rhs evaluation function
         ################################
@@ -352,20 +379,19 @@ class FortranBackend(NumpyBackend):
         func_gen.add_linebreak()
         func_gen.remove_indent()
 
-        # save rhs function to file
+        # save rhs function to file, compile it (or load it from the build cache) and import it
+        source = func_gen.generate()
         fname = f'{self._build_dir}/rhs_func'
-        f2py.compile(func_gen.generate(), modulename='rhs_func', extension='.f', source_fn=f'{fname}.f', verbose=False)
+        with open(f'{fname}.f', 'w') as f:
+            f.write(source)
+        rhs_eval = compile_extension(source, key=self._get_build_key(source), modulename='rhs_func',
+                                     source_fn=f'{fname}.f', use_cache=self.build_cache).func
 
         # create additional subroutines in pyauto compatibility mode
         gen_def = kwargs.pop('generate_auto_def', True)
         if self.pyauto_compat and gen_def:
             self.generate_auto_def(self._build_dir)
 
-        # import function from file
-        fname_import = fname.replace('/', '.')
-        exec(f"from rhs_func import rhs_eval", globals())
-        rhs_eval = globals().pop('func')
-
         # apply function decorator
         if decorator:
             rhs_eval = decorator(rhs_eval, **kwargs)
@@ -595,7 +621,8 @@ class FortranBackend(NumpyBackend):
             pyauto.run(e='rhs_func', c='ivp', DS=dt, name='t', UZR={14: T}, STOP={'UZ1'}, **kwargs)
 
             extract = [f'U({i+1})' for i in range(self.ndim)]
-            out_vars = [f'U({i[0]+self.idx_start if type(i) is list else i+self.idx_start})' for i in output_indices]
+            out_vars = [f'U({i[0]+self.idx_start if type(i) in (list, tuple) else i+self.idx_start})'
+                        for i in output_indices]
             extract.append('PAR(14)')
 
             results = pyauto.extract(keys=extract, cont='t')
@@ -785,8 +812,72 @@ def generate_func(self, return_key='f', omit_assign=False, return_dim=None, retu
     func.remove_indent()
     module_counter += 1
     fn = f"pyrates_func_{module_counter}"
-    f2py.compile(func.generate(), modulename=fn, extension=".f", verbose=False,
-                 source_fn=f"{self.build_dir}/{fn}.f" if self.build_dir else f"{fn}.f")
-    exec(f"from pyrates_func_{module_counter} import {fname}", globals())
-    func_dict[self.short_name] = globals().pop(fname)
+    source = func.generate()
+    module = compile_extension(source, key=get_build_key(source, 'FortranBackend', 'float64'), modulename='pyrates_func',
+                               source_fn=f"{self.build_dir}/{fn}.f" if self.build_dir else f"{fn}.f")
+    func_dict[self.short_name] = getattr(module, fname)
     return func_dict
+
+
+def compile_extension(source: str, key: str, modulename: str, source_fn: str, use_cache: Optional[bool] = None
+                      ) -> ModuleType:
+    """Compiles fortran source code into a python extension module via f2py and imports it. If `use_cache` is true,
+    the extension module is stored in the persistent build cache under `key` and compiled only if it is not there yet.
+
+    Parameters
+    ----------
+    source
+        Fortran source code.
+    key
+        Key of the build cache entry (see `get_build_key`).
+    modulename
+        Prefix of the module name. The build cache key is appended to it, such that extensions of different source
+        codes never overwrite each other.
+    source_fn
+        File name under which the fortran source code is stored.
+    use_cache
+        If false, the extension is always compiled from scratch. Defaults to `build_cache_enabled()`.
+
+    Returns
+    -------
+    ModuleType
+        Imported extension module.
+
+    """
+
+    modulename = f"{modulename}_{key[:16]}"
+    fn = f"{modulename}{EXTENSION_SUFFIXES[0]}"
+    if use_cache is None:
+        use_cache = build_cache_enabled()
+
+    with open(source_fn, 'w') as f:
+        f.write(source)
+    source_fn = os.path.abspath(source_fn)
+
+    def build(directory):
+        # compile in a private temporary directory, such that processes that compile at the same time never pick up
+        # each other's extension modules
+        tmp_dir = mkdtemp(dir=directory)
+        try:
+            proc = subprocess.run([sys.executable, '-m', 'numpy.f2py', '-c', source_fn, '-m', modulename],
+                                  cwd=tmp_dir, capture_output=True, text=True)
+            ext = [f for f in os.listdir(tmp_dir)
+                   if f.startswith(f"{modulename}.") and any(f.endswith(suffix) for suffix in EXTENSION_SUFFIXES)]
+            if proc.returncode or not ext:
+                raise RuntimeError(f'Compilation of the fortran extension module {modulename} via f2py failed:\n'
+                                   f'{proc.stdout}\n{proc.stderr}')
+            move(os.path.join(tmp_dir, ext[0]), os.path.join(directory, fn))
+        finally:
+            rmtree(tmp_dir, ignore_errors=True)
+
+    if use_cache:
+        path, _ = cached_build(key, fn, build=build)
+    else:
+        directory = os.path.dirname(source_fn)
+        build(directory)
+        path = os.path.join(directory, fn)
+
+    spec = spec_from_file_location(modulename, path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
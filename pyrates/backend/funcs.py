@@ -55,6 +55,14 @@ def pr_identity(x):
     return x
 
 
+def pr_segment_sum(x, segment_ids, n_segments):
+    return np.bincount(segment_ids, weights=x, minlength=n_segments).astype(x.dtype)
+
+
+def pr_sparse_dot(A, x):
+    return A.dot(x)
+
+
 def pr_interp_1d_linear(x, y, x_new):
     return np.interp(x_new, x, y)
 
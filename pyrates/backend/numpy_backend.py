@@ -43,19 +43,31 @@ Currently supported backends:
 """
 
 # external imports
+import sys
 import time
 from typing import Optional, Dict, List, Union, Any, Callable
 import numpy as np
 from copy import deepcopy
 import os
-import sys
+import pickle
+from hashlib import sha256
 from shutil import rmtree
+from tempfile import mkdtemp
+from types import ModuleType
 import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from scipy.interpolate.interpolate import interp1d
+from scipy.sparse import issparse, spmatrix
 
 # pyrates internal imports
 from .funcs import *
 from .parser import replace
+from .optimization import optimize_equations, allocate_buffers, find_live_equations, find_constants, pack_arrays, \
+    parallelize_equations, stabilize_types
+
+# solvers that evaluate the right-hand side at intermediate time points and thus require continuous inputs and delays
+continuous_solvers = ('scipy', 'heun', 'rk2', 'rk4', 'rk45')
 
 
 class NumpyVar(np.ndarray):
@@ -126,7 +138,7 @@ class NumpyVar(np.ndarray):
             shape = list(shape)
             shape.pop(idx)
             shape = tuple(shape)
-        if callable(value):
+        if callable(value) or issparse(value):
             obj = value
         else:
             value = cls._get_value(value, dtype, shape)
@@ -202,7 +214,7 @@ class NumpyVar(np.ndarray):
 
     @staticmethod
     def __subclasscheck__(subclass):
-        if np.ndarray.__subclasscheck__(subclass):
+        if np.ndarray.__subclasscheck__(subclass) or spmatrix.__subclasscheck__(subclass):
             return True
         else:
             return interp1d.__subclasscheck__(subclass)
@@ -227,6 +239,16 @@ class PyRatesOp:
 
     var_class = NumpyVar
 
+    # if true, scalar constants are inserted into the generated code as numbers. Otherwise, they are passed as
+    # arguments, such that they can be changed after compilation (see `CircuitIR.set_params`).
+    constants_to_num = False
+
+    # call signatures of element-wise operations. Their output shape is the broadcast shape of their operands.
+    elementwise_ops = ('np.add', 'np.subtract', 'np.multiply', 'np.divide', 'np.mod', 'np.power', 'np.float_power',
+                       'np.greater', 'np.less', 'np.equal', 'np.not_equal', 'np.greater_equal', 'np.less_equal',
+                       'np.invert', 'np.sin', 'np.cos', 'np.tan', 'np.arctan', 'np.abs', 'np.sqrt', 'np.square',
+                       'np.exp', 'np.maximum', 'np.minimum', 'np.round', 'np.tanh', 'pr_sigmoid', 'pr_identity')
+
     def __init__(self, op: str, short_name: str, name, *args, **kwargs) -> None:
         """Instantiates PyRates operator.
         """
@@ -241,16 +263,25 @@ class PyRatesOp:
 
         # extract information from parsing results
         self.value = self._op_dict['value']
-        self.arg_names, args = self._get_unique_args(self._op_dict['arg_names'], self._op_dict['args'])
+        self.arg_names, func_args = self._get_unique_args(self._op_dict['arg_names'], self._op_dict['args'])
         self.input_ops = self._op_dict['input_ops']
         self.is_constant = self._op_dict['is_constant']
 
         # build final op
         self.shape = ()
         self.dtype = 'float'
-        self._callable = lambda x: x
+        self._func = None
         self.args = ()
-        self.build_op(args)
+        self.build_op(func_args, operands=args)
+
+    @property
+    def _callable(self) -> Callable:
+        """Function of the operator. It is generated on first access only, since most operators are never evaluated on
+        their own, but only as part of the right-hand side evaluation generated by `NumpyBackend.compile`.
+        """
+        if self._func is None:
+            self._func = self._generate_func().pop(self.short_name)
+        return self._func
 
     def numpy(self):
         """Evaluates the return values of the PyRates operation.
@@ -275,16 +306,22 @@ class PyRatesOp:
         exec(func.generate(), globals(), func_dict)
         return func_dict
 
-    def build_op(self, args):
-        """Builds the function of the operator, tests its functionality and stores shape and data-type of the result
-        on the instance.
+    def build_op(self, args, operands: Optional[tuple] = None):
+        """Sets the arguments of the operator and stores shape and data-type of the result on the instance. If the
+        operands of the operator are passed, shape and data-type are inferred from them where possible (see
+        `PyRatesOp.infer_shape`). Otherwise, the function is generated and evaluated once to test its functionality.
         """
 
-        func_dict = self._generate_func()
-        self._callable = func_dict.pop(self.short_name)
+        self.set_args(args)
+
+        # infer output shape and data-type from the operands
+        out = self.infer_shape(operands) if operands is not None else None
+        if out is not None:
+            self.shape, self.dtype = out
+            return
 
         # test function
-        self.args = self._deepcopy(args)
+        self.args = self._get_test_args(args)
         result = self.numpy() if 'no_op' not in self.short_name else self.args[0]
         self.args = args
 
@@ -292,6 +329,117 @@ class PyRatesOp:
         self.shape = result.shape if hasattr(result, 'shape') else ()
         self.dtype = result.dtype if hasattr(result, 'dtype') else type(result)
 
+    def set_args(self, args) -> None:
+        """Replaces the arguments of the operator without changing its output shape and data-type (e.g. to pass the
+        full state vector to a state variable getter). The function of the operator will be re-generated on its next
+        evaluation.
+        """
+        self.args = args
+        self._func = None
+
+    def infer_shape(self, operands: tuple) -> Union[tuple, None]:
+        """Infers the output shape and data-type of the operator from the shapes and data-types of its operands,
+        without evaluating the operator on the (potentially large) operand values.
+
+        Parameters
+        ----------
+        operands
+            Operands the operator was created with (variables, other operators or scalars).
+
+        Returns
+        -------
+        Union[tuple, None]
+            Output shape and data-type, or None if they cannot be inferred for this operator.
+
+        """
+
+        if self.op not in self.elementwise_ops and self.op not in ('np.dot', 'pr_sparse_dot', 'pr_segment_sum'):
+            return None
+        info = [self._get_operand_info(arg) for arg in operands]
+        if not info or any([i is None for i in info]):
+            return None
+        shapes, probes = [i[0] for i in info], [i[1] for i in info]
+
+        if self.op in self.elementwise_ops:
+
+            # element-wise operations: broadcast shape and data-type of an evaluation on single-element probes
+            if any([p is None for p in probes]):
+                return None
+            shape = self._broadcast_shapes(shapes)
+            with np.errstate(all='ignore'):
+                result = self._get_func(self.op)(*probes)
+            return shape, result.dtype if hasattr(result, 'dtype') else type(result)
+
+        elif self.op == 'np.dot' and len(operands) == 2 and None not in probes:
+
+            # dot products of vectors and matrices
+            (s1, s2), dtype = shapes, np.result_type(*probes)
+            if not s1 or not s2:
+                return self._broadcast_shapes(shapes), dtype
+            if len(s1) > 2 or len(s2) > 2:
+                return None
+            if s1[-1] != s2[0]:
+                raise ValueError(f'Shapes {s1} and {s2} are not aligned for operation {self.name}.')
+            return s1[:-1] + s2[1:], dtype
+
+        elif self.op == 'pr_sparse_dot' and len(operands) == 2 and probes[1] is not None:
+
+            # products of sparse matrices with dense vectors or matrices
+            (s1, s2), dtype = shapes, np.result_type(operands[0].dtype, probes[1])
+            if len(s1) != 2 or not s2 or s1[1] != s2[0]:
+                raise ValueError(f'Shapes {s1} and {s2} are not aligned for operation {self.name}.')
+            return s1[:1] + s2[1:], dtype
+
+        elif self.op == 'pr_segment_sum' and len(operands) == 3 and len(shapes[0]) == 1 and not shapes[2]:
+
+            # sums over the segments of a vector
+            n_segments = operands[2].numpy() if hasattr(operands[2], 'numpy') else operands[2]
+            return (int(n_segments),), operands[0].dtype
+
+        return None
+
+    def _get_test_args(self, args):
+        """Returns the arguments the operator is test-evaluated with. Since the operator does not change its arguments,
+        they need not be copied.
+        """
+        return args
+
+    @classmethod
+    def _get_operand_info(cls, arg: Any) -> Union[tuple, None]:
+        """Returns the shape of an operand and a single-element array (or scalar) with the data-type and the number of
+        dimensions of the operand. The latter is None for sparse operands and None is returned for operands of unknown
+        shape.
+        """
+        if PyRatesOp.__subclasscheck__(type(arg)) or cls.var_class.__subclasscheck__(type(arg)):
+            if callable(arg) or not hasattr(arg, 'shape'):
+                return None
+            shape = tuple(arg.shape)
+            if issparse(arg):
+                return shape, None
+            try:
+                return shape, np.ones((1,) * len(shape), dtype=arg.dtype)
+            except TypeError:
+                return None
+        elif isinstance(arg, (bool, int, float, np.number, np.bool_)):
+            return (), arg
+        return None
+
+    @staticmethod
+    def _broadcast_shapes(shapes: list) -> tuple:
+        """Returns the shape that results from broadcasting arrays of the passed shapes against each other. Raises a
+        ValueError if the shapes cannot be broadcast.
+        """
+        if len(shapes) == 1:
+            return shapes[0]
+        return np.broadcast(*[np.broadcast_to(np.empty(()), s) for s in shapes]).shape
+
+    @staticmethod
+    def _get_func(call: str) -> Callable:
+        """Returns the function behind the call signature of an operator.
+        """
+        module, _, fname = call.rpartition('.')
+        return getattr(np, fname) if module == 'np' else globals()[fname]
+
     @classmethod
     def generate_op_str(cls, op, args, **kwargs):
         """Generates the function string, call signature etc.
@@ -368,11 +516,14 @@ class PyRatesOp:
         return results
 
     @classmethod
-    def _process_args(cls, args, results, constants_to_num=True):
+    def _process_args(cls, args, results, constants_to_num=None):
         """Parses arguments to function into argument names that are added to the function call and argument values
         that can used to set up the return line of the function.
         """
 
+        if constants_to_num is None:
+            constants_to_num = cls.constants_to_num
+
         results_args = []
         results_arg_names = []
         n_vars = 0
@@ -521,8 +672,16 @@ class PyRatesAssignOp(PyRatesOp):
 
     def __init__(self, op: str, short_name: str, name, *args, **kwargs) -> None:
         super().__init__(op, short_name, name, *args, **kwargs)
-        self.lhs = self._op_dict.pop('lhs')
-        self.rhs = self._op_dict.pop('rhs')
+        self.lhs = self._op_dict['lhs']
+        self.rhs = self._op_dict['rhs']
+
+    def infer_shape(self, operands: tuple) -> Union[tuple, None]:
+        return None
+
+    def _get_test_args(self, args):
+        """Assign operations change their first argument, thus they are test-evaluated on a copy of their arguments.
+        """
+        return self._deepcopy(args)
 
     def _generate_func(self):
         func_dict = {}
@@ -793,6 +952,90 @@ class PyRatesIndexOp(PyRatesOp):
         return results
 
 
+class InputStream:
+    """Input of a network that is provided block-wise, such that the input values of all time steps do not have to be
+    kept in memory at once. The input values are read from an array (e.g. a broadcasted view of a single input column
+    that drives many nodes), from a callable or from an iterator.
+
+    Parameters
+    ----------
+    source
+        Source of the input values with the time steps as first dimension. Can be an array, another `InputStream`, a
+        callable `source(start, stop)` that returns the input values of the time steps `start` to `stop` (exclusive)
+        or an iterator that yields consecutive blocks of input values with an arbitrary number of time steps each.
+    steps
+        Number of time steps of the input.
+    transform
+        Function that is applied to each block of input values read from `source`. It may change the shape of the input
+        values except for the number of time steps.
+    """
+
+    def __init__(self, source: Any, steps: int, transform: Optional[Callable] = None) -> None:
+
+        if not (isinstance(source, (np.ndarray, InputStream)) or callable(source) or hasattr(source, '__next__')):
+            raise ValueError(f'Invalid input source of type {type(source)}. Inputs can be provided as arrays, '
+                             f'callables or iterators.')
+        self.source = source
+        self.steps = steps
+        self.transform = transform
+        self._cache = None
+        self._pending = None
+        self._pending_start = 0
+
+        # determine the shape and data type of the input values from the first time step
+        first = self.read(0, 1)
+        self.shape = (steps,) + first.shape[1:]
+        self.dtype = first.dtype
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Returns the input values of the time steps `start` to `stop` (exclusive). Iterators can only be read
+        forwards, i.e. `start` must not lie before the `start` of the previous call.
+        """
+
+        if self._cache is not None and self._cache[0] == start and self._cache[1] >= stop:
+            return self._cache[2][:stop-start]
+
+        if isinstance(self.source, np.ndarray):
+            block = self.source[start:stop]
+        elif isinstance(self.source, InputStream):
+            block = self.source.read(start, stop)
+        elif callable(self.source):
+            block = np.asarray(self.source(start, stop))
+        else:
+            block = self._read_iterator(start, stop)
+        if self.transform is not None:
+            block = self.transform(block)
+        if len(block.shape) < 1 or block.shape[0] != stop - start:
+            raise ValueError(f'The input source provided {block.shape[0] if len(block.shape) else 0} time steps '
+                             f'instead of the requested {stop - start} time steps ({start} to {stop}).')
+
+        self._cache = (start, stop, block)
+        return block
+
+    def _read_iterator(self, start: int, stop: int) -> np.ndarray:
+        """Collects the blocks yielded by the iterator until the time steps `start` to `stop` are available. Time steps
+        before `start` are discarded.
+        """
+
+        if start < self._pending_start:
+            raise ValueError(f'Inputs that are provided by an iterator can only be read forwards. Time step {start} '
+                             f'has already been discarded.')
+        blocks = [self._pending] if self._pending is not None else []
+        n = self._pending.shape[0] if self._pending is not None else 0
+        while self._pending_start + n < stop:
+            try:
+                block = np.asarray(next(self.source))
+            except StopIteration:
+                raise ValueError(f'The input iterator stopped after {self._pending_start + n} time steps, but '
+                                 f'{stop} time steps were requested.')
+            blocks.append(block.reshape((1,) + block.shape) if len(block.shape) == 0 else block)
+            n += blocks[-1].shape[0]
+        pending = np.concatenate(blocks, axis=0) if len(blocks) > 1 else blocks[0]
+        self._pending = pending[start-self._pending_start:]
+        self._pending_start = start
+        return self._pending[:stop-start]
+
+
 class NumpyBackend(object):
     """Wrapper to numpy. This class provides an interface to all numpy functionalities that may be accessed via pyrates.
     All numpy variables and operations will be stored in a layered compute graph that can be executed to evaluate the
@@ -817,12 +1060,82 @@ class NumpyBackend(object):
         provided via `ops`. Will be added to the top of each generated code file.
     build_dir
         Directory in which pyrates builds will be stored.
+    build_cache
+        If true, generated code is stored in and loaded from the persistent build cache (see `get_cache_dir`). Defaults
+        to the class attribute `build_cache`.
+    optimize_rhs, inplace_ops, remove_dead_ops, pack_constants, ring_buffer, reuse_compiled
+        Toggles for the optimizations of the generated right-hand side evaluation. If not passed, the class attribute of
+        the same name is used (see there for a description of each optimization).
 
     """
 
     idx_l, idx_r = "[", "]"
     idx_start = 0
 
+    # realize discretized edge delays via ring buffers with a moving write head instead of rolling the buffers
+    ring_buffer = True
+
+    # re-use the compiled right-hand side evaluation across runs with the same input structure
+    reuse_compiled = True
+
+    # load generated code from the persistent build cache (see `get_cache_dir`), if an identical model was built before.
+    # If None, the cache is used if the environment variable `PYRATES_BUILD_CACHE` is set (see `build_cache_enabled`).
+    build_cache = None
+
+    # remove operations that do not affect the state variables (i.e. the sampled outputs) from the right-hand side
+    # evaluation (variables that are computed by these operations are not updated anymore, hence disabled by default)
+    remove_dead_ops = False
+
+    # eliminate common sub-expressions and hoist expressions over constants out of the right-hand side evaluation
+    # (rewrites the parsed equations, hence disabled by default)
+    optimize_rhs = False
+
+    # let numpy ufuncs of the right-hand side evaluation write their results into pre-allocated buffers (rewrites the
+    # parsed equations, hence disabled by default)
+    inplace_ops = False
+
+    # pack the constants of the right-hand side evaluation into contiguous memory blocks (one per data type). The
+    # arguments of the right-hand side evaluation become views on these blocks, hence disabled by default.
+    pack_constants = False
+
+    # optimizations that cannot be enabled for this backend (see `NumpyBackend.__init__`)
+    unsupported_optimizations = ()
+
+    # minimum size of the first dimension of element-wise operations that are split into chunks, if the right-hand side
+    # is evaluated by multiple threads
+    parallel_min_size = 10000
+
+    # number of gaussian random numbers that the euler-maruyama solver generates at once
+    noise_block_size = 2**15
+
+    # number of time steps of streamed inputs (see `InputStream`) that are read at once by the discrete solvers
+    input_block_size = 2**12
+
+    # butcher tableaus (a, b, c) of the fixed step-size runge-kutta solvers
+    _rk_tableaus = {'heun': (np.asarray([[0., 0.],
+                                         [1., 0.]]),
+                             np.asarray([0.5, 0.5]),
+                             np.asarray([0., 1.])),
+                    'rk4': (np.asarray([[0., 0., 0., 0.],
+                                        [0.5, 0., 0., 0.],
+                                        [0., 0.5, 0., 0.],
+                                        [0., 0., 1., 0.]]),
+                            np.asarray([1/6, 1/3, 1/3, 1/6]),
+                            np.asarray([0., 0.5, 0.5, 1.]))}
+    _rk_tableaus['rk2'] = _rk_tableaus['heun']
+
+    # butcher tableau (a, b, c) and error weights (e) of the dormand-prince solver
+    _rk45_tableau = (np.asarray([[0., 0., 0., 0., 0., 0., 0.],
+                                 [1/5, 0., 0., 0., 0., 0., 0.],
+                                 [3/40, 9/40, 0., 0., 0., 0., 0.],
+                                 [44/45, -56/15, 32/9, 0., 0., 0., 0.],
+                                 [19372/6561, -25360/2187, 64448/6561, -212/729, 0., 0., 0.],
+                                 [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0., 0.],
+                                 [35/384, 0., 500/1113, 125/192, -2187/6784, 11/84, 0.]]),
+                     np.asarray([35/384, 0., 500/1113, 125/192, -2187/6784, 11/84, 0.]),
+                     np.asarray([0., 1/5, 3/10, 4/5, 8/9, 1., 1.]),
+                     np.asarray([71/57600, 0., -71/16695, 71/1920, -17253/339200, 22/525, -1/40]))
+
     def __init__(self,
                  ops: Optional[Dict[str, str]] = None,
                  dtypes: Optional[Dict[str, object]] = None,
@@ -830,6 +1143,13 @@ class NumpyBackend(object):
                  float_default_type: str = 'float32',
                  imports: Optional[List[str]] = None,
                  build_dir: str = None,
+                 build_cache: Optional[bool] = None,
+                 optimize_rhs: Optional[bool] = None,
+                 inplace_ops: Optional[bool] = None,
+                 remove_dead_ops: Optional[bool] = None,
+                 pack_constants: Optional[bool] = None,
+                 ring_buffer: Optional[bool] = None,
+                 reuse_compiled: Optional[bool] = None,
                  ) -> None:
         """Instantiates numpy backend, i.e. a compute graph with numpy operations.
         """
@@ -886,7 +1206,7 @@ class NumpyBackend(object):
                     'expand': {'name': 'numpy_expand', 'call': "np.expand_dims"},
                     "roll": {'name': "numpy_roll", 'call': "np.roll"},
                     "cast": {'name': "numpy_cast", 'call': "np.asarray"},
-                    "randn": {'name': "numpy_randn", 'call': "np.randn"},
+                    "randn": {'name': "numpy_randn", 'call': "np.random.randn"},
                     "ones": {'name': "numpy_ones", 'call': "np.ones"},
                     "zeros": {'name': "numpy_zeros", 'call': "np.zeros"},
                     "range": {'name': "numpy_arange", 'call': "np.arange"},
@@ -901,6 +1221,8 @@ class NumpyBackend(object):
                     "interpolate": {'name': "pyrates_interpolate", 'call': "pr_interp"},
                     "interpolate_1d": {'name': "pyrates_interpolate_1d", 'call': "pr_interp_1d"},
                     "interpolate_nd": {'name': "pyrates_interpolate_nd", 'call': "pr_interp_nd"},
+                    "segment_sum": {'name': "pyrates_segment_sum", 'call': "pr_segment_sum"},
+                    "sparse_dot": {'name': "pyrates_sparse_dot", 'call': "pr_sparse_dot"},
                     }
         if ops:
             self.ops.update(ops)
@@ -941,26 +1263,46 @@ class NumpyBackend(object):
                 if imp not in self._imports:
                     self._imports.append(imp)
         self._input_names = []
-
-        # create build dir
-        orig_dir = os.getcwd()
-        if build_dir:
-            os.makedirs(build_dir, exist_ok=True)
-        dir_name = f"{build_dir}/pyrates_build" if build_dir else "pyrates_build"
-        try:
-            os.mkdir(dir_name)
-        except FileExistsError:
-            pass
-        except FileNotFoundError as e:
-            # for debugging
-            raise e
-        self._build_dir = f"{dir_name}/{self.name}"
-        try:
-            os.mkdir(self._build_dir)
-        except FileExistsError:
-            rmtree(self._build_dir)
-            os.mkdir(self._build_dir)
-        sys.path.append(self._build_dir)
+        self._input_vars = []
+        self._constant_ops = []
+        self._rhs_loop = None
+        self._invariants = None
+        self._rhs_stats = {}
+        self._arenas = []
+        self._packed = {}
+        self._packed_vars = {}
+        self._pool = None
+        self._pool_finalizer = None
+        self._compiled = None
+        self._out_file = None
+        self._checkpoint = None
+        self._resume_from = None
+        self._updated_args = []
+        self._updated_vars = []
+        self._rhs_source = None
+        self._loaded = False
+        self._input_streams = []
+        self._input_block = 0
+        self._input_counter = None
+
+        if build_cache is not None:
+            self.build_cache = build_cache
+        elif self.build_cache is None:
+            self.build_cache = build_cache_enabled()
+
+        # instance-level overrides of the right-hand side optimizations
+        for key, val in (('optimize_rhs', optimize_rhs), ('inplace_ops', inplace_ops),
+                         ('remove_dead_ops', remove_dead_ops), ('pack_constants', pack_constants),
+                         ('ring_buffer', ring_buffer), ('reuse_compiled', reuse_compiled)):
+            if val and key in self.unsupported_optimizations:
+                raise ValueError(f'The optimization `{key}` is not supported by {self.__class__.__name__}.')
+            if val is not None:
+                setattr(self, key, val)
+
+        # each backend instance creates a unique build dir on its first compilation (see `NumpyBackend._build_dir`)
+        self._build_root = f"{build_dir}/pyrates_build" if build_dir else "pyrates_build"
+        self._build_path = None
+        self._build_finalizer = None
 
     def run(self,
             T: float,
@@ -996,6 +1338,22 @@ class NumpyBackend(object):
             If true, the total graph execution time will be printed and returned.
         verbose
             If true, updates about the simulation process will be displayed in the terminal.
+        kwargs
+            Additional keyword arguments. `fused=True` generates the complete euler integration loop together with the
+            right-hand side evaluation and JIT-compiles it via numba, if available (see `NumpyBackend.compile`).
+            `exchange` can be a callable that receives the state vector at the beginning of each step of the `euler`
+            solver and may change it in place (used to exchange state variables between the processes of a partitioned
+            network, see `CircuitIR.compile`). If `out_file` is passed, the outputs are written into a memory-mapped
+            `.npy` file with one column per output variable and node during the integration instead of being
+            collected in memory (see `NumpyBackend._allocate_results`). If `checkpoint_file` is passed, the `euler`
+            solver writes the simulation state into this file every `checkpoint_interval` units of simulation time (or
+            once at the end of the simulation), and `resume_from` continues a simulation from such a checkpoint (see
+            `NumpyBackend.to_file`). The `euler_maruyama` solver adds gaussian noise to the state variables passed via
+            `noise` (a list of tuples of state vector indices and noise intensities) and draws it from a random number
+            generator that is seeded with `seed`. All other keyword arguments are passed on to the solver.
+            Inputs can be `InputStream` instances or broadcasted arrays (e.g. a single input column that drives many
+            nodes). They are read in blocks of `NumpyBackend.input_block_size` time steps by the discrete solvers,
+            instead of being copied for the complete simulation time (see `NumpyBackend._open_input_streams`).
 
         Returns
         -------
@@ -1024,30 +1382,34 @@ class NumpyBackend(object):
         if profile:
             t0 = time.time()
 
-        # add inputs to graph
-        continuous = 'scipy' in solver
-        t = self.add_input_layer(inputs=inputs, T=T, continuous=continuous)
-
-        if verbose:
-            print("    ...user-defined inputs have been added to the model.")
-
-        # graph execution
-        #################
-
-        # map layers that need to be executed to compiled network structure
+        continuous = solver in continuous_solvers
         decorator = kwargs.pop('decorator', None)
         decorator_kwargs = kwargs.pop('decorator_kwargs', {})
-        rhs_func, args, state_vars, var_map = self.compile(self._build_dir, decorator=decorator, **decorator_kwargs)
+        fused = kwargs.pop('fused', False)
+        n_threads = kwargs.pop('n_threads', 1)
+        self._out_file = kwargs.pop('out_file', None)
+        checkpoint_file = kwargs.pop('checkpoint_file', None)
+        checkpoint_interval = kwargs.pop('checkpoint_interval', None) or T
+        self._checkpoint = (checkpoint_file, max(1, int(np.round(checkpoint_interval / dt, decimals=0)))) \
+            if checkpoint_file else None
+        self._resume_from = kwargs.pop('resume_from', None)
+        inputs, input_streams = self._open_input_streams(inputs, T, dt, dts, continuous)
+        signature = (continuous, fused, n_threads, decorator, decorator_kwargs, self._get_input_signature(inputs))
+
+        rhs_func, args, state_vars, var_map, t = self._get_run_func(signature, inputs=inputs, T=T, verbose=verbose)
+        self._input_streams = [(var_map[self._input_vars[k]][1], stream) for k, stream in input_streams]
+        self._input_counter = var_map['network_inputs/in_var_idx'][1] if input_streams else None
 
-        if verbose:
-            print("    ...the run function has been compiled.")
+        # graph execution
+        #################
 
         # create output indices
         output_indices = []
         if outputs:
             for out_key, out_vars in outputs.items():
                 for n, (idx, _) in enumerate(out_vars):
-                    output_indices.append([i-self.idx_start for i in idx] if type(idx) is list else idx-self.idx_start)
+                    output_indices.append(self._collapse_index([i-self.idx_start for i in idx]) if type(idx) is list
+                                          else idx-self.idx_start)
                     outputs[out_key][n][0] = len(output_indices)-1
         else:
             for i in range(len(self.state_vars)):
@@ -1067,6 +1429,13 @@ class NumpyBackend(object):
         times, results = self._solve(rhs_func=rhs_func, func_args=func_args, T=T, dt=dt, dts=dts, t=t, solver=solver,
                                      output_indices=output_indices, **kwargs)
 
+        # variables that the right-hand side evaluation re-assigns (e.g. write heads of delay buffers) are written back,
+        # such that the next run continues from their final values
+        for idx in self._updated_args:
+            arg, val = args[idx], func_args[idx]
+            if isinstance(arg, np.ndarray) and val is not arg and np.shape(val) == arg.shape:
+                arg[...] = val
+
         if verbose:
             print("Simulation finished!\n")
 
@@ -1087,6 +1456,67 @@ class NumpyBackend(object):
 
         return outputs, times
 
+    def _get_run_func(self, signature: tuple, inputs: list, T: float, verbose: bool = True) -> tuple:
+        """Returns the compiled right-hand side evaluation for a run signature (solver type, options of `compile` and
+        the structure of the inputs), its arguments, the state variables, the variable map and the time variable. The
+        compiled function of the previous run is re-used, if its signature matches. Otherwise, the inputs are added to
+        the graph and the graph is compiled.
+        """
+
+        continuous, fused, n_threads, decorator, decorator_kwargs, _ = signature
+
+        if self._compiled and self._compiled[0] == signature:
+
+            # re-use the compiled run function of the previous run and bind the new inputs to its arguments
+            rhs_func, args, state_vars, var_map = self._compiled[1]
+            t = self.get_var('t')
+            self._bind_inputs(inputs=inputs, T=T, continuous=continuous, args=args, var_map=var_map)
+
+            if verbose:
+                print("    ...user-defined inputs have been bound to the compiled run function.")
+
+        elif self._loaded:
+
+            raise ValueError('This network has been loaded via `load_compiled` and can only be simulated with the '
+                             'solver type, options and input structure it has been compiled for.')
+
+        else:
+
+            # add inputs to graph
+            if self._compiled:
+                self.remove_input_layer()
+            t = self.add_input_layer(inputs=inputs, T=T, continuous=continuous)
+
+            if verbose:
+                print("    ...user-defined inputs have been added to the model.")
+
+            # map layers that need to be executed to compiled network structure
+            rhs_func, args, state_vars, var_map = self.compile(self._build_dir, decorator=decorator, fused=fused,
+                                                               n_threads=n_threads, **decorator_kwargs)
+            if self.reuse_compiled:
+                self._compiled = (signature, (rhs_func, args, state_vars, var_map))
+
+            if verbose:
+                print("    ...the run function has been compiled.")
+                if self._rhs_stats.get('dead'):
+                    print(f"    ...{self._rhs_stats['dead']} operations that do not affect the state variables have "
+                          f"been removed from the right-hand side evaluation.")
+                if self._rhs_stats.get('ops'):
+                    n_removed = self._rhs_stats['invariant'] + self._rhs_stats['cse']
+                    print(f"    ...{n_removed} of {self._rhs_stats['ops']} operations have been removed from the "
+                          f"right-hand side evaluation ({self._rhs_stats['invariant']} via hoisting, "
+                          f"{self._rhs_stats['cse']} via common sub-expression elimination).")
+                if self._rhs_stats.get('inplace'):
+                    print(f"    ...{self._rhs_stats['inplace']} operations write into pre-allocated buffers.")
+                if self._rhs_stats.get('packed'):
+                    print(f"    ...{self._rhs_stats['packed']} constants have been packed into {len(self._arenas)} "
+                          f"contiguous memory block(s).")
+                if self._rhs_stats.get('parallel'):
+                    print(f"    ...{self._rhs_stats['parallel']} operations are evaluated in chunks by {n_threads} "
+                          f"threads.")
+
+        return rhs_func, args, state_vars, var_map, t
+
     def add_var(self,
                 vtype: str,
                 name: Optional[str] = None,
@@ -1152,6 +1582,41 @@ class NumpyBackend(object):
         self.vars[name] = var
         return var
 
+    def set_var(self, var: NumpyVar, value: Any, idx: Optional[Any] = None) -> None:
+        """Changes the value of a variable in place, such that compiled functions that received the variable as an
+        argument operate on the new value.
+
+        Parameters
+        ----------
+        var
+            Variable in the graph.
+        value
+            New value of the variable (or of the indexed variable entries).
+        idx
+            Index of the variable entries that should be changed. If not passed, all entries will be changed.
+
+        Returns
+        -------
+        None
+
+        """
+        if idx is None:
+            var[...] = value
+        else:
+            var[idx] = value
+        if id(var) in self._packed_vars:
+            self._packed_vars[id(var)][...] = var
+
+    def update_constants(self) -> None:
+        """Re-evaluates all operations that depend on constants only and have thus been replaced by constant
+        variables while the graph was built. Needs to be called after constants of the graph have been changed via
+        `NumpyBackend.set_var`.
+        """
+        for var, op in self._constant_ops:
+            self.set_var(var, op.numpy())
+        if self._invariants:
+            self._update_invariants()
+
     def remove_var(self, name: str) -> Union[NumpyVar, None]:
         """Removes variable from backend and returns it.
 
@@ -1293,7 +1758,9 @@ class NumpyBackend(object):
             new_var = op.numpy()
             if hasattr(new_var, 'shape'):
                 name = f'{name}_evaluated'
-                return self.add_var(vtype='constant', name=name, value=new_var)
+                new_var = self.add_var(vtype='constant', name=name, value=new_var)
+                self._constant_ops.append((new_var, op))
+                return new_var
             else:
                 return new_var
 
@@ -1396,18 +1863,17 @@ class NumpyBackend(object):
             self.bottom_layer()
         else:
             self.add_layer(to_beginning=True)
+            self._input_layer_added = True
 
         # create time-vector
         t = self.add_var('state_var', name='t', value=0.0, dtype=self._float_def, shape=())
-        self.lhs_vars.append(t.short_name)
+        if t.short_name not in self.lhs_vars:
+            self.lhs_vars.append(t.short_name)
 
         if inputs:
 
             if continuous:
 
-                from scipy.interpolate import interp1d
-                time = np.linspace(0, T, inputs[0][0].shape[0])
-
                 for (inp, target_var, idx) in inputs:
 
                     # create unique name of input variable
@@ -1420,11 +1886,9 @@ class NumpyBackend(object):
                     self._input_names.append(in_name)
 
                     # create interpolation operator
-                    if len(inp.shape) > 1:
-                        inp = inp.squeeze()
-                    f = interp1d(time, inp, axis=0, copy=False, kind='linear')
-                    f.shape = inp.shape[1:]
+                    f = self._interpolate_input(inp, T, float(t.numpy()))
                     f = self.add_var(vtype='state_var', name=f"network_inputs/{in_name}", value=f)
+                    self._input_vars.append(f.name)
                     in_var_interp = self.add_op('interpolate', f, t, scope="network_inputs")
 
                     # apply input to target variable
@@ -1445,7 +1909,7 @@ class NumpyBackend(object):
                     in_name_tmp = f"{target_var.short_name}_inp"
                     counter = 0
                     in_name = in_name_tmp
-                    while in_name_tmp in self._input_names:
+                    while in_name in self._input_names:
                         in_name = f"{in_name_tmp}_{counter}"
                         counter += 1
                     self._input_names.append(in_name)
@@ -1453,6 +1917,7 @@ class NumpyBackend(object):
                     # create time indexing operator
                     in_var = self.add_var(vtype='state_var', name=f"network_inputs/{in_name}", scope="network_inputs",
                                           value=inp)
+                    self._input_vars.append(in_var.name)
                     in_var_indexed = self.add_op('index', in_var, time_step_idx, scope="network_inputs")
 
                     # apply input to target variable
@@ -1468,6 +1933,19 @@ class NumpyBackend(object):
 
         return t
 
+    def remove_input_layer(self) -> None:
+        """Removes all operations and variables from the graph that have been added via `add_input_layer`.
+        """
+
+        for layer in self.layers:
+            for op in layer.copy():
+                if op is not None and op.name.startswith('network_inputs/'):
+                    layer.remove(op)
+        for key in [key for key in self.vars if key.startswith('network_inputs/')]:
+            self.vars.pop(key)
+        self._input_names.clear()
+        self._input_vars.clear()
+
     def next_layer(self) -> None:
         """Jump to next layer in stack. If we are already at end of layer stack, add new layer to the stack and jump to
         that.
@@ -1540,9 +2018,49 @@ class NumpyBackend(object):
         self.op_counter = 0
         self.var_counter = 0
         self.layer = 0
-        rmtree(self._build_dir)
-        if 'rhs_func' in sys.modules:
-            del sys.modules['rhs_func']
+        self._compiled = None
+        self._invariants = None
+        self._arenas = []
+        self._packed.clear()
+        self._packed_vars.clear()
+        self._stop_pool()
+        self._constant_ops.clear()
+        self._remove_build_dir()
+
+    @property
+    def _build_dir(self) -> str:
+        """Unique build directory of this backend instance, such that multiple backend instances can compile
+        concurrently. It is created on first access and removed by `clear` or once the backend is garbage collected.
+        """
+        if self._build_path is None:
+            os.makedirs(self._build_root, exist_ok=True)
+            self._build_path = mkdtemp(prefix=f"{self.name}_", dir=self._build_root)
+            self._build_finalizer = weakref.finalize(self, rmtree, self._build_path, ignore_errors=True)
+        return self._build_path
+
+    def _remove_build_dir(self) -> None:
+        """Removes the build directory of this backend instance, if it has been created.
+        """
+        if self._build_finalizer is not None:
+            self._build_finalizer()
+        self._build_path, self._build_finalizer = None, None
+
+    def _start_pool(self, n_threads: int) -> None:
+        """Creates the thread pool that evaluates chunks of the right-hand side. It is shut down when the backend
+        instance is garbage collected.
+        """
+        self._stop_pool()
+        self._pool = ThreadPoolExecutor(max_workers=n_threads)
+        self._pool_finalizer = weakref.finalize(self, self._pool.shutdown, wait=False)
+
+    def _stop_pool(self) -> None:
+        """Shuts down the thread pool of this backend instance, if it has been created.
+        """
+        if self._pool_finalizer is not None:
+            self._pool_finalizer.detach()
+        if self._pool is not None:
+            self._pool.shutdown()
+        self._pool, self._pool_finalizer = None, None
 
     def get_layer(self, idx) -> list:
         """Retrieve layer from graph.
@@ -1587,7 +2105,8 @@ class NumpyBackend(object):
         """
         return self.vars[var].numpy()
 
-    def compile(self, build_dir: Optional[str] = None, decorator: Optional[Callable] = None, **kwargs) -> tuple:
+    def compile(self, build_dir: Optional[str] = None, decorator: Optional[Callable] = None, fused: bool = False,
+                n_threads: int = 1, **kwargs) -> tuple:
         """Compile the graph layers/operations. Creates python files containing the functions in each layer.
 
         Parameters
@@ -1596,6 +2115,18 @@ class NumpyBackend(object):
             Directory in which to create the file structure for the simulation.
         decorator
             Decorator function that should be applied to the right-hand side evaluation function.
+        fused
+            If true, an additional function `rhs_loop` is generated that contains the complete explicit euler
+            integration loop together with the right-hand side evaluation. If numba is installed, this function will
+            be JIT-compiled in nopython mode. The fused loop is used by `NumpyBackend.run` instead of the python-level
+            time loop, if the 'euler' solver is chosen.
+        n_threads
+            If larger than 1, element-wise operations of the right-hand side evaluation are split into chunks along
+            their first dimension (e.g. the nodes of a vectorized node), which are evaluated by a pool of `n_threads`
+            threads. Operations that couple these chunks (e.g. dot products) are evaluated in between by the calling
+            thread. Only operations whose first dimension has at least `NumpyBackend.parallel_min_size` entries are
+            split and only if their results are written into pre-allocated buffers (`NumpyBackend.inplace_ops`). The
+            fused integration loop is not split.
         kwargs
             decorator keyword arguments
 
@@ -1617,13 +2148,11 @@ class NumpyBackend(object):
                     layer.pop(layer.index(op))
             if len(layer) == 0:
                 self.layers.pop(new_layer_idx)
+                if new_layer_idx < self._base_layer:
+                    self._base_layer -= 1
             else:
                 new_layer_idx += 1
 
-        # remove previously imported rhs_funcs from system
-        if 'rhs_func' in sys.modules:
-            del sys.modules['rhs_func']
-
         # collect state variable and parameter vectors
         state_vars, params, var_map = self._process_vars()
 
@@ -1633,7 +2162,110 @@ class NumpyBackend(object):
             var = self.get_var(key)
             if vtype == 'state_var' and var.short_name != 'y':
                 var.args[0] = y
-                var.build_op(var.args)
+                var.set_args(var.args)
+
+        # collect code lines of the right-hand side evaluation
+        ######################################################
+
+        # constants
+        args = [None for _ in range(len(params))]
+        constants, updates, indices = [], [], []
+        for key, (vtype, idx) in var_map.items():
+            if vtype == 'constant':
+                var = params[idx][1]
+                constants.append((var.short_name, idx))
+                args[idx] = var
+                if var.short_name != "y_delta":
+                    updates.append(f"{var.short_name}")
+                    indices.append(idx)
+
+        # state variable extraction from input vector y
+        state_var_lines, state_var_names = [], []
+        for key, (vtype, idx) in var_map.items():
+            var = self.get_var(key)
+            if vtype == 'state_var':
+                state_var_lines.append(f"{var.short_name} = {var.value}")
+                state_var_names.append(var.short_name)
+
+        # equations. Operations that do not affect the state variable derivatives are removed, if requested.
+        self._rhs_stats = {}
+        ops = [op for layer in self.layers for op in layer]
+        if self.remove_dead_ops:
+            live = find_live_equations([op.value for op in ops], [self.vars['y_delta'].short_name])
+            self._rhs_stats['dead'] = len(ops) - sum(live)
+            ops = [op for op, is_live in zip(ops, live) if is_live]
+        eq_lines, arg_updates = [], []
+        for op in ops:
+            lhs = extract_lhs_var(op.value)
+            find_arg = [arg == lhs for arg in updates]
+            if any(find_arg):
+                idx = find_arg.index(True)
+                if (updates[idx], indices[idx]) not in arg_updates:
+                    arg_updates.append((updates[idx], indices[idx]))
+            eq_lines.append(op.value)
+
+        # optimize equations. Hoisted expressions become additional constants that are appended to the arguments.
+        invariants = [params[idx][1].short_name for key, (vtype, idx) in var_map.items()
+                      if vtype == 'constant' and not key.startswith('network_inputs/') and 'times' not in key
+                      and params[idx][1].short_name not in state_var_names]
+        if self.optimize_rhs:
+            eq_lines, hoisted, stats = optimize_equations(eq_lines, invariants)
+            self._rhs_stats.update(stats)
+        else:
+            hoisted = []
+        n_constants = len(constants)
+        for name, _ in hoisted:
+            constants.append((name, len(args)))
+            args.append(None)
+        packable = set(find_constants(eq_lines, invariants + [name for name, _ in hoisted])) \
+            if self.pack_constants else set()
+
+        # pre-allocate output buffers of the operations. They are appended to the arguments as well.
+        namespace = None
+        if self.inplace_ops or (self.pack_constants and hoisted):
+            namespace = self._get_namespace(args, constants[:n_constants], hoisted, state_var_lines)
+            for name, idx in constants[n_constants:]:
+                args[idx] = np.array(namespace[name])
+        if self.inplace_ops:
+            eq_lines, buffers = allocate_buffers(eq_lines, namespace, [upd for upd, _ in arg_updates])
+            for name, buffer in buffers:
+                constants.append((name, len(args)))
+                args.append(buffer)
+            self._rhs_stats['inplace'] = len(buffers)
+
+        # pack constants into contiguous memory blocks. The arguments are replaced by views on the packed constants.
+        self._arenas, self._packed, self._packed_vars = [], {}, {}
+        if self.pack_constants:
+            updated = [idx for _, idx in arg_updates]
+            packed = [idx for name, idx in constants if name in packable and idx not in updated
+                      and isinstance(args[idx], np.ndarray) and args[idx].dtype.kind in 'biufc']
+            self._arenas, layout = pack_arrays([args[idx] for idx in packed])
+            for idx, (i, start, stop) in zip(packed, layout):
+                view = self._arenas[i][start:stop].reshape(args[idx].shape)
+                if idx < n_constants:
+                    self._packed_vars[id(args[idx])] = view
+                self._packed[idx] = (i, start, stop, view.shape)
+                args[idx] = view
+            self._rhs_stats['packed'] = len(packed)
+
+        # split element-wise operations into chunks that are evaluated by a thread pool
+        rhs_lines, chunk_funcs = eq_lines, []
+        self._stop_pool()
+        if n_threads > 1 and fused:
+            warnings.warn('WARNING! The fused integration loop is evaluated by a single thread. Argument `n_threads` '
+                          'is ignored.')
+        elif n_threads > 1 and self.inplace_ops:
+            namespace = self._get_namespace(args, constants, [], state_var_lines)
+            rhs_lines, chunk_funcs, n_parallel = parallelize_equations(eq_lines, namespace, n_threads,
+                                                                       self.parallel_min_size)
+            if n_parallel:
+                self._start_pool(n_threads)
+                constants.append(('_pmap', len(args)))
+                args.append(self._pool.map)
+            self._rhs_stats['parallel'] = n_parallel
+        elif n_threads > 1:
+            warnings.warn('WARNING! The right-hand side evaluation can only be split into chunks if its operations '
+                          'write into pre-allocated buffers (`inplace_ops=True`). Argument `n_threads` is ignored.')
 
         # create rhs evaluation function
         ################################
@@ -1645,6 +2277,13 @@ class NumpyBackend(object):
             func_gen.add_linebreak()
         func_gen.add_linebreak()
 
+        # define the functions that evaluate chunks of element-wise operations
+        for line in chunk_funcs:
+            func_gen.add_code_line(line)
+            func_gen.add_linebreak()
+        if chunk_funcs:
+            func_gen.add_linebreak()
+
         # define function head
         func_gen.add_code_line("def rhs_eval(t, y, params):")
         func_gen.add_linebreak()
@@ -1652,77 +2291,279 @@ class NumpyBackend(object):
         func_gen.add_linebreak()
 
         # declare constants
-        args = [None for _ in range(len(params))]
         func_gen.add_code_line("# declare constants")
         func_gen.add_linebreak()
-        updates, indices = [], []
-        i = 0
-        for key, (vtype, idx) in var_map.items():
-            if vtype == 'constant':
-                var = params[idx][1]
-                func_gen.add_code_line(f"{var.short_name} = params[{idx}]")
-                func_gen.add_linebreak()
-                args[idx] = var
-                if var.short_name != "y_delta":
-                    updates.append(f"{var.short_name}")
-                    indices.append(i)
-                    i += 1
+        for name, idx in constants:
+            func_gen.add_code_line(f"{name} = params[{idx}]")
+            func_gen.add_linebreak()
         func_gen.add_linebreak()
 
         # extract state variables from input vector y
         func_gen.add_code_line("# extract state variables from input vector")
         func_gen.add_linebreak()
-        for key, (vtype, idx) in var_map.items():
-            var = self.get_var(key)
-            if vtype == 'state_var':
-                func_gen.add_code_line(f"{var.short_name} = {var.value}")
-                func_gen.add_linebreak()
+        for line in state_var_lines:
+            func_gen.add_code_line(line)
+            func_gen.add_linebreak()
         func_gen.add_linebreak()
 
         # add equations
         func_gen.add_code_line("# calculate right-hand side update of equation system")
         func_gen.add_linebreak()
-        arg_updates = []
-        for i, layer in enumerate(self.layers):
-            for j, op in enumerate(layer):
-                lhs = extract_lhs_var(op.value)
-                find_arg = [arg == lhs for arg in updates]
-                if any(find_arg):
-                    idx = find_arg.index(True)
-                    arg_updates.append((updates[idx], indices[idx]))
-                func_gen.add_code_line(op.value)
-                func_gen.add_linebreak()
+        for line in rhs_lines:
+            func_gen.add_code_line(line)
+            func_gen.add_linebreak()
         func_gen.add_linebreak()
 
         # update parameters where necessary
         func_gen.add_code_line("# update system parameters")
         func_gen.add_linebreak()
         for upd, idx in arg_updates:
-            update_str = f"params[{idx}] = {upd}"
-            if f"    {update_str}" not in func_gen.code:
-                func_gen.add_code_line(update_str)
-                func_gen.add_linebreak()
+            func_gen.add_code_line(f"params[{idx}] = {upd}")
+            func_gen.add_linebreak()
 
         # add return line
         func_gen.add_code_line(f"return {self.vars['y_delta'].short_name}")
         func_gen.add_linebreak()
+        func_gen.remove_indent()
+
+        # create fused integration loop
+        ###############################
 
-        # save rhs function to file
-        fname = f'{self._build_dir}/rhs_func'
-        with open(f'{fname}.py', 'w') as f:
-            f.writelines(func_gen.code)
-            f.close()
+        if fused:
+            namespace = self._get_namespace(args, constants[:n_constants] + constants[n_constants+len(hoisted):],
+                                            hoisted, state_var_lines)
+            self._generate_rhs_loop(func_gen, constants, state_var_lines, eq_lines, arg_updates, self._packed,
+                                    len(self._arenas), namespace)
 
-        # import function from file
-        exec(f"from rhs_func import rhs_eval", globals())
-        rhs_eval = globals().pop('rhs_eval')
+        # create evaluation function of hoisted expressions
+        ###################################################
+
+        if hoisted:
+            func_gen.add_linebreak()
+            func_gen.add_linebreak()
+            func_gen.add_code_line("def rhs_invariants(params):")
+            func_gen.add_linebreak()
+            func_gen.add_indent()
+            func_gen.add_linebreak()
+            for name, idx in constants[:n_constants]:
+                func_gen.add_code_line(f"{name} = params[{idx}]")
+                func_gen.add_linebreak()
+            func_gen.add_code_line(f"return [{', '.join([code for _, code in hoisted])}]")
+            func_gen.add_linebreak()
+            func_gen.remove_indent()
+
+        # save rhs function to file and import it
+        self._rhs_source = func_gen.generate()
+        rhs_module = self._load_rhs_module(self._rhs_source)
+        rhs_eval = rhs_module.rhs_eval
 
         # apply function decorator
         if decorator:
             rhs_eval = decorator(rhs_eval, **kwargs)
 
+        # evaluate hoisted expressions
+        if hoisted:
+            self._invariants = (rhs_module.rhs_invariants, args,
+                                [idx for _, idx in constants[n_constants:n_constants+len(hoisted)]])
+            self._update_invariants()
+        else:
+            self._invariants = None
+
+        # import fused integration loop from file
+        self._updated_args = [idx for _, idx in arg_updates]
+        self._updated_vars = [key for key, (vtype, idx) in var_map.items() if vtype == 'constant' and
+                              idx in self._updated_args and not key.startswith('network_inputs/')]
+        if fused:
+            self._rhs_loop = (self._jit_rhs_loop(rhs_module.rhs_loop, cache=self.build_cache),
+                              [idx for _, idx in arg_updates])
+        else:
+            self._rhs_loop = None
+
         return rhs_eval, args, state_vars, var_map
 
+    def _update_invariants(self) -> None:
+        """(Re-)evaluates the expressions that have been hoisted out of the right-hand side evaluation and stores their
+        results in the respective function arguments.
+        """
+        rhs_invariants, args, indices = self._invariants
+        for idx, val in zip(indices, rhs_invariants(args)):
+            if args[idx] is None:
+                args[idx] = np.asarray(val)
+            else:
+                args[idx][...] = val
+
+    def _get_namespace(self, args: list, constants: list, hoisted: list, state_var_lines: list) -> dict:
+        """Creates a namespace in which the equations of the right-hand side evaluation can be evaluated once, without
+        changing the arguments of the right-hand side evaluation.
+        """
+        namespace = {}
+        for import_line in self._imports:
+            exec(import_line, namespace)
+        namespace['t'] = 0.
+        namespace['y'] = np.array(self.get_var('y'))
+        for name, idx in constants:
+            namespace[name] = np.array(args[idx]) if isinstance(args[idx], np.ndarray) else deepcopy(args[idx])
+        for name, code in hoisted:
+            namespace[name] = eval(code, namespace)
+        for line in state_var_lines:
+            exec(line, namespace)
+        return namespace
+
+    def _get_build_key(self, source: str) -> str:
+        """Returns the build cache key of generated code of this backend.
+        """
+        return get_build_key(source, self.__class__.__name__, np.dtype(self._float_def).name)
+
+    def _load_rhs_module(self, source: str) -> ModuleType:
+        """Writes the generated source code of the right-hand side evaluation into the build directory (and the build
+        cache) and imports it.
+        """
+        fname = f'{self._build_dir}/rhs_func.py'
+        with open(fname, 'w') as f:
+            f.write(source)
+        if self.build_cache:
+            fname, _ = cached_build(self._get_build_key(source), 'rhs_func.py', source=source)
+        return self._import_module(fname)
+
+    def _import_module(self, fname: str) -> ModuleType:
+        """Executes a generated python file in a module namespace that is private to this backend instance. The module
+        is neither looked up via nor registered in `sys.modules`, such that backends that compile at the same time (in
+        threads or processes) cannot overwrite each other's functions.
+
+        Parameters
+        ----------
+        fname
+            Path to the python file.
+
+        Returns
+        -------
+        ModuleType
+            Module that contains all definitions of the python file.
+
+        """
+        with open(fname, 'r') as f:
+            code = compile(f.read(), fname, 'exec')
+        module = ModuleType(f"pyrates_rhs_{os.path.basename(self._build_dir)}")
+        module.__file__ = fname
+        exec(code, module.__dict__)
+        return module
+
+    def _generate_rhs_loop(self, func_gen: 'CodeGen', constants: list, state_var_lines: list, eq_lines: list,
+                           arg_updates: list, packed: dict, n_arenas: int, namespace: dict) -> None:
+        """Adds a function `rhs_loop` to the code generator that performs all euler integration steps. Constants are
+        passed as separate arguments, except for packed constants, which are passed via their arenas `_arena<i>` and
+        unpacked only once. Updated non-state variables are returned at the end of the loop. The types of all
+        variables are kept stable across the steps (see `stabilize_types`), such that the loop can be compiled by
+        numba. `namespace` contains the values of all variables before the first step.
+        """
+
+        y_delta = self.vars['y_delta'].short_name
+        y_dtype = np.dtype(self.vars['y'].dtype).name
+        state_var_names = [line.split('=')[0].strip() for line in state_var_lines]
+        loop_lines, preamble = stabilize_types(eq_lines, namespace, [upd for upd, _ in arg_updates])
+
+        # constants that are shadowed by state variables of the same name are not used within the loop
+        const_names = [f"_unused{idx}" if name in state_var_names else name for name, idx in constants
+                       if idx not in packed] + [f"_arena{i}" for i in range(n_arenas)]
+
+        # define function head
+        func_gen.add_linebreak()
+        func_gen.add_linebreak()
+        func_gen.add_code_line(f"def rhs_loop(t, y, dt, steps, sampling_step, out_ranges, results"
+                               f"{''.join([f', {name}' for name in const_names])}):")
+        func_gen.add_linebreak()
+        func_gen.add_indent()
+        func_gen.add_linebreak()
+
+        # unpack constants from arenas
+        for name, idx in constants:
+            if idx in packed:
+                i, start, stop, shape = packed[idx]
+                func_gen.add_code_line(f"{name} = _arena{i}[{start}:{stop}].reshape({shape})")
+                func_gen.add_linebreak()
+
+        # create buffers of re-assigned variables and index arrays
+        for line in preamble:
+            func_gen.add_code_line(line)
+            func_gen.add_linebreak()
+        func_gen.add_code_line(f"dt_y = np.{y_dtype}(dt)")
+        func_gen.add_linebreak()
+
+        # define time loop
+        func_gen.add_code_line("sampling_idx = 0")
+        func_gen.add_linebreak()
+        func_gen.add_code_line("for step in range(steps):")
+        func_gen.add_linebreak()
+        func_gen.add_indent()
+        func_gen.add_linebreak()
+
+        # right-hand side evaluation
+        func_gen.add_code_line("# extract state variables from input vector")
+        func_gen.add_linebreak()
+        for line in state_var_lines:
+            func_gen.add_code_line(line)
+            func_gen.add_linebreak()
+        func_gen.add_linebreak()
+        func_gen.add_code_line("# calculate right-hand side update of equation system")
+        func_gen.add_linebreak()
+        for line in loop_lines:
+            func_gen.add_code_line(line)
+            func_gen.add_linebreak()
+        func_gen.add_linebreak()
+
+        # euler update and sampling of output variables
+        func_gen.add_code_line("# update state variables and store outputs")
+        func_gen.add_linebreak()
+        func_gen.add_code_line("t += dt")
+        func_gen.add_linebreak()
+        func_gen.add_code_line(f"y += dt_y * {y_delta}")
+        func_gen.add_linebreak()
+        func_gen.add_code_line("if step % sampling_step == 0:")
+        func_gen.add_linebreak()
+        func_gen.add_indent()
+        func_gen.add_code_line("for out_range in range(out_ranges.shape[0]):")
+        func_gen.add_linebreak()
+        func_gen.add_indent()
+        func_gen.add_code_line("out_start, out_stop, out_col = out_ranges[out_range, 0], out_ranges[out_range, 1], "
+                               "out_ranges[out_range, 2]")
+        func_gen.add_linebreak()
+        func_gen.add_code_line("results[sampling_idx, out_col:out_col+out_stop-out_start] = y[out_start:out_stop]")
+        func_gen.add_linebreak()
+        func_gen.remove_indent()
+        func_gen.add_code_line("sampling_idx += 1")
+        func_gen.add_linebreak()
+        func_gen.remove_indent()
+        func_gen.remove_indent()
+        func_gen.add_linebreak()
+
+        # return updated system parameters
+        func_gen.add_code_line(f"return t, ({''.join([f'{upd}, ' for upd, _ in arg_updates])})")
+        func_gen.add_linebreak()
+        func_gen.remove_indent()
+
+    @staticmethod
+    def _jit_rhs_loop(rhs_loop: Callable, cache: bool = False) -> tuple:
+        """Tries to JIT-compile the fused integration loop via numba. Returns the compiled function (or None, if numba
+        is not available) and the pure python function as a fallback. If `cache` is true, numba stores the machine code
+        next to the (build cache) file of the loop, such that later processes do not have to compile it again.
+        """
+        try:
+            from numba import njit
+        except ImportError:
+            return None, rhs_loop
+
+        # jit all pyrates functions the loop refers to, without touching the module namespace of `rhs_eval`
+        func_globals = dict(rhs_loop.__globals__)
+        for key, val in func_globals.items():
+            if callable(val) and getattr(val, '__module__', '') == 'pyrates.backend.funcs':
+                func_globals[key] = njit(val)
+        func = type(rhs_loop)(rhs_loop.__code__, func_globals, rhs_loop.__name__, rhs_loop.__defaults__)
+        try:
+            return njit(cache=cache)(func), rhs_loop
+        except RuntimeError:
+            # numba could not locate a writable cache for the file of the loop
+            return njit(func), rhs_loop
+
     def broadcast(self, op1: Any, op2: Any, **kwargs) -> tuple:
         """Tries to match the shapes of op1 and op2 such that op can be applied.
 
@@ -1803,33 +2644,242 @@ class NumpyBackend(object):
         """
         return self.add_op('asarray', vars)
 
-    def to_file(self, fn: str):
-        """Writes backend to file
+    def to_file(self, fn: str, func_args: Optional[list] = None, **kwargs) -> None:
+        """Writes the simulation state of the backend to a `.npz` file: the state vector, the time and all arguments of
+        the compiled right-hand side evaluation that are changed by it (e.g. delay buffers and the input index
+        `in_var_idx`). The state is written into a temporary file first, which replaces `fn` afterwards. Thus, `fn`
+        always contains a complete state, even if the process is killed while writing.
 
         Parameters
         ----------
         fn
+            Name of the file.
+        func_args
+            Arguments of the compiled right-hand side evaluation (see `NumpyBackend.compile`). If not passed, only the
+            state vector and the time are written.
+        kwargs
+            Additional arrays that are written into the file.
 
         Returns
         -------
+        None
 
         """
 
-        pass
+        state = {'y': self.vars['y'], 't': self.vars['t']}
+        if func_args is not None:
+            for idx in self._updated_args:
+                state[f'arg_{idx}'] = func_args[idx]
+        state.update(kwargs)
+
+        fn_tmp = f"{fn}.tmp"
+        with open(fn_tmp, 'wb') as f:
+            np.savez(f, **{key: np.asarray(val) for key, val in state.items()})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(fn_tmp, fn)
+
+    def get_state(self) -> dict:
+        """Returns copies of the state vector, the time and all variables that are changed by the compiled right-hand
+        side evaluation (e.g. delay buffers), such that a simulation can be continued from them via
+        `NumpyBackend.set_state`.
+        """
+        return {key: np.array(self.vars[key]) for key in ['y', 't'] + self._updated_vars if key in self.vars}
 
-    def from_file(self, fn: str):
+    def set_state(self, state: dict) -> None:
+        """Changes the state vector, the time and the variables that are changed by the compiled right-hand side
+        evaluation in place to the values returned by `NumpyBackend.get_state`.
         """
+        if 't' not in self.vars:
+            self.add_var('state_var', name='t', value=0.0, dtype=self._float_def, shape=())
+        for key, val in state.items():
+            if key in self.vars:
+                self.vars[key][...] = val
+
+    def from_file(self, fn: str, func_args: Optional[list] = None) -> dict:
+        """Restores a simulation state that has been written via `NumpyBackend.to_file`. The state vector, the time and
+        the arguments of the compiled right-hand side evaluation are changed in place.
 
         Parameters
         ----------
         fn
+            Name of the file.
+        func_args
+            Arguments of the compiled right-hand side evaluation (see `NumpyBackend.compile`). If not passed, only the
+            state vector and the time are restored.
+
+        Returns
+        -------
+        dict
+            All additional arrays that were written into the file.
+
+        """
+
+        with np.load(fn) as f:
+            state = {key: f[key] for key in f.files}
+
+        y = state.pop('y')
+        if y.shape != self.vars['y'].shape:
+            raise ValueError(f'The state vector in {fn} has shape {y.shape}, but the state vector of the network has '
+                             f'shape {self.vars["y"].shape}.')
+        self.vars['y'][...] = y
+        self.vars['t'][...] = state.pop('t')
+
+        if func_args is not None:
+            for idx in self._updated_args:
+                val = state.pop(f'arg_{idx}', None)
+                if val is None:
+                    raise ValueError(f'The simulation state in {fn} does not match the compiled network.')
+                if isinstance(func_args[idx], np.ndarray) and func_args[idx].shape == val.shape:
+                    func_args[idx][...] = val
+                else:
+                    func_args[idx] = val
+
+        return state
+
+    def save_compiled(self, path: str, T: float, inputs: Optional[list] = None, solver: str = 'euler',
+                      **kwargs) -> None:
+        """Saves the compiled right-hand side evaluation of the network into a directory, such that it can be simulated
+        via `NumpyBackend.load_compiled` without building the graph again. The directory contains the generated source
+        code (`rhs_func.py`), all arguments of the right-hand side evaluation and the current state (`args.npz`), and
+        the variable map and argument layout (`backend.pkl`).
+
+        Parameters
+        ----------
+        path
+            Directory to save the compiled network into.
+        T
+            Simulation time that corresponds to the inputs.
+        inputs
+            Inputs in the format of `NumpyBackend.run`. Only their structure (target variables, target indices and
+            input dimensions) is saved. Loaded networks can only be simulated with inputs of the same structure.
+        solver
+            Type of the numerical solver the network is compiled for (see `NumpyBackend.run`).
+        kwargs
+            Options of `NumpyBackend.compile` (`fused`, `n_threads`).
 
         Returns
         -------
+        None
 
         """
 
-        pass
+        # compile the network for the requested run signature
+        if kwargs.get('decorator'):
+            raise ValueError('Networks whose right-hand side evaluation is decorated cannot be saved.')
+        continuous = solver in continuous_solvers
+        signature = (continuous, kwargs.get('fused', False), kwargs.get('n_threads', 1), None, {},
+                     self._get_input_signature(inputs))
+        _, args, _, var_map, _ = self._get_run_func(signature, inputs=inputs, T=T, verbose=False)
+
+        # collect the argument layout and all arrays
+        input_indices = [var_map[key][1] for key in self._input_vars]
+        arrays = {'y': self.vars['y'], 't': self.vars['t']}
+        arrays.update({f"arena_{i}": arena for i, arena in enumerate(self._arenas)})
+        arg_info = []
+        for idx, arg in enumerate(args):
+            names = (getattr(arg, 'name', None), getattr(arg, 'short_name', None), getattr(arg, 'vtype', None))
+            if arg is self.vars['y'] or arg is self.vars['t']:
+                arg_info.append(('var', 'y' if arg is self.vars['y'] else 't'))
+            elif idx in self._packed:
+                arg_info.append(('packed',))
+            elif issparse(arg):
+                arg = arg.tocsr()
+                arrays.update({f"arg_{idx}_data": arg.data, f"arg_{idx}_indices": arg.indices,
+                               f"arg_{idx}_indptr": arg.indptr})
+                arg_info.append(('sparse', arg.shape) + names)
+            elif isinstance(arg, np.ndarray):
+                arrays[f"arg_{idx}"] = arg
+                arg_info.append(('array',) + names)
+            elif self._pool and arg == self._pool.map:
+                arg_info.append(('pmap',))
+            elif idx in input_indices:
+                arg_info.append(('input',) + names)
+            else:
+                raise ValueError(f'Argument {idx} of the compiled network ({type(arg)}) cannot be saved.')
+
+        # write everything into the directory
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'rhs_func.py'), 'w') as f:
+            f.write(self._rhs_source)
+        np.savez(os.path.join(path, 'args.npz'), **{key: np.asarray(val) for key, val in arrays.items()})
+        info = {'name': self.name, 'float_default_type': np.dtype(self._float_def).name, 'imports': self._imports,
+                'signature': signature, 'var_map': var_map, 'args': arg_info, 'packed': self._packed,
+                'n_arenas': len(self._arenas), 'updated_args': self._updated_args, 'input_vars': self._input_vars,
+                'idx_start': self.idx_start}
+        with open(os.path.join(path, 'backend.pkl'), 'wb') as f:
+            pickle.dump(info, f)
+
+    @classmethod
+    def load_compiled(cls, path: str, build_dir: Optional[str] = None) -> 'NumpyBackend':
+        """Creates a backend from a compiled network that has been saved via `NumpyBackend.save_compiled`. Its graph
+        is empty, but it can be simulated via `NumpyBackend.run` with inputs of the saved structure.
+
+        Parameters
+        ----------
+        path
+            Directory the compiled network has been saved into.
+        build_dir
+            Directory in which to create the build directory of the backend.
+
+        Returns
+        -------
+        NumpyBackend
+            Backend instance that holds the compiled network.
+
+        """
+
+        with open(os.path.join(path, 'backend.pkl'), 'rb') as f:
+            info = pickle.load(f)
+        with np.load(os.path.join(path, 'args.npz')) as f:
+            arrays = {key: f[key] for key in f.files}
+        with open(os.path.join(path, 'rhs_func.py'), 'r') as f:
+            source = f.read()
+
+        backend = cls(name=info['name'], float_default_type=info['float_default_type'], imports=info['imports'],
+                      build_dir=build_dir)
+        for key in ['y', 't']:
+            backend.vars[key] = backend._restore_var(arrays[key], key, key, 'state_var')
+        backend._arenas = [arrays[f"arena_{i}"] for i in range(info['n_arenas'])]
+        backend._packed = info['packed']
+        backend._updated_args = info['updated_args']
+        backend._input_vars = info['input_vars']
+        backend.idx_start = info['idx_start']
+
+        # restore the arguments of the right-hand side evaluation
+        continuous, fused, n_threads, *_ = info['signature']
+        args = []
+        for idx, (kind, *arg_info) in enumerate(info['args']):
+            if kind == 'var':
+                args.append(backend.vars[arg_info[0]])
+            elif kind == 'packed':
+                i, start, stop, shape = backend._packed[idx]
+                args.append(backend._arenas[i][start:stop].reshape(shape))
+            elif kind == 'pmap':
+                backend._start_pool(n_threads)
+                args.append(backend._pool.map)
+            elif kind == 'sparse':
+                from scipy.sparse import csr_matrix
+                shape, *names = arg_info
+                arg = csr_matrix((arrays[f"arg_{idx}_data"], arrays[f"arg_{idx}_indices"],
+                                  arrays[f"arg_{idx}_indptr"]), shape=shape)
+                arg.name, arg.short_name, arg.vtype = names
+                args.append(arg)
+            elif kind == 'array':
+                args.append(backend._restore_var(arrays[f"arg_{idx}"], *arg_info))
+            else:
+                args.append(backend._restore_var(np.zeros(()), *arg_info))
+
+        # import the right-hand side evaluation
+        backend._rhs_source = source
+        rhs_module = backend._load_rhs_module(source)
+        if fused:
+            backend._rhs_loop = (cls._jit_rhs_loop(rhs_module.rhs_loop, cache=backend.build_cache),
+                                 backend._updated_args)
+        backend._compiled = (info['signature'], (rhs_module.rhs_eval, args, None, info['var_map']))
+        backend._loaded = True
+
+        return backend
 
     @staticmethod
     def eval(ops: list) -> list:
@@ -1869,6 +2919,96 @@ class NumpyBackend(object):
         else:
             self.get_layer(layer).append(op)
 
+    def _bind_inputs(self, inputs: list, T: float, continuous: bool, args: list, var_map: dict) -> None:
+        """Replaces the input variables among the arguments of a compiled run function by the values of new inputs
+        with the same structure (see `NumpyBackend._get_input_signature`) and resets the input counting index.
+        """
+
+        if not inputs:
+            return
+
+        t0 = float(self.get_var('t').numpy())
+        for (inp, _, _), key in zip(inputs, self._input_vars):
+            idx = var_map[key][1]
+            if continuous:
+                val = self._interpolate_input(inp, T, t0)
+            else:
+                val, _ = self._create_var(vtype='state_var', dtype=args[idx].dtype, shape=None, value=inp, name=key)
+            val.name, val.short_name, val.vtype = key, args[idx].short_name, args[idx].vtype
+            args[idx] = val
+
+        if not continuous:
+            args[var_map['network_inputs/in_var_idx'][1]][...] = 0
+
+    @staticmethod
+    def _interpolate_input(inp: np.ndarray, T: float, t0: float = 0.0) -> Callable:
+        """Creates a linear interpolation of an input array over the simulation time interval [t0, t0 + T].
+        """
+
+        from scipy.interpolate import interp1d
+
+        time = np.linspace(t0, t0 + T, inp.shape[0])
+        if len(inp.shape) > 1:
+            inp = inp.squeeze()
+        f = interp1d(time, inp, axis=0, copy=False, kind='linear')
+        f.shape = inp.shape[1:]
+        return f
+
+    @staticmethod
+    def _get_input_signature(inputs: Optional[list]) -> tuple:
+        """Returns the structure of a list of inputs (target variables, target indices and input shapes except for
+        the number of time steps), which determines whether a compiled run function can be re-used for these inputs.
+        """
+        if not inputs:
+            return ()
+        return tuple((target_var.name, str(idx), tuple(np.shape(inp)[1:])) for inp, target_var, idx in inputs)
+
+    def _open_input_streams(self, inputs: Optional[list], T: float, dt: float, dts: float, continuous: bool) -> tuple:
+        """Replaces inputs that are `InputStream` instances or broadcasted arrays (arrays with zero strides) by their
+        first block of `NumpyBackend.input_block_size` time steps (rounded to a multiple of the sampling step), which
+        serves as input buffer of the compiled run function. Since all inputs share a single input counting index that
+        is reset at the start of each block, all other inputs are read block-wise as well, as soon as a single input
+        is streamed. Returns the new list of inputs and a list of tuples of the input position and the input stream
+        that fills the buffer during the integration. Continuous solvers interpolate the inputs and thus receive the
+        input values of all time steps, as do all solvers of backends that set `input_block_size` to None.
+        """
+
+        if not inputs:
+            return inputs, []
+
+        # materialize all input streams for solvers that do not read inputs block-wise
+        if continuous or not self.input_block_size:
+            return [(inp.read(0, inp.steps) if isinstance(inp, InputStream) else inp, target_var, idx)
+                    for inp, target_var, idx in inputs], []
+        if not any([isinstance(inp, InputStream) or (isinstance(inp, np.ndarray) and 0 in inp.strides)
+                    for inp, _, _ in inputs]):
+            return inputs, []
+
+        steps = int(np.round(T / dt, decimals=0))
+        sampling_step = int(np.round(dts / dt, decimals=0))
+        self._input_block = min(steps, int(np.ceil(self.input_block_size / sampling_step)) * sampling_step)
+
+        inputs_new, streams = [], []
+        for k, (inp, target_var, idx) in enumerate(inputs):
+            stream = inp if isinstance(inp, InputStream) else InputStream(np.asarray(inp), np.shape(inp)[0])
+            inputs_new.append((stream.read(0, self._input_block), target_var, idx))
+            streams.append((k, stream))
+
+        return inputs_new, streams
+
+    def _read_input_block(self, func_args: list, step: int, reset_counter: bool = True) -> None:
+        """Reads the input values of the block of time steps that starts at `step` from all input streams into the
+        input buffers among the arguments of the run function and resets the input counting index to the start of the
+        buffers.
+        """
+
+        for idx, stream in self._input_streams:
+            block = stream.read(step, min(step + self._input_block, stream.steps))
+            buffer = func_args[idx]
+            buffer[:block.shape[0]] = np.reshape(block, (block.shape[0],) + buffer.shape[1:])
+        if reset_counter:
+            func_args[self._input_counter][...] = 0
+
     def _solve(self, rhs_func, func_args, T, dt, dts, t, solver, output_indices, **kwargs):
         """
 
@@ -1893,11 +3033,56 @@ class NumpyBackend(object):
         # choose solver
         ###############
 
-        if solver == 'euler':
+        exchange = kwargs.pop('exchange', None)
+        if exchange is not None and solver != 'euler':
+            raise ValueError(f'Invalid solver type: {solver}. State variables can only be exchanged with other '
+                             f'processes by the `euler` solver.')
+        checkpoint = self._checkpoint or self._resume_from
+        if checkpoint and solver != 'euler':
+            raise ValueError(f'Invalid solver type: {solver}. Checkpoints can only be written and resumed by the '
+                             f'`euler` solver.')
+        if exchange is not None and self._rhs_loop:
+            warnings.warn('WARNING! The fused integration loop cannot exchange state variables with other processes. '
+                          'Falling back to the python integration loop.')
+        elif checkpoint and self._rhs_loop:
+            warnings.warn('WARNING! The fused integration loop cannot write or resume checkpoints. Falling back to the '
+                          'python integration loop.')
+        noise = kwargs.pop('noise', None)
+        if noise and solver != 'euler_maruyama':
+            raise ValueError(f'Invalid solver type: {solver}. Noise can only be added to state variables by the '
+                             f'`euler_maruyama` solver.')
+
+        if solver == 'euler' and self._rhs_loop and exchange is None and not checkpoint:
+
+            times, results = self._integrate_fused(func_args=func_args, T=T, dt=dt, dts=dts, t=t,
+                                                   output_indices=output_indices)
+
+        elif solver == 'euler' and exchange is not None:
+
+            times, results = self._integrate(rhs_func=rhs_func, func_args=func_args, T=T, dt=dt, dts=dts, t=t,
+                                             output_indices=output_indices, exchange=exchange)
+
+        elif solver == 'euler':
 
             times, results = self._integrate(rhs_func=rhs_func, func_args=func_args, T=T, dt=dt, dts=dts, t=t,
                                              output_indices=output_indices)
 
+        elif solver == 'euler_maruyama':
+
+            times, results = self._integrate_euler_maruyama(rhs_func=rhs_func, func_args=func_args, T=T, dt=dt,
+                                                            dts=dts, t=t, output_indices=output_indices, noise=noise,
+                                                            **kwargs)
+
+        elif solver in self._rk_tableaus:
+
+            times, results = self._integrate_rk(rhs_func=rhs_func, func_args=func_args, T=T, dt=dt, dts=dts, t=t,
+                                                output_indices=output_indices, tableau=self._rk_tableaus[solver])
+
+        elif solver == 'rk45':
+
+            times, results = self._integrate_rk45(rhs_func=rhs_func, func_args=func_args, T=T, dt=dt, dts=dts, t=t,
+                                                  output_indices=output_indices, **kwargs)
+
         elif solver == 'scipy':
 
             from scipy.integrate import solve_ivp
@@ -1909,8 +3094,14 @@ class NumpyBackend(object):
                 kwargs['t_eval'] = times
             outputs = solve_ivp(fun=fun, t_span=(float(t.numpy()), T), y0=self.vars['y'], first_step=dt,
                                 **kwargs)
-            results = [outputs['y'].T[:, idx] for idx in output_indices]
+            results = [outputs['y'].T[:, idx[0]:idx[1]] if type(idx) is tuple else outputs['y'].T[:, idx]
+                       for idx in output_indices]
             times = outputs['t']
+            if self._out_file:
+                results_tmp = self._allocate_results(output_indices, len(times))
+                for r, r_tmp in zip(results, results_tmp):
+                    r_tmp[:] = np.reshape(r, r_tmp.shape)
+                results = results_tmp
             self.vars['y'] = outputs['y'].T[:, -1]
 
         else:
@@ -1919,38 +3110,133 @@ class NumpyBackend(object):
 
         return times, results
 
-    def _integrate(self, rhs_func, func_args, T, dt, dts, t, output_indices):
+    def _integrate(self, rhs_func, func_args, T, dt, dts, t, output_indices, exchange=None):
 
         sampling_step = int(np.round(dts / dt, decimals=0))
         sampling_steps = int(np.round(T / dts, decimals=0))
         steps = int(np.round(T / dt, decimals=0))
 
         # initialize results storage vectors
-        results = []
-        for i, idx in enumerate(output_indices):
-            if type(idx) is tuple:
-                var_dim = idx[1]-idx[0]
-            elif type(idx) is list:
-                if all(np.diff(idx, n=1) == 1):
-                    output_indices[i] = (idx[0], idx[-1]+1)
-                    var_dim = idx[-1]+1-idx[0]
-                else:
-                    var_dim = len(idx)
-            else:
-                var_dim = 1
-            results.append(np.zeros((sampling_steps, var_dim)))
+        results = self._allocate_results(output_indices, sampling_steps)
+
+        # continue from a checkpoint, if requested
+        step, sampling_idx = 0, 0
+        fingerprint = self._get_fingerprint(T, dt) if self._checkpoint or self._resume_from else None
+        if self._resume_from:
+            step, sampling_idx = self._resume(self._resume_from, func_args, results, steps, fingerprint)
+            if self._input_streams and step % self._input_block:
+                self._read_input_block(func_args, step - step % self._input_block, reset_counter=False)
+        checkpoint_file, checkpoint_steps = self._checkpoint if self._checkpoint else (None, 0)
 
         # solve via pyrates internal explicit euler algorithm
         state_vars = self.vars['y']
+        state_vars_delta = np.zeros_like(state_vars)
+        for i in range(step, steps):
+            if self._input_streams and i % self._input_block == 0:
+                self._read_input_block(func_args, i)
+            if exchange is not None:
+                exchange(state_vars)
+            deltas = rhs_func(t, state_vars, func_args)
+            t += dt
+            state_vars += np.multiply(deltas, dt, out=state_vars_delta)
+            if i % sampling_step == 0:
+                self._store_results(results, sampling_idx, state_vars, output_indices)
+                sampling_idx += 1
+            if checkpoint_steps and (i+1) % checkpoint_steps == 0:
+                self._write_checkpoint(checkpoint_file, func_args, results, i+1, steps, sampling_idx, fingerprint)
+
+        self.vars['y'] = state_vars
+        times = np.arange(0, T, dts)
+
+        return times, results
+
+    def _integrate_euler_maruyama(self, rhs_func, func_args, T, dt, dts, t, output_indices, noise=None, seed=None):
+        """Solves a system of stochastic differential equations with additive noise via the Euler-Maruyama method.
+        Gaussian increments are drawn from a seeded random number generator in blocks of
+        `NumpyBackend.noise_block_size` numbers, such that the memory required for the noise does not grow with the
+        simulation time.
+        """
+
+        sampling_step = int(np.round(dts / dt, decimals=0))
+        sampling_steps = int(np.round(T / dts, decimals=0))
+        steps = int(np.round(T / dt, decimals=0))
+
+        # initialize results storage vectors
+        results = self._allocate_results(output_indices, sampling_steps)
+
+        # collect the noise intensities of all state variables that receive noise
+        state_vars = self.vars['y']
+        sigma = np.zeros_like(state_vars)
+        for idx, sigma_tmp in (noise if noise else []):
+            sigma[np.asarray(idx) - self.idx_start] = sigma_tmp
+        noise_idx = self._collapse_index(list(np.flatnonzero(sigma)))
+        noise_idx = slice(*noise_idx) if type(noise_idx) is tuple else noise_idx
+        sigma = (sigma[noise_idx] * np.sqrt(dt)).astype(state_vars.dtype)
+        n_noise = sigma.shape[0]
+
+        # pre-allocate the block of gaussian increments
+        rng = np.random.default_rng(seed)
+        block_steps = max(1, self.noise_block_size // max(n_noise, 1))
+        noise_block = np.zeros((block_steps, n_noise), dtype=state_vars.dtype)
+        noise_delta = np.zeros_like(sigma)
+
+        # solve via the euler-maruyama algorithm
+        state_vars_delta = np.zeros_like(state_vars)
         sampling_idx = 0
         for i in range(steps):
+            if self._input_streams and i % self._input_block == 0:
+                self._read_input_block(func_args, i)
             deltas = rhs_func(t, state_vars, func_args)
             t += dt
-            state_vars += dt * deltas
+            state_vars += np.multiply(deltas, dt, out=state_vars_delta)
+            if n_noise:
+                block_idx = i % block_steps
+                if block_idx == 0:
+                    rng.standard_normal(out=noise_block, dtype=noise_block.dtype)
+                state_vars[noise_idx] += np.multiply(sigma, noise_block[block_idx], out=noise_delta)
+            if i % sampling_step == 0:
+                self._store_results(results, sampling_idx, state_vars, output_indices)
+                sampling_idx += 1
+
+        self.vars['y'] = state_vars
+        times = np.arange(0, T, dts)
+
+        return times, results
+
+    def _integrate_rk(self, rhs_func, func_args, T, dt, dts, t, output_indices, tableau):
+
+        sampling_step = int(np.round(dts / dt, decimals=0))
+        sampling_steps = int(np.round(T / dts, decimals=0))
+        steps = int(np.round(T / dt, decimals=0))
+
+        # initialize results storage vectors
+        results = self._allocate_results(output_indices, sampling_steps)
+
+        # preallocate stage buffers
+        state_vars = self.vars['y']
+        a, b, c = [coefs.astype(state_vars.dtype) for coefs in tableau]
+        k = np.zeros((len(b), state_vars.shape[0]), dtype=state_vars.dtype)
+        y_tmp = np.zeros_like(k[0])
+        dy = np.zeros_like(k[0])
+
+        # solve via pyrates internal explicit runge-kutta algorithm
+        sampling_idx = 0
+        t0 = float(t)
+        for i in range(steps):
+            for s in range(len(b)):
+                if s == 0:
+                    y_tmp[:] = state_vars
+                else:
+                    np.dot(a[s, :s], k[:s], out=dy)
+                    dy *= dt
+                    np.add(state_vars, dy, out=y_tmp)
+                k[s, :] = rhs_func(t0 + min((i + c[s]) * dt, T), y_tmp, func_args)
+            t += dt
+            np.dot(b, k, out=dy)
+            dy *= dt
+            state_vars += dy
             if i % sampling_step == 0:
-                for idx1, idx2 in enumerate(output_indices):
-                    results[idx1][sampling_idx, :] = state_vars[idx2[0]:idx2[1]] if type(idx2) is tuple \
-                        else state_vars[idx2]
+                self._store_results(results, sampling_idx, state_vars, output_indices)
                 sampling_idx += 1
 
         self.vars['y'] = state_vars
@@ -1958,6 +3244,241 @@ class NumpyBackend(object):
 
         return times, results
 
+    def _integrate_rk45(self, rhs_func, func_args, T, dt, dts, t, output_indices, rtol=1e-3, atol=1e-6,
+                        max_step=np.inf, min_step=1e-12):
+
+        # initialize results storage vectors. Like the fixed step-size solvers, the k-th sample is the state after the
+        # first integration step of size dt, that follows time k*dts.
+        times = np.arange(0, T, dts)
+        results = self._allocate_results(output_indices, len(times))
+        sampling_times = np.minimum(times + dt, T)
+
+        # preallocate stage buffers
+        state_vars = self.vars['y']
+        a, b, c, e = [coefs.astype(state_vars.dtype) for coefs in self._rk45_tableau]
+        k = np.zeros((len(b), state_vars.shape[0]), dtype=state_vars.dtype)
+        y_tmp = np.zeros_like(k[0])
+        y_new = np.zeros_like(k[0])
+        dy = np.zeros_like(k[0])
+
+        # solve via pyrates internal dormand-prince algorithm with adaptive step-size
+        t0 = float(t)
+        t_rel = 0.
+        h = dt
+        k[0, :] = rhs_func(t0, state_vars, func_args)
+        sampling_idx = 0
+        while t_rel < T:
+
+            # perform runge-kutta step (the last stage is the derivative at the new point)
+            h = min(h, T - t_rel, max_step)
+            for s in range(1, len(b)-1):
+                np.dot(a[s, :s], k[:s], out=dy)
+                dy *= h
+                np.add(state_vars, dy, out=y_tmp)
+                k[s, :] = rhs_func(t0 + t_rel + c[s] * h, y_tmp, func_args)
+            np.dot(b, k, out=dy)
+            dy *= h
+            np.add(state_vars, dy, out=y_new)
+            k[-1, :] = rhs_func(t0 + t_rel + h, y_new, func_args)
+
+            # estimate the local error
+            scale = atol + rtol * np.maximum(np.abs(state_vars), np.abs(y_new))
+            np.dot(e, k, out=dy)
+            dy *= h
+            error = np.sqrt(np.mean((dy / scale)**2))
+
+            if error <= 1.:
+
+                # store outputs via cubic hermite interpolation between old and new state
+                sampling_end = np.searchsorted(sampling_times, t_rel + h, side='right')
+                if sampling_end > sampling_idx:
+                    theta = ((sampling_times[sampling_idx:sampling_end] - t_rel) / h)[:, None]
+                    y_out = (2*theta**3 - 3*theta**2 + 1) * state_vars + (-2*theta**3 + 3*theta**2) * y_new + \
+                        h * (theta**3 - 2*theta**2 + theta) * k[0] + h * (theta**3 - theta**2) * k[-1]
+                    for idx1, idx2 in enumerate(output_indices):
+                        results[idx1][sampling_idx:sampling_end, :] = y_out[:, idx2[0]:idx2[1]] \
+                            if type(idx2) is tuple else y_out[:, idx2].reshape((theta.shape[0], -1))
+                    sampling_idx = sampling_end
+
+                # accept step
+                t_rel += h
+                state_vars[:] = y_new
+                k[0, :] = k[-1]
+                h *= 5. if error == 0. else min(5., max(0.2, 0.9 * error ** -0.2))
+
+            else:
+
+                # reject step
+                h *= max(0.2, 0.9 * error ** -0.2)
+
+            if h < min_step:
+                raise ValueError(f'Step-size of the adaptive solver fell below the minimum step-size {min_step} at '
+                                 f'time {t0 + t_rel}. Consider increasing the tolerances `rtol` or `atol`.')
+
+        # samples at the end of the simulation that were missed due to round-off errors in the step-sizes
+        for idx in range(sampling_idx, len(times)):
+            self._store_results(results, idx, state_vars, output_indices)
+
+        t += t_rel
+        self.vars['y'] = state_vars
+
+        return times, results
+
+    def _allocate_results(self, output_indices, sampling_steps):
+        """Allocates a single array with one column per output variable and node, and returns one view on its columns
+        per output index.
+        """
+        out_cols, n_cols = [], 0
+        for idx in output_indices:
+            if type(idx) is tuple:
+                var_dim = idx[1]-idx[0]
+            elif type(idx) is list:
+                var_dim = len(idx)
+            else:
+                var_dim = 1
+            out_cols.append((n_cols, n_cols + var_dim))
+            n_cols += var_dim
+        results = self._allocate_output_block(sampling_steps, n_cols)
+        return [results[:, c0:c1] for c0, c1 in out_cols]
+
+    def _allocate_output_block(self, sampling_steps: int, n_cols: int) -> np.ndarray:
+        """Allocates the array that collects all outputs of a simulation. If an output file was passed to `run`, the
+        array is memory-mapped onto this file (`.npy` format), such that the outputs are written to disk while the
+        simulation proceeds and do not need to fit into memory.
+        """
+        if self._out_file and self._resume_from and os.path.isfile(self._out_file):
+            results = np.lib.format.open_memmap(self._out_file, mode='r+')
+            if results.shape != (sampling_steps, n_cols):
+                raise ValueError(f'The output file {self._out_file} of the resumed simulation has shape '
+                                 f'{results.shape}, but the outputs have shape {(sampling_steps, n_cols)}.')
+            return results
+        if self._out_file:
+            return np.lib.format.open_memmap(self._out_file, mode='w+', dtype=np.float64,
+                                             shape=(sampling_steps, n_cols))
+        return np.zeros((sampling_steps, n_cols))
+
+    def _get_fingerprint(self, T: float, dt: float) -> str:
+        """Creates a hash of the generated right-hand side evaluation, the simulation time and the integration step
+        size, which identifies the simulation a checkpoint belongs to.
+        """
+        key = sha256(self._rhs_source.encode('utf-8'))
+        key.update(np.asarray([T, dt], dtype=np.float64).tobytes())
+        return key.hexdigest()
+
+    def _write_checkpoint(self, fn: str, func_args: list, results: list, step: int, steps: int,
+                          sampling_idx: int, fingerprint: str) -> None:
+        """Writes a checkpoint of a running simulation (see `NumpyBackend.to_file`) that contains the integration step,
+        the number of stored output samples, the fingerprint of the simulation (see `NumpyBackend._get_fingerprint`)
+        and the outputs collected so far. Outputs that are collected in an output file are flushed to it instead.
+        """
+        block = results[0].base if results else None
+        checkpoint = {'step': step, 'steps': steps, 'sampling_idx': sampling_idx, 'fingerprint': fingerprint}
+        if isinstance(block, np.memmap):
+            block.flush()
+        elif block is not None:
+            checkpoint['results'] = block[:sampling_idx]
+        self.to_file(fn, func_args, **checkpoint)
+
+    def _resume(self, fn: str, func_args: list, results: list, steps: int, fingerprint: str) -> tuple:
+        """Restores the simulation state from a checkpoint (see `NumpyBackend._write_checkpoint`) and returns the
+        integration step and the index of the next output sample to continue from. The checkpoint has to belong to a
+        simulation of the same network with the same simulation time and integration step size.
+        """
+        with np.load(fn) as f:
+            steps_checkpoint = int(f['steps'])
+            fingerprint_checkpoint = str(f['fingerprint']) if 'fingerprint' in f.files else None
+        if steps_checkpoint != steps:
+            raise ValueError(f'The checkpoint {fn} belongs to a simulation of {steps_checkpoint} integration '
+                             f'steps, but {steps} steps were requested.')
+        if fingerprint_checkpoint != fingerprint:
+            raise ValueError(f'The checkpoint {fn} belongs to a different network or to a simulation with a different '
+                             f'simulation time or integration step size.')
+        checkpoint = self.from_file(fn, func_args)
+        step, sampling_idx = int(checkpoint['step']), int(checkpoint['sampling_idx'])
+        block = results[0].base if results else None
+        if 'results' in checkpoint:
+            block[:sampling_idx] = checkpoint['results']
+        elif block is not None and getattr(block, 'mode', None) != 'r+':
+            raise ValueError(f'The checkpoint {fn} does not contain the outputs of the simulation. Pass the output '
+                             f'file of the interrupted simulation via `out_file`.')
+        return step, sampling_idx
+
+    @staticmethod
+    def _collapse_index(idx: list) -> Union[list, tuple]:
+        """Collapses a list of ascending, contiguous indices into a `(start, stop)` tuple, such that the indexed part of
+        the state vector can be extracted via a basic slice (a view) instead of fancy indexing (a copy).
+        """
+        if len(idx) > 0 and all(np.diff(idx, n=1) == 1):
+            return idx[0], idx[-1]+1
+        return idx
+
+    @staticmethod
+    def _store_results(results, sampling_idx, state_vars, output_indices):
+        for idx1, idx2 in enumerate(output_indices):
+            results[idx1][sampling_idx, :] = state_vars[idx2[0]:idx2[1]] if type(idx2) is tuple \
+                else state_vars[idx2]
+
+    def _integrate_fused(self, func_args, T, dt, dts, t, output_indices):
+
+        (rhs_loop_jit, rhs_loop), update_indices = self._rhs_loop
+
+        sampling_step = int(np.round(dts / dt, decimals=0))
+        sampling_steps = int(np.round(T / dts, decimals=0))
+        steps = int(np.round(T / dt, decimals=0))
+
+        # precompute contiguous ranges of the state vector (start, stop, results column) for all output variables
+        out_ranges, out_cols, n_cols = [], [], 0
+        for idx in output_indices:
+            if type(idx) is tuple:
+                ranges = [idx]
+            elif type(idx) is list:
+                ranges = [(i, i+1) for i in idx]
+            else:
+                ranges = [(idx, idx+1)]
+            out_cols.append((n_cols, n_cols + sum([stop - start for start, stop in ranges])))
+            for start, stop in ranges:
+                if out_ranges and out_ranges[-1][1] == start:
+                    out_ranges[-1][1] = stop
+                else:
+                    out_ranges.append([start, stop, n_cols])
+                n_cols += stop - start
+        out_ranges = np.asarray(out_ranges, dtype=np.int64).reshape((-1, 3))
+        results = self._allocate_output_block(sampling_steps, n_cols)
+
+        # solve via fused explicit euler algorithm (one call of the integration loop per block of streamed inputs)
+        state_vars = self.vars['y']
+        block_steps = self._input_block if self._input_streams else steps
+        for step in range(0, steps, block_steps):
+            if self._input_streams:
+                self._read_input_block(func_args, step)
+            loop_args = [arg.view(np.ndarray) if isinstance(arg, np.ndarray) else arg
+                         for idx, arg in enumerate(func_args) if idx not in self._packed] + self._arenas
+            loop_args = (float(t), state_vars.view(np.ndarray), dt, min(block_steps, steps - step), sampling_step,
+                         out_ranges, results.view(np.ndarray)[step // sampling_step:]) + \
+                tuple(loop_args)
+            t_new, updates = None, None
+            if rhs_loop_jit is not None:
+                from numba.core.errors import NumbaError
+                try:
+                    t_new, updates = rhs_loop_jit(*loop_args)
+                except NumbaError as e:
+                    warnings.warn(f'WARNING! JIT-compilation of the fused integration loop via numba failed. Falling '
+                                  f'back to the pure python integration loop. Numba error message: {e}')
+                    self._rhs_loop = ((None, rhs_loop), update_indices)
+                    rhs_loop_jit = None
+            if t_new is None:
+                t_new, updates = rhs_loop(*loop_args)
+
+            # write updated system parameters and time back
+            for idx, val in zip(update_indices, updates):
+                func_args[idx] = val
+            t[()] = t_new
+
+        self.vars['y'] = state_vars
+        times = np.arange(0, T, dts)
+
+        return times, [results[:, c0:c1] for c0, c1 in out_cols]
+
     def _match_shapes(self, op1: Any, op2: Any, adjust_second: bool = True) -> tuple:
         """Re-shapes op1 and op2 such that they can be combined via mathematical operations.
 
@@ -2044,6 +3565,18 @@ class NumpyBackend(object):
             # cast op2 to dtype of op1 referred from its type string
             return op1, self.add_op('cast', op2, str(type(op1)))
 
+    @staticmethod
+    def _restore_var(value: np.ndarray, name: Optional[str], short_name: Optional[str],
+                     vtype: Optional[str]) -> np.ndarray:
+        """Restores a variable of a saved compiled network (see `NumpyBackend.load_compiled`). Arrays without a name
+        (e.g. buffers) are restored as plain arrays.
+        """
+        if name is None:
+            return value
+        var = value.view(NumpyVar)
+        var.name, var.short_name, var.vtype = name, short_name, vtype
+        return var
+
     def _create_var(self, vtype, dtype, shape, value, name, squeeze=True):
         return NumpyVar(vtype=vtype, dtype=dtype, shape=shape, value=value, name=name, backend=self, squeeze=squeeze)
 
@@ -2309,8 +3842,80 @@ def extract_lhs_var(eq_str: str) -> str:
     """
 
     lhs = eq_str.split("=")[0]
-    lhs = lhs.replace(" ", "")
+    lhs = lhs.replace(" ", "").rstrip("+-*/%@&|^<>")
     if "[" in lhs:
         idx = lhs.index("[")
         lhs = lhs[:idx]
     return lhs
+
+
+def get_cache_dir() -> str:
+    """Returns the directory of the persistent build cache. It can be set via the environment variable
+    `PYRATES_CACHE_DIR` and defaults to `pyrates` in the user cache directory.
+    """
+    cache_dir = os.environ.get('PYRATES_CACHE_DIR')
+    if not cache_dir:
+        user_cache = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+        cache_dir = os.path.join(user_cache, 'pyrates')
+    return cache_dir
+
+
+def build_cache_enabled() -> bool:
+    """Returns whether the persistent build cache is enabled via the environment variable `PYRATES_BUILD_CACHE`
+    (e.g. `PYRATES_BUILD_CACHE=1`). The cache is disabled by default.
+    """
+    return os.environ.get('PYRATES_BUILD_CACHE', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_build_key(source: str, backend: str, dtype: str) -> str:
+    """Creates the key of a build cache entry from the generated source code, the backend, the default data-type and
+    the versions of python, numpy and pyrates, such that compiled extensions are never loaded by incompatible builds.
+    """
+    from pyrates import __version__
+    key = sha256()
+    for s in (backend, dtype, sys.version, np.__version__, __version__, source):
+        key.update(s.encode('utf-8'))
+        key.update(b'\0')
+    return key.hexdigest()
+
+
+def cached_build(key: str, fn: str, source: Optional[str] = None, build: Optional[Callable] = None) -> tuple:
+    """Looks up a file in the persistent build cache and creates it, if it does not exist yet.
+
+    Parameters
+    ----------
+    key
+        Key of the build cache entry (see `get_build_key`).
+    fn
+        Name of the file in the build cache entry.
+    source
+        Source code that is written to the file, if no `build` function is passed.
+    build
+        Function that receives a temporary directory and creates the file `fn` in it (e.g. by compiling `source`).
+
+    Returns
+    -------
+    tuple
+        Path to the cached file and a boolean that indicates whether the file already existed in the cache.
+
+    """
+
+    directory = os.path.join(get_cache_dir(), key)
+    path = os.path.join(directory, fn)
+    if os.path.exists(path):
+        return path, True
+
+    # create the file in a temporary directory and move it into the cache afterwards, such that processes that compile
+    # the same model at the same time never load a partially written file
+    os.makedirs(directory, exist_ok=True)
+    tmp_dir = mkdtemp(dir=directory)
+    try:
+        if build:
+            build(tmp_dir)
+        else:
+            with open(os.path.join(tmp_dir, fn), 'w') as f:
+                f.write(source)
+        os.replace(os.path.join(tmp_dir, fn), path)
+    finally:
+        rmtree(tmp_dir, ignore_errors=True)
+    return path, False
@@ -0,0 +1,1117 @@
+# -*- coding: utf-8 -*-
+#
+#
+# PyRates software framework for flexible implementation of neural
+# network model_templates and simulations. See also:
+# https://github.com/pyrates-neuroscience/PyRates
+#
+# Copyright (C) 2017-2018 the original authors (Richard Gast and
+# Daniel Rose), the Max-Planck-Institute for Human Cognitive Brain
+# Sciences ("MPI CBS") and contributors
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>
+#
+# CITATION:
+#
+# Richard Gast and Daniel Rose et. al. in preparation
+
+"""Contains optimization passes over the equations of the right-hand side evaluation generated by the backends. They
+remove equations that do not affect the state variables, perform common sub-expression elimination, hoist expressions
+that depend on constants only out of the right-hand side evaluation, let numpy operations write their results into
+pre-allocated buffers, split element-wise operations into chunks that can be evaluated concurrently, pack constants
+into contiguous memory blocks and stabilize the types of variables for JIT compilers.
+
+"""
+
+# external imports
+import ast
+from collections import Counter
+from copy import deepcopy
+from typing import Iterable, Optional, Callable
+import numpy as np
+
+# meta infos
+__author__ = "Richard Gast"
+__status__ = "development"
+
+
+# code generation from syntax trees
+###################################
+
+_bin_ops = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.FloorDiv: '//', ast.Mod: '%', ast.Pow: '**',
+            ast.MatMult: '@', ast.BitAnd: '&', ast.BitOr: '|', ast.BitXor: '^', ast.LShift: '<<', ast.RShift: '>>'}
+_unary_ops = {ast.USub: '-', ast.UAdd: '+', ast.Not: 'not ', ast.Invert: '~'}
+_cmp_ops = {ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Is: 'is',
+            ast.IsNot: 'is not', ast.In: 'in', ast.NotIn: 'not in'}
+_bool_ops = {ast.And: 'and', ast.Or: 'or'}
+
+
+def to_code(node: ast.AST) -> str:
+    """Translates a syntax tree of an equation (or an expression) back into a code string. Only supports the syntax
+    elements that are used in generated equations. Raises a ValueError for all other syntax elements.
+    """
+
+    if isinstance(node, ast.Assign):
+        return f"{' = '.join([to_code(t) for t in node.targets])} = {to_code(node.value)}"
+    if isinstance(node, ast.AugAssign):
+        return f"{to_code(node.target)} {_bin_ops[type(node.op)]}= {to_code(node.value)}"
+    if isinstance(node, ast.Expr):
+        return to_code(node.value)
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Constant):
+        return repr(node.value)
+    if isinstance(node, ast.Attribute):
+        return f"{to_code(node.value)}.{node.attr}"
+    if isinstance(node, ast.Call):
+        args = [to_code(arg) for arg in node.args]
+        args += [f"{kw.arg}={to_code(kw.value)}" if kw.arg else f"**{to_code(kw.value)}" for kw in node.keywords]
+        return f"{to_code(node.func)}({', '.join(args)})"
+    if isinstance(node, ast.BinOp) and type(node.op) in _bin_ops:
+        return f"({to_code(node.left)} {_bin_ops[type(node.op)]} {to_code(node.right)})"
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _unary_ops:
+        return f"({_unary_ops[type(node.op)]}{to_code(node.operand)})"
+    if isinstance(node, ast.Compare):
+        code = to_code(node.left)
+        for op, comp in zip(node.ops, node.comparators):
+            code += f" {_cmp_ops[type(op)]} {to_code(comp)}"
+        return f"({code})"
+    if isinstance(node, ast.BoolOp):
+        return f"({f' {_bool_ops[type(node.op)]} '.join([to_code(v) for v in node.values])})"
+    if isinstance(node, ast.IfExp):
+        return f"({to_code(node.body)} if {to_code(node.test)} else {to_code(node.orelse)})"
+    if isinstance(node, ast.Subscript):
+        return f"{to_code(node.value)}[{_slice_to_code(node.slice)}]"
+    if isinstance(node, ast.Tuple):
+        return f"({', '.join([to_code(e) for e in node.elts])}{',' if len(node.elts) == 1 else ''})"
+    if isinstance(node, ast.List):
+        return f"[{', '.join([to_code(e) for e in node.elts])}]"
+    if isinstance(node, ast.Starred):
+        return f"*{to_code(node.value)}"
+    raise ValueError(f'Syntax element cannot be translated into code: {ast.dump(node)}')
+
+
+def _slice_to_code(node: ast.AST) -> str:
+    if isinstance(node, getattr(ast, 'Index', ())):
+        return _slice_to_code(node.value)
+    if isinstance(node, ast.Slice):
+        code = f"{to_code(node.lower) if node.lower else ''}:{to_code(node.upper) if node.upper else ''}"
+        return f"{code}:{to_code(node.step)}" if node.step else code
+    if isinstance(node, getattr(ast, 'ExtSlice', ())):
+        return ', '.join([_slice_to_code(d) for d in node.dims])
+    if isinstance(node, ast.Tuple):
+        return ', '.join([_slice_to_code(e) for e in node.elts]) if node.elts else '()'
+    return to_code(node)
+
+
+# equation analysis
+###################
+
+_expr_types = (ast.Call, ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp, ast.Subscript)
+_pure_types = _expr_types + (ast.Name, ast.Constant, ast.Attribute, ast.Slice, ast.Tuple, ast.List, ast.IfExp,
+                             ast.keyword, ast.expr_context, ast.operator, ast.unaryop, ast.cmpop, ast.boolop) + \
+    tuple(getattr(ast, t) for t in ('Index', 'ExtSlice') if hasattr(ast, t))
+
+
+def _is_pure_call(node: ast.Call) -> bool:
+    """Calls of numpy functions (except for random number generators) and of pyrates backend functions are pure.
+    """
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id.startswith('pr_')
+    chain = []
+    while isinstance(func, ast.Attribute):
+        chain.append(func.attr)
+        func = func.value
+    return isinstance(func, ast.Name) and func.id == 'np' and 'random' not in chain
+
+
+def _is_pure(node: ast.AST) -> bool:
+    for n in ast.walk(node):
+        if not isinstance(n, _pure_types) or (isinstance(n, ast.Call) and not _is_pure_call(n)):
+            return False
+    return True
+
+
+def _is_literal(node: ast.AST) -> bool:
+    return all([not isinstance(n, (ast.Name, ast.Call, ast.Subscript, ast.Attribute)) for n in ast.walk(node)])
+
+
+def _is_expression(node: ast.AST) -> bool:
+    """Checks whether a syntax tree node is a pure, non-literal expression that is worth to be computed only once.
+    """
+    return isinstance(node, _expr_types) and not _is_literal(node) and _is_pure(node)
+
+
+def _n_ops(node: ast.AST) -> int:
+    return sum([isinstance(n, _expr_types) and not _is_literal(n) for n in ast.walk(node)])
+
+
+def _names(node: ast.AST) -> set:
+    """Returns the names of all variables that are read by an expression (function names are excluded).
+    """
+    if isinstance(node, ast.Name):
+        return {node.id} if isinstance(node.ctx, ast.Load) else set()
+    names = set()
+    for field, value in ast.iter_fields(node):
+        if isinstance(node, ast.Call) and field == 'func':
+            continue
+        for v in (value if isinstance(value, list) else [value]):
+            if isinstance(v, ast.AST):
+                names |= _names(v)
+    return names
+
+
+_view_funcs = ('pr_identity', 'asarray', 'asanyarray', 'reshape', 'transpose', 'squeeze', 'ravel', 'expand_dims',
+               'swapaxes', 'moveaxis', 'broadcast_to', 'diagonal', 'real', 'imag', 'atleast_1d', 'atleast_2d',
+               'atleast_3d', 'flip', 'fliplr', 'flipud', 'rot90')
+
+
+def _alias_names(node: ast.AST) -> set:
+    """Returns the names of all variables that might share memory with the result of an expression.
+    """
+    if isinstance(node, ast.Name):
+        return _names(node)
+    if isinstance(node, (ast.Subscript, ast.Attribute, ast.Starred)):
+        return _alias_names(node.value)
+    if isinstance(node, ast.IfExp):
+        return _alias_names(node.body) | _alias_names(node.orelse)
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return set().union(*[_alias_names(e) for e in node.elts])
+    if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp)) or _is_literal(node):
+        return set()
+    if isinstance(node, ast.Call) and any([kw.arg == 'out' for kw in node.keywords]):
+        return _alias_names([kw.value for kw in node.keywords if kw.arg == 'out'][0])
+    if isinstance(node, ast.Call) and _is_pure_call(node):
+        func = node.func.id if isinstance(node.func, ast.Name) else node.func.attr
+        if func not in _view_funcs:
+            return set()
+    return _names(node)
+
+
+def _base_name(node: ast.AST) -> Optional[str]:
+    while isinstance(node, (ast.Subscript, ast.Attribute, ast.Starred)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _stores(stmt: ast.stmt) -> tuple:
+    """Returns the names that are re-bound by a statement and the names whose values are changed in place.
+    """
+    rebound, changed = set(), set()
+    if isinstance(stmt, ast.Assign):
+        targets = []
+        for t in stmt.targets:
+            targets += t.elts if isinstance(t, (ast.Tuple, ast.List)) else [t]
+        for t in targets:
+            if isinstance(t, ast.Name):
+                rebound.add(t.id)
+            else:
+                changed.add(_base_name(t))
+    elif isinstance(stmt, ast.AugAssign):
+        changed.add(_base_name(stmt.target))
+    else:
+        # calls might change any variable they refer to, including the objects of method calls
+        changed |= set([n.id for n in ast.walk(stmt) if isinstance(n, ast.Name)])
+    changed.discard(None)
+    return rebound, changed
+
+
+class _MemoryModel:
+    """Keeps track of which variables might refer to the same memory, and of a version counter per variable that is
+    increased whenever the value of the variable changes.
+    """
+
+    def __init__(self):
+        self.roots = {}
+        self.versions = Counter()
+        self._n = 0
+
+    def get_roots(self, name: str) -> set:
+        return self.roots.setdefault(name, {name})
+
+    def store(self, stmt: ast.stmt) -> tuple:
+        """Processes the variable changes of a statement. Returns all variables whose values changed and the subset of
+        variables whose values were changed in place.
+        """
+        rebound, changed = _stores(stmt)
+        value = getattr(stmt, 'value', None)
+        reads = _alias_names(value) if value is not None else set()
+
+        # values changed in place affect all variables that might share their memory
+        changed_roots = set()
+        for name in changed:
+            changed_roots |= self.get_roots(name)
+        changed |= set([name for name, roots in self.roots.items() if roots & changed_roots])
+
+        # re-bound variables might refer to the memory of the variables they were computed from
+        self._n += 1
+        new_roots = set([f"{name}#{self._n}" for name in rebound])
+        for name in reads:
+            new_roots |= self.get_roots(name)
+        for name in rebound:
+            self.roots[name] = new_roots
+
+        affected = changed | rebound
+        for name in affected:
+            self.versions[name] += 1
+        return affected, changed
+
+    def key(self, node: ast.AST) -> tuple:
+        return ast.dump(node), tuple(sorted([(name, self.versions[name]) for name in _names(node)]))
+
+
+def _transform(node: ast.AST, func: Callable) -> ast.AST:
+    """Applies `func` to all nodes of a syntax tree (top-down). If `func` returns a node, it replaces the original node
+    and its children are not visited.
+    """
+    new = func(node)
+    if new is not None:
+        return new
+    for field, value in ast.iter_fields(node):
+        if isinstance(value, list):
+            setattr(node, field, [_transform(v, func) if isinstance(v, ast.AST) else v for v in value])
+        elif isinstance(value, ast.AST):
+            setattr(node, field, _transform(value, func))
+    return node
+
+
+# optimization
+##############
+
+def find_live_equations(eq_lines: list, live_vars: Iterable[str]) -> list:
+    """Finds the equations of a right-hand side evaluation that (directly or indirectly) affect a set of variables.
+    Variables that are changed by an equation might be read before the equation within the next evaluation, thus the
+    order of the equations is not considered. Equations that cannot be analyzed are always considered live.
+
+    Parameters
+    ----------
+    eq_lines
+        Equations of the right-hand side evaluation, one code string per line.
+    live_vars
+        Names of the variables that have to be computed (e.g. the vector of state variable derivatives).
+
+    Returns
+    -------
+    list
+        Boolean for each equation that indicates whether the equation is live.
+
+    """
+
+    writes, reads = [], []
+    for line in eq_lines:
+        try:
+            stmt = ast.parse(line.strip()).body[0]
+        except SyntaxError:
+            writes.append(None)
+            reads.append(set())
+            continue
+        rebound, changed = _stores(stmt)
+        writes.append(rebound | changed)
+        reads.append(_names(stmt))
+
+    live_vars = set(live_vars)
+    live = [w is None for w in writes]
+    for i in range(len(eq_lines)):
+        if live[i]:
+            live_vars |= reads[i]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(eq_lines)):
+            if not live[i] and writes[i] & live_vars:
+                live[i] = changed = True
+                live_vars |= reads[i]
+
+    return live
+
+
+def find_constants(eq_lines: list, names: Iterable[str]) -> list:
+    """Finds the variables that are neither re-bound nor changed in place by the equations of a right-hand side
+    evaluation, neither directly nor via variables that might refer to the same memory. If the equations cannot be
+    analyzed, no variable is considered constant.
+
+    Parameters
+    ----------
+    eq_lines
+        Equations of the right-hand side evaluation, one code string per line.
+    names
+        Names of the variables to check.
+
+    Returns
+    -------
+    list
+        Names of the variables that are constant.
+
+    """
+
+    try:
+        stmts = [ast.parse(line.strip()).body[0] for line in eq_lines]
+    except SyntaxError:
+        return []
+
+    memory, changed = _MemoryModel(), set()
+    for stmt in stmts:
+        affected, _ = memory.store(stmt)
+        changed |= affected
+
+    return [name for name in names if name not in changed]
+
+
+def optimize_equations(eq_lines: list, constants: Iterable[str]) -> tuple:
+    """Optimizes the equations of a right-hand side evaluation:
+
+        1) Expressions that depend on constants only (i.e. on parameters that are not changed by the equations) are
+           hoisted out of the equations. They are replaced by new constants `_inv<i>`, which have to be evaluated
+           once, before the equations are evaluated.
+        2) Expressions that are evaluated multiple times with the same variable values are evaluated only once. The
+           result is either stored in a new variable `_cse<i>` or, if available, taken from a variable the expression
+           has been assigned to before.
+
+    Only calls of numpy and pyrates backend functions as well as arithmetic, comparison and indexing operations are
+    considered by the optimization.
+
+    Parameters
+    ----------
+    eq_lines
+        Equations of the right-hand side evaluation, one code string per line.
+    constants
+        Names of the parameters of the right-hand side evaluation that can be treated as constants, if the equations
+        do not change them.
+
+    Returns
+    -------
+    tuple
+        Optimized equations, list of (name, code string) tuples of the hoisted expressions and a dictionary with the
+        total number of operations and the number of operations removed via hoisting and via common sub-expression
+        elimination.
+
+    """
+
+    stats = {'ops': 0, 'invariant': 0, 'cse': 0}
+    try:
+        stmts = [ast.parse(line.strip()).body[0] for line in eq_lines]
+        for stmt in stmts:
+            to_code(stmt)
+    except (SyntaxError, ValueError, KeyError, IndexError):
+        return list(eq_lines), [], stats
+    stats['ops'] = sum([_n_ops(getattr(stmt, 'value', stmt)) for stmt in stmts])
+
+    # analyze which variables are changed by the equations
+    ######################################################
+
+    memory, rebound, changed = _MemoryModel(), set(), set()
+    for stmt in stmts:
+        affected, changed_tmp = memory.store(stmt)
+        rebound |= affected - changed_tmp
+        changed |= changed_tmp
+
+    # constants that are neither re-bound nor changed in place by the equations
+    constants = set([c for c in constants if c not in rebound and c not in changed])
+
+    # equations whose right-hand side may be optimized. Variables that are changed in place must not share memory with
+    # the results of hoisted or eliminated expressions.
+    optimize = [hasattr(stmt, 'value') and not (isinstance(stmt, ast.Assign) and
+                                                any([isinstance(t, ast.Name) and t.id in changed
+                                                     for t in stmt.targets]))
+                for stmt in stmts]
+
+    # hoist expressions that depend on constants only
+    #################################################
+
+    hoisted = {}
+
+    def hoist(node):
+        if _is_expression(node) and _names(node) <= constants:
+            code = to_code(node)
+            if code not in hoisted:
+                hoisted[code] = f"_inv{len(hoisted)}"
+            stats['invariant'] += _n_ops(node)
+            return ast.Name(id=hoisted[code], ctx=ast.Load())
+        return None
+
+    modified = [False for _ in stmts]
+    for i, stmt in enumerate(stmts):
+        if optimize[i]:
+            n = stats['invariant']
+            stmt.value = _transform(stmt.value, hoist)
+            modified[i] = stats['invariant'] > n
+
+    # eliminate common sub-expressions
+    ##################################
+
+    # count how often each expression is evaluated with the same variable values
+    memory, counts = _MemoryModel(), Counter()
+    for i, stmt in enumerate(stmts):
+        if optimize[i]:
+            for node in ast.walk(stmt.value):
+                if _is_expression(node):
+                    counts[memory.key(node)] += 1
+        memory.store(stmt)
+
+    # replace repeated evaluations by variables that hold the result of their first evaluation
+    memory, available, temps, eq_lines_new = _MemoryModel(), {}, [], []
+    for i, stmt in enumerate(stmts):
+
+        n_temps = len(temps)
+
+        def reuse(node):
+            if _is_expression(node):
+                key = memory.key(node)
+                if key in available:
+                    stats['cse'] += _n_ops(node)
+                    return ast.Name(id=available[key], ctx=ast.Load())
+            return None
+
+        def eliminate(node):
+            if not _is_expression(node):
+                return None
+            key = memory.key(node)
+            if key in available or counts[key] < 2:
+                return reuse(node)
+            name = f"_cse{len(temps)}"
+            temps.append(ast.parse(f"{name} = {to_code(_transform(node, reuse))}").body[0])
+            memory.store(temps[-1])
+            available[key] = name
+            return ast.Name(id=name, ctx=ast.Load())
+
+        holder = None
+        if optimize[i]:
+            n = stats['cse']
+            key = memory.key(stmt.value)
+            target = stmt.targets[0] if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 else None
+            if isinstance(target, ast.Name) and target.id not in _names(stmt.value) and \
+                    _is_expression(stmt.value) and key not in available and counts[key] > 1:
+                # the variable the expression is assigned to holds its result
+                holder = (key, target.id)
+                stmt.value = _transform(stmt.value, lambda node: reuse(node) if node is not stmt.value else None)
+            else:
+                stmt.value = _transform(stmt.value, eliminate)
+            modified[i] = modified[i] or stats['cse'] > n or len(temps) > n_temps
+
+        # keep track of changed variables and remove results that are not up-to-date anymore
+        affected, _ = memory.store(stmt)
+        for key in [key for key, name in available.items() if name in affected]:
+            available.pop(key)
+        if holder:
+            available[holder[0]] = holder[1]
+
+        eq_lines_new += [to_code(t) for t in temps[n_temps:]]
+        eq_lines_new.append(to_code(stmt) if modified[i] else eq_lines[i].strip())
+
+    return eq_lines_new, [(name, code) for code, name in hoisted.items()], stats
+
+
+def allocate_buffers(eq_lines: list, namespace: dict, persistent: Iterable[str]) -> tuple:
+    """Lets numpy ufunc calls and dot products of a right-hand side evaluation write their results into pre-allocated
+    buffers instead of allocating new arrays at each evaluation. Results that are assigned to a slice of a variable
+    (e.g. of the vector of state variable derivatives) are directly written into that slice. The shapes and data types
+    of the buffers are obtained by evaluating the equations once within `namespace`, which is changed by the
+    evaluation.
+
+    Parameters
+    ----------
+    eq_lines
+        Equations of the right-hand side evaluation, one code string per line.
+    namespace
+        Namespace that contains all variables that are read by the equations.
+    persistent
+        Names of variables whose values are kept across evaluations of the right-hand side (i.e. that are written back
+        to the parameters). Their values must not share memory with any buffer.
+
+    Returns
+    -------
+    tuple
+        Equations that pass the buffers as output arguments to the operations and a list of (name, buffer) tuples.
+
+    """
+
+    try:
+        stmts = [ast.parse(line.strip()).body[0] for line in eq_lines]
+        for stmt in stmts:
+            to_code(stmt)
+    except (SyntaxError, ValueError, KeyError, IndexError):
+        return list(eq_lines), []
+
+    # find ufunc calls and dot products and evaluate them once
+    ##########################################################
+
+    calls, values, targets = [], {}, {}
+
+    def mark(node):
+        if isinstance(node, ast.Call) and not node.keywords and _is_pure_call(node):
+            try:
+                func = eval(to_code(node.func), namespace)
+            except Exception:
+                return None
+            if (isinstance(func, np.ufunc) and func.nout == 1 and len(node.args) == func.nin) or \
+                    (func is np.dot and len(node.args) == 2):
+                node.buffer_idx = len(calls)
+                calls.append(node)
+        return None
+
+    def wrap(node):
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                setattr(node, field, [wrap(v) if isinstance(v, ast.AST) else v for v in value])
+            elif isinstance(value, ast.AST):
+                setattr(node, field, wrap(value))
+        if hasattr(node, 'buffer_idx'):
+            return ast.Call(func=ast.Name(id='_trace', ctx=ast.Load()),
+                            args=[ast.Constant(value=node.buffer_idx), node], keywords=[])
+        return node
+
+    def trace(idx, value):
+        values[idx] = value
+        return value
+
+    namespace['_trace'] = trace
+    for stmt in stmts:
+        _transform(stmt, mark)
+        try:
+            exec(to_code(wrap(deepcopy(stmt))), namespace)
+        except Exception:
+            continue
+
+        # results that can be written directly into a slice of their target variable
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Subscript) \
+                and hasattr(stmt.value, 'buffer_idx') and stmt.value.buffer_idx in values:
+            target = stmt.targets[0]
+            slices = target.slice.dims if isinstance(target.slice, getattr(ast, 'ExtSlice', ())) else \
+                target.slice.elts if isinstance(target.slice, ast.Tuple) else [target.slice]
+            if all([isinstance(s, ast.Slice) for s in slices]):
+                try:
+                    target_val = eval(to_code(target), namespace)
+                except Exception:
+                    continue
+                val = values[stmt.value.buffer_idx]
+                if isinstance(target_val, np.ndarray) and isinstance(val, np.ndarray) and \
+                        target_val.shape == val.shape and target_val.dtype == val.dtype and \
+                        target_val.flags['C_CONTIGUOUS']:
+                    targets[stmt.value.buffer_idx] = target
+    namespace.pop('_trace')
+
+    # operations with array results receive an output buffer
+    candidates = set([idx for idx, val in values.items() if isinstance(val, np.ndarray) and val.ndim > 0
+                      and val.dtype != object and idx not in targets])
+
+    # choose buffers that cannot be referred to by persistent variables
+    ###################################################################
+
+    def add_outputs(stmt, buffers):
+        def add_output(node):
+            if not hasattr(node, 'buffer_idx'):
+                return node
+            if node.buffer_idx in targets:
+                node.keywords = [ast.keyword(arg='out', value=deepcopy(targets[node.buffer_idx]))]
+            elif node.buffer_idx in buffers:
+                node.keywords = [ast.keyword(arg='out', value=ast.Name(id=buffers[node.buffer_idx], ctx=ast.Load()))]
+            return node
+        stmt = deepcopy(stmt)
+        for node in ast.walk(stmt):
+            add_output(node)
+        if getattr(getattr(stmt, 'value', None), 'buffer_idx', None) in targets:
+            stmt = ast.Expr(value=stmt.value)
+        return stmt
+
+    while True:
+        buffers = dict([(idx, f"_buf{i}") for i, idx in enumerate(sorted(candidates))])
+        stmts_new = [add_outputs(stmt, buffers) for stmt in stmts]
+        memory = _MemoryModel()
+        for stmt in stmts_new:
+            memory.store(stmt)
+        unsafe = set()
+        for name in persistent:
+            unsafe |= memory.get_roots(name)
+        unsafe = set([idx for idx, name in buffers.items() if name in unsafe])
+        if not unsafe:
+            break
+        candidates -= unsafe
+
+    # generate code. Output buffers are passed as positional arguments (required by numba).
+    ######################################################################################
+
+    eq_lines_new = []
+    for line, stmt in zip(eq_lines, stmts_new):
+        modified = False
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Call) and node.keywords and node.keywords[0].arg == 'out':
+                node.args.append(node.keywords[0].value)
+                node.keywords = []
+                modified = True
+        eq_lines_new.append(to_code(stmt) if modified else line.strip())
+
+    return eq_lines_new, [(buffers[idx], np.zeros(values[idx].shape, dtype=values[idx].dtype))
+                          for idx in sorted(candidates)]
+
+
+def parallelize_equations(eq_lines: list, namespace: dict, n_chunks: int, min_size: int) -> tuple:
+    """Splits sequences of element-wise operations of a right-hand side evaluation into chunks along the first
+    dimension of their results, such that the chunks can be evaluated concurrently (e.g. via a thread pool, since numpy
+    releases the GIL while evaluating ufuncs). Only equations that consist of numpy ufunc calls with output arguments
+    (see `allocate_buffers`) are split. Consecutive equations of that kind, whose results have the same size of the
+    first dimension (at least `min_size`) and that do not access overlapping memory differently, form a block. For
+    each block, a function `_chunk<i>(_lo, _hi, _args)` is generated that evaluates the equations on the slices
+    `_lo:_hi` of the arrays in `_args`. These functions are meant to be defined once at module level, i.e. outside of
+    the right-hand side evaluation. The block itself is replaced by a call of `_pmap` (a function with the signature of
+    `map`) that evaluates all chunks of the block and passes the arrays to the chunk function. The shapes of the
+    arguments are obtained by evaluating the equations once within `namespace`, which is changed by the evaluation.
+
+    Parameters
+    ----------
+    eq_lines
+        Equations of the right-hand side evaluation, one code string per line.
+    namespace
+        Namespace that contains all variables that are read by the equations.
+    n_chunks
+        Number of chunks per block.
+    min_size
+        Minimum size of the first dimension of the results of a block.
+
+    Returns
+    -------
+    tuple
+        Code lines of the equations, code lines of the chunk functions (their bodies are indented by a tab) and the
+        number of equations that are evaluated in chunks.
+
+    """
+
+    try:
+        stmts = [ast.parse(line.strip()).body[0] for line in eq_lines]
+        for stmt in stmts:
+            to_code(stmt)
+    except (SyntaxError, ValueError, KeyError, IndexError):
+        return list(eq_lines), [], 0
+
+    # find equations that consist of element-wise operations with output arguments
+    ##############################################################################
+
+    def collect(node, calls, leaves):
+        if isinstance(node, ast.Call):
+            if node.keywords or not _is_pure_call(node):
+                return False
+            try:
+                func = eval(to_code(node.func), namespace)
+            except Exception:
+                return False
+            if not isinstance(func, np.ufunc) or func.nout != 1 or len(node.args) != func.nin + 1:
+                return False
+            calls.append(node)
+            return all([collect(arg, calls, leaves) for arg in node.args])
+        if isinstance(node, ast.Subscript):
+            slices = node.slice.dims if isinstance(node.slice, getattr(ast, 'ExtSlice', ())) else \
+                node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+            if not isinstance(node.value, ast.Name) or not all([isinstance(s, ast.Slice) for s in slices]):
+                return False
+        elif not isinstance(node, ast.Name) and not _is_literal(node):
+            return False
+        leaves.append(node)
+        return True
+
+    def analyze(stmt):
+        """Returns the size of the first dimension of the results of an equation and the arrays it accesses, if the
+        equation can be split into chunks. Arguments that have to be sliced are marked.
+        """
+        if isinstance(stmt, ast.Assign):
+            if len(stmt.targets) != 1 or not isinstance(stmt.targets[0], ast.Name):
+                return None
+        elif not isinstance(stmt, ast.Expr):
+            return None
+        calls, leaves = [], []
+        if not isinstance(stmt.value, ast.Call) or not collect(stmt.value, calls, leaves):
+            return None
+        try:
+            outs = [eval(to_code(call.args[-1]), namespace) for call in calls]
+            values = [eval(to_code(leaf), namespace) for leaf in leaves]
+        except Exception:
+            return None
+        if not all([isinstance(out, np.ndarray) and out.ndim > 0 for out in outs]):
+            return None
+        n, ndim = outs[0].shape[0], outs[0].ndim
+        if n < min_size or any([out.ndim != ndim or out.shape[0] != n for out in outs]):
+            return None
+        arrays = []
+        for leaf, val in zip(leaves, values):
+            if isinstance(val, np.ndarray):
+                if val.dtype.kind == 'O' or val.ndim > ndim or (val.ndim == ndim and val.shape[0] not in (1, n)):
+                    return None
+                leaf.chunked = val.ndim == ndim and val.shape[0] == n
+                arrays.append((val, leaf.chunked, any([leaf is call.args[-1] for call in calls])))
+            elif not np.isscalar(val):
+                return None
+        return n, arrays
+
+    def conflict(arrays, others):
+        """Checks whether an array is written and accessed by different chunks (i.e. via different views or without
+        slicing).
+        """
+        for a, a_chunked, a_written in arrays:
+            for b, b_chunked, b_written in others:
+                if (a_written or b_written) and np.may_share_memory(a, b) and \
+                        not (a_chunked and b_chunked and a.shape == b.shape and a.strides == b.strides and
+                             a.__array_interface__['data'][0] == b.__array_interface__['data'][0]):
+                    return True
+        return False
+
+    infos = []
+    for stmt in stmts:
+        infos.append(analyze(stmt))
+        try:
+            exec(to_code(stmt), namespace)
+        except Exception:
+            infos[-1] = None
+
+    # group equations into blocks and generate code
+    ###############################################
+
+    blocks, block = [], []
+    for i, info in enumerate(infos):
+        if info and block and info[0] == infos[block[0]][0] and \
+                not conflict(info[1], [a for j in block for a in infos[j][1]] + info[1]):
+            block.append(i)
+        else:
+            if block:
+                blocks.append(block)
+            block = [i] if info and not conflict(info[1], info[1]) else []
+    if block:
+        blocks.append(block)
+
+    assigned = {}
+
+    def chunk(node):
+        """Slices the arguments of a chunk. Variables that have been assigned to within the block are replaced by the
+        output arguments they refer to.
+        """
+        if isinstance(node, ast.Name) and node.id in assigned:
+            node = deepcopy(assigned[node.id])
+            if not getattr(node, 'chunked', False):
+                return node
+        if getattr(node, 'chunked', False):
+            return ast.Subscript(value=node, slice=ast.Slice(lower=ast.Name(id='_lo', ctx=ast.Load()),
+                                                             upper=ast.Name(id='_hi', ctx=ast.Load()), step=None),
+                                 ctx=ast.Load())
+        return None
+
+    def arrays_of(node, names):
+        """Collects the names of the variables a chunk reads or writes (the called functions are module attributes).
+        """
+        if isinstance(node, ast.Call):
+            for arg in node.args:
+                arrays_of(arg, names)
+        elif isinstance(node, ast.Name):
+            if node.id not in names and node.id not in ('_lo', '_hi'):
+                names.append(node.id)
+        else:
+            for child in ast.iter_child_nodes(node):
+                arrays_of(child, names)
+        return names
+
+    lines, funcs = [line.strip() for line in eq_lines], []
+    for k, block in reversed(list(enumerate(blocks))):
+
+        n = infos[block[0]][0]
+        chunks = []
+        assigned.clear()
+        for i in block:
+            chunks.append(_transform(deepcopy(stmts[i].value), chunk))
+            if isinstance(stmts[i], ast.Assign):
+                assigned[stmts[i].targets[0].id] = stmts[i].value.args[-1]
+        names = []
+        for node in chunks:
+            arrays_of(node, names)
+        arrays = f"({', '.join(names)})" if len(names) > 1 else f"({names[0]},)"
+
+        bounds = np.linspace(0, n, min(n_chunks, n) + 1).astype(int).tolist()
+        funcs = [f"def _chunk{k}(_lo, _hi, _args):", f"\t{arrays} = _args"] + \
+                [f"\t{to_code(node)}" for node in chunks] + funcs
+        block_lines = [f"list(_pmap(_chunk{k}, {tuple(bounds[:-1])}, {tuple(bounds[1:])}, "
+                       f"({arrays},) * {len(bounds) - 1}))"] + \
+                      [f"{stmts[i].targets[0].id} = {to_code(stmts[i].value.args[-1])}" for i in block
+                       if isinstance(stmts[i], ast.Assign)]
+        lines[block[0]:block[-1]+1] = block_lines
+
+    return lines, funcs, sum([len(block) for block in blocks])
+
+
+def _broadcasts_to(shape: tuple, target: tuple) -> bool:
+    try:
+        return np.broadcast_shapes(shape, target) == target
+    except ValueError:
+        return False
+
+
+def _init_buffer(name: str, value, result, rebind: bool) -> list:
+    """Returns the code lines that convert the value of an argument into a variable of the type of the results that
+    are assigned to it (in place or, if `rebind` is true, by re-assignment).
+    """
+    shape, dtype = np.shape(result), result.dtype
+    if rebind and isinstance(result, np.generic):
+        if isinstance(value, np.ndarray) and value.size > 0:
+            return [f"{name} = np.{dtype.name}({name}.ravel()[0])"]
+        return [f"{name} = np.{dtype.name}(0)"]
+    if isinstance(value, np.ndarray) and value.dtype == dtype and (value.ndim == len(shape) if rebind else
+                                                                    value.shape == shape):
+        return []
+    if isinstance(value, np.ndarray) and value.size == 1:
+        return [f"{name} = np.full({shape}, {name}.ravel()[0], np.{dtype.name})"]
+    if isinstance(value, np.ndarray) and shape and _broadcasts_to(value.shape, shape):
+        return [f"{name} = np.broadcast_to({name}, {shape}).astype(np.{dtype.name})"]
+    if isinstance(value, (np.generic, int, float)):
+        return [f"{name} = np.full({shape}, {name}, np.{dtype.name})"]
+    return [f"{name} = np.zeros({shape}, np.{dtype.name})"]
+
+
+def stabilize_types(eq_lines: list, namespace: dict, arguments: Iterable[str]) -> tuple:
+    """Rewrites the equations of a right-hand side evaluation, such that the type of each variable stays the same
+    across evaluations and equals the type numpy would produce. This is required by JIT compilers that infer one type
+    per variable, such as numba in nopython mode, if the equations are evaluated within a loop:
+
+    - Variables in `arguments` that are re-assigned by an equation are written into in place (`x[...] = ...`). If the
+      result differs from the argument in shape or data type, a buffer of the result type is created once before the
+      evaluation, which is initialized with the value of the argument. Results that might share memory with other
+      variables (e.g. views) and variables that other variables might refer to are still re-assigned, and only the
+      initial value of the argument is converted.
+    - Scalar arguments of element-wise operations are cast to the data type of the numpy result, since JIT compilers
+      do not apply the value-based casting of numpy (e.g. `float32 array * 2.0` is a `float32` array in numpy).
+    - Sums over tuples (`np.sum((a, b), 0)`) are replaced by additions, lists of indices by slices or index arrays and
+      indexing with two index arrays by indexing of the flattened array.
+
+    The types of the variables are obtained by evaluating the equations once within `namespace`, which is changed by
+    the evaluation. Equations that cannot be evaluated are not changed.
+
+    Parameters
+    ----------
+    eq_lines
+        Equations of the right-hand side evaluation, one code string per line.
+    namespace
+        Namespace that contains all variables that are read by the equations.
+    arguments
+        Names of the variables that are passed into the evaluation (and whose final values are read after it).
+
+    Returns
+    -------
+    tuple
+        Code lines of the rewritten equations and code lines that have to be evaluated once before the equations
+        (creation of buffers and index arrays).
+
+    """
+
+    try:
+        stmts = [ast.parse(line.strip()).body[0] for line in eq_lines]
+        for stmt in stmts:
+            to_code(stmt)
+    except (SyntaxError, ValueError, KeyError, IndexError):
+        return list(eq_lines), []
+
+    arguments = set(arguments)
+    preamble, buffers = [], {}
+
+    def evaluate(node):
+        return eval(to_code(node), namespace)
+
+    def parse(code):
+        return ast.parse(code, mode='eval').body
+
+    def dtype_of(val):
+        if isinstance(val, (np.ndarray, np.generic)):
+            return val.dtype
+        if isinstance(val, (bool, int, float)):
+            return np.asarray(val).dtype
+        return None
+
+    def cast(node, inputs):
+        """Casts scalar inputs of an element-wise operation to the data type of its numpy result.
+        """
+        try:
+            vals = [evaluate(arg) for arg in inputs]
+            dtype = dtype_of(evaluate(node))
+        except Exception:
+            return
+        dtypes = [dtype_of(val) for val in vals]
+        if dtype is None or dtype.kind not in 'iuf' or any([d is None or d.kind not in 'biuf' for d in dtypes]) or \
+                np.result_type(*dtypes) == dtype:
+            return
+        for arg, val, d in zip(inputs, vals, dtypes):
+            if d != dtype and not (isinstance(val, np.ndarray) and val.ndim > 0):
+                code = f"{to_code(arg)}[()]" if isinstance(val, np.ndarray) else to_code(arg)
+                yield arg, parse(f"np.{dtype.name}({code})")
+
+    def index(node):
+        """Replaces lists of indices by slices (contiguous indices) or by index arrays that are created once.
+        """
+        if isinstance(node, getattr(ast, 'Index', ())):
+            node = node.value
+        if not isinstance(node, ast.List) or not node.elts or \
+                not all([isinstance(e, ast.Constant) and type(e.value) is int for e in node.elts]):
+            return None
+        idx = [e.value for e in node.elts]
+        if all(np.diff(idx) == 1) and idx[0] >= 0:
+            return ast.Slice(lower=ast.Constant(value=idx[0]), upper=ast.Constant(value=idx[-1]+1), step=None)
+        name = f"_idx{len([line for line in preamble if line.startswith('_idx')])}"
+        preamble.append(f"{name} = np.asarray({idx}, dtype=np.int64)")
+        namespace[name] = np.asarray(idx, dtype=np.int64)
+        return ast.Name(id=name, ctx=ast.Load())
+
+    def stabilize(node):
+        """Rewrites an expression bottom-up.
+        """
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                setattr(node, field, [stabilize(v) if isinstance(v, ast.AST) else v for v in value])
+            elif isinstance(value, ast.AST):
+                setattr(node, field, stabilize(value))
+
+        if isinstance(node, ast.Subscript):
+            new = index(node.slice)
+            if new is not None:
+                node.slice = new
+            elif isinstance(node.slice, ast.Tuple) and len(node.slice.elts) == 2 and isinstance(node.ctx, ast.Load):
+                try:
+                    val, idx = evaluate(node.value), [evaluate(e) for e in node.slice.elts]
+                except Exception:
+                    return node
+                if isinstance(val, np.ndarray) and val.ndim == 2 and \
+                        all([isinstance(i, np.ndarray) and i.ndim > 0 and i.dtype.kind in 'iu' for i in idx]):
+                    i, j = [to_code(e) for e in node.slice.elts]
+                    arr = to_code(node.value)
+                    return parse(f"{arr}.ravel()[np.add(np.multiply({i}, {arr}.shape[1]), {j})]")
+
+        elif isinstance(node, ast.Call) and not node.keywords:
+            if to_code(node.func) == 'np.sum' and len(node.args) == 2 and isinstance(node.args[0], ast.Tuple) and \
+                    len(node.args[0].elts) > 1 and isinstance(node.args[1], ast.Constant) and node.args[1].value == 0:
+                new = node.args[0].elts[0]
+                for elt in node.args[0].elts[1:]:
+                    new = stabilize(ast.Call(func=parse('np.add'), args=[new, elt], keywords=[]))
+                return new
+            try:
+                func = evaluate(node.func)
+            except Exception:
+                return node
+            if isinstance(func, np.ufunc) and func.nout == 1 and len(node.args) in (func.nin, func.nin + 1):
+                inputs = node.args[:func.nin]
+                for arg, new in list(cast(ast.Call(func=node.func, args=inputs, keywords=[]), inputs)):
+                    node.args[node.args.index(arg)] = new
+
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod,
+                                                                  ast.FloorDiv, ast.Pow)):
+            for arg, new in list(cast(node, [node.left, node.right])):
+                if arg is node.left:
+                    node.left = new
+                else:
+                    node.right = new
+
+        return node
+
+    # evaluate the equations twice first, such that the namespace contains the types that the variables have after
+    # the first evaluations (e.g. of variables that refer to results of later equations)
+    initial = dict([(name, namespace.get(name)) for name in arguments])
+    for _ in range(2):
+        for stmt in stmts:
+            try:
+                exec(to_code(stmt), namespace)
+            except Exception:
+                pass
+
+    # variables that other variables might refer to cannot be written into in place
+    shared = set()
+    for stmt in stmts:
+        if isinstance(stmt, ast.Assign):
+            shared |= _alias_names(stmt.value)
+
+    lines = []
+    for stmt in stmts:
+
+        # rewrite the expressions of the equation, then evaluate the original equation
+        new = stabilize(deepcopy(stmt))
+        if isinstance(new, ast.Assign) and len(new.targets) == 1 and isinstance(new.targets[0], ast.Subscript):
+
+            # single elements are assigned to via basic slices, if the assigned value is an array
+            t = new.targets[0]
+            idx = t.slice.value if isinstance(t.slice, getattr(ast, 'Index', ())) else t.slice
+            try:
+                val = evaluate(new.value)
+            except Exception:
+                val = None
+            if isinstance(idx, ast.Constant) and type(idx.value) is int and idx.value >= 0 and \
+                    isinstance(val, np.ndarray) and val.ndim > 0:
+                t.slice = ast.Slice(lower=ast.Constant(value=idx.value), upper=ast.Constant(value=idx.value+1),
+                                    step=None)
+        target = stmt.targets[0].id if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and \
+            isinstance(stmt.targets[0], ast.Name) else None
+        try:
+            exec(to_code(stmt), namespace)
+        except Exception:
+            lines.append(to_code(stmt))
+            continue
+        if target not in arguments or not isinstance(namespace[target], (np.ndarray, np.generic)):
+            lines.append(to_code(new))
+            continue
+
+        # write re-assigned arguments into buffers of the result type. Results that might share memory with other
+        # variables and variables that other variables might refer to are re-assigned instead, such that both keep
+        # their numpy semantics.
+        result = namespace[target]
+        rebind = target in shared or bool(_alias_names(stmt.value))
+        key = (rebind, np.ndim(result) if rebind else np.shape(result), result.dtype)
+        if target not in buffers:
+            buffers[target] = key
+            preamble += _init_buffer(target, initial[target], result, rebind)
+        if buffers[target] == key and not rebind:
+            lines.append(f"{target}[...] = {to_code(new.value)}")
+            namespace[target] = np.array(result)
+        else:
+            lines.append(to_code(new))
+
+    return lines, preamble
+
+
+def pack_arrays(arrays: list, alignment: int = 64) -> tuple:
+    """Copies numpy arrays into contiguous memory blocks (arenas), one per data type. Each array starts at a memory
+    address that is a multiple of `alignment` bytes.
+
+    Parameters
+    ----------
+    arrays
+        Numpy arrays that should be packed.
+    alignment
+        Alignment of the arrays within the arenas in bytes.
+
+    Returns
+    -------
+    tuple
+        List of arenas (one-dimensional arrays) and a list with one (arena index, start, stop) tuple per array, such
+        that `arenas[i][start:stop].reshape(shape)` is a view on the packed copy of the array.
+
+    """
+
+    dtypes, sizes, layout = [], [], []
+    for arr in arrays:
+        if arr.dtype not in dtypes:
+            dtypes.append(arr.dtype)
+            sizes.append(0)
+        i = dtypes.index(arr.dtype)
+        step = max(1, alignment // arr.dtype.itemsize)
+        start = -(-sizes[i] // step) * step
+        layout.append((i, start, start + arr.size))
+        sizes[i] = start + arr.size
+
+    arenas = []
+    for dtype, size in zip(dtypes, sizes):
+        buffer = np.zeros(size * dtype.itemsize + alignment, dtype=np.uint8)
+        offset = -buffer.ctypes.data % alignment
+        arenas.append(buffer[offset:offset + size * dtype.itemsize].view(dtype))
+    for arr, (i, start, stop) in zip(arrays, layout):
+        arenas[i][start:stop] = np.ravel(arr)
+
+    return arenas, layout
@@ -32,6 +32,7 @@
 # external imports
 from typing import Optional, Dict, Callable, List, Any, Union
 import tensorflow as tf
+import warnings
 
 # pyrates internal imports
 from .funcs import *
@@ -80,6 +81,7 @@ class TensorflowVar(NumpyVar, tf.Variable):
 class TensorflowOp(PyRatesOp):
 
     var_class = TensorflowVar
+    constants_to_num = True
 
     def _generate_func(self):
         """Generates a function from operator value and arguments"""
@@ -124,6 +126,7 @@ class TensorflowOp(PyRatesOp):
 class TensorflowAssignOp(PyRatesAssignOp):
 
     var_class = TensorflowVar
+    constants_to_num = True
 
     def _generate_func(self):
         """Generates a function from operator value and arguments"""
@@ -182,6 +185,7 @@ class TensorflowAssignOp(PyRatesAssignOp):
 class TensorflowIndexOp(PyRatesIndexOp):
 
     var_class = TensorflowVar
+    constants_to_num = True
 
     def _generate_func(self):
         """Generates a function from operator value and arguments"""
@@ -231,15 +235,36 @@ class TensorflowBackend(NumpyBackend):
     imports
         Can be used to pass additional import statements that are needed for code generation of the custom functions
         provided via `ops`. Will be added to the top of each generated code file.
+    kwargs
+        Additional keyword arguments that are passed on to `NumpyBackend` (e.g. `build_dir`).
 
     """
 
+    # scatter updates at a variable index are not supported by the tensorflow backend
+    ring_buffer = False
+
+    # inputs are stored in tensorflow variables that are traced into the compiled run function
+    reuse_compiled = False
+
+    # the equations are made of tensorflow operations and variable assignments that the optimization does not support
+    optimize_rhs = False
+    inplace_ops = False
+
+    # the arguments of the right-hand side evaluation are tensorflow variables
+    pack_constants = False
+
+    # inputs are stored in tensorflow variables for the complete simulation time instead of being read block-wise
+    input_block_size = None
+
+    unsupported_optimizations = ('ring_buffer', 'reuse_compiled', 'optimize_rhs', 'inplace_ops', 'pack_constants')
+
     def __init__(self,
                  ops: Optional[Dict[str, Callable]] = None,
                  dtypes: Optional[Dict[str, object]] = None,
                  name: str = 'net_0',
                  float_default_type: str = 'float32',
                  imports: Optional[List[str]] = None,
+                 **kwargs
                  ) -> None:
         """Instantiates tensorflow backend, i.e. a tensorflow graph.
         """
@@ -247,7 +272,7 @@ class TensorflowBackend(NumpyBackend):
         if not imports:
             imports = ["import tensorflow as tf"]
 
-        super().__init__(ops, dtypes, name, float_default_type, imports)
+        super().__init__(ops, dtypes, name, float_default_type, imports, **kwargs)
 
         # define operations and datatypes of the backend
         ################################################
@@ -257,7 +282,7 @@ class TensorflowBackend(NumpyBackend):
                          "-": {'name': "tensorflow_subtract", 'call': "tf.subtract"},
                          "*": {'name': "tensorflow_multiply", 'call': "tf.multiply"},
                          "/": {'name': "tensorflow_divide", 'call': "tf.math.divide_no_nan"},
-                         "%": {'name': "tensorflow_modulo", 'call': "tf.mod"},
+                         "%": {'name': "tensorflow_modulo", 'call': "tf.math.floormod"},
                          "^": {'name': "tensorflow_power", 'call': "tf.pow"},
                          "**": {'name': "tensorflow_power", 'call': "tf.pow"},
                          "@": {'name': "tensorflow_dot", 'call': "tf.matmul"},
@@ -313,6 +338,8 @@ class TensorflowBackend(NumpyBackend):
                          "group": {'name': "tensorflow_group", 'call': "tf.group"},
                          "stack": {'name': "tensorflow_stack", 'call': "tf.stack"},
                          "no_op": {'name': "tensorflow_identity", 'call': "tf.identity"},
+                         "segment_sum": {'name': "tensorflow_segment_sum", 'call': "tf.math.unsorted_segment_sum"},
+                         "sparse_dot": {'name': "pyrates_sparse_dot", 'call': ""},
                          })
 
         # base data types
@@ -346,7 +373,13 @@ class TensorflowBackend(NumpyBackend):
             Contains tuples of layer run functions and their respective arguments.
 
         """
-        return super().compile(build_dir=build_dir, decorator=decorator, **kwargs)
+        if kwargs.pop('fused', False):
+            warnings.warn('WARNING! A fused integration loop is not available for the Tensorflow backend. The '
+                          'standard integration loop is used instead.')
+        if kwargs.pop('n_threads', 1) > 1:
+            warnings.warn('WARNING! Multi-threaded right-hand side evaluations are not available for the Tensorflow '
+                          'backend. The right-hand side is evaluated by a single thread instead.')
+        return super().compile(build_dir=build_dir, decorator=decorator, fused=False, **kwargs)
 
     def broadcast(self, op1: Any, op2: Any, **kwargs) -> tuple:
 
@@ -402,6 +435,14 @@ class TensorflowBackend(NumpyBackend):
             inputs[i] = (np.asarray(inputs[i][0], dtype=inputs[i][1].dtype.as_numpy_dtype), inputs[i][1], inputs[i][2])
         return super().add_input_layer(inputs=inputs, T=T, continuous=False)
 
+    def set_var(self, var: Any, value: Any, idx: Optional[Any] = None) -> None:
+        val = np.array(var.numpy())
+        if idx is None:
+            val[...] = value
+        else:
+            val[idx] = value
+        var.assign(val)
+
     def apply_idx(self, var: Any, idx: Any, update: Optional[Any] = None, update_type: str = None, *args) -> Any:
         """Applies index to a variable. IF update is passed, variable is updated at positions indicated by index.
 
@@ -449,6 +490,9 @@ class TensorflowBackend(NumpyBackend):
 
     def _integrate(self, rhs_func, func_args, T, dt, dts, t, output_indices):
 
+        if self._checkpoint or self._resume_from:
+            raise ValueError('Checkpoints can only be written and resumed by the numpy backend.')
+
         sampling_steps = int(np.round(T / dts, decimals=0))
 
         # initialize results storage vectors
@@ -466,7 +510,15 @@ class TensorflowBackend(NumpyBackend):
                             sampling_steps=sampling_steps, results=results, sampling_idx=sampling_idx,
                             output_indices=output_indices)
 
-        results = np.asarray([r.numpy() for r in results])
+        # copy the results into the output file, if requested (the results are collected on the device first)
+        results = [r.numpy() for r in results]
+        if self._out_file and results:
+            results_tmp = self._allocate_results(output_indices, results[0].shape[0])
+            for r, r_tmp in zip(results, results_tmp):
+                r_tmp[:] = r
+            results = results_tmp
+        else:
+            results = np.asarray(results)
         times = np.arange(0, T, dts)
 
         return times, results
@@ -487,7 +539,10 @@ class TensorflowBackend(NumpyBackend):
             if tf.equal(tf.math.floormod(step, sampling_steps), zero):
 
                 for r, idx in zip(results, output_indices):
-                    r.scatter_nd_update([[sampling_idx, 0]], [state_vars[idx]])
+                    if type(idx) is tuple:
+                        r[sampling_idx, :].assign(state_vars[idx[0]:idx[1]])
+                    else:
+                        r.scatter_nd_update([[sampling_idx, 0]], [state_vars[idx]])
 
                 sampling_idx.assign_add(1)
 
@@ -120,8 +120,11 @@ class OperatorGraphTemplate(AbstractBaseTemplate):
         for template, variations in self.operators.items():
             values_to_update = variations
 
+            # copy the variations, such that value updates do not change the (cached) template
             if values_to_update is None:
                 values_to_update = {}
+            else:
+                values_to_update = dict(values_to_update)
             # if a value for this particular variation has been passed, overwrite the previous value
             if template.name in value_updates:
                 values_to_update.update(value_updates.pop(template.name))
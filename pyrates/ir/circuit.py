@@ -33,8 +33,10 @@ from typing import Union, Dict, Iterator, Optional, List, Tuple
 from warnings import filterwarnings
 from copy import deepcopy
 from networkx import MultiDiGraph, subgraph, DiGraph
-from pandas import DataFrame
+from pandas import DataFrame, Index
 import numpy as np
+import os
+import pickle
 
 # pyrates-internal imports
 from pyrates import PyRatesException
@@ -42,6 +44,7 @@ from pyrates.ir.node import NodeIR, VectorizedNodeIR
 from pyrates.ir.edge import EdgeIR
 from pyrates.ir.abc import AbstractBaseIR
 from pyrates.backend.parser import parse_equations, is_diff_eq, replace
+from pyrates.backend.numpy_backend import continuous_solvers, InputStream
 
 __author__ = "Daniel Rose, Richard Gast"
 __status__ = "Development"
@@ -53,7 +56,17 @@ class CircuitIR(AbstractBaseIR):
 
     # _node_label_grammar = Word(alphanums+"_") + Suppress(".") + Word(nums)
     __slots__ = ["label", "label_map", "graph", "sub_circuits", "_reference_map", "_buffered",
-                 "_first_run", "_vectorized", "_compiled", "_backend", "step_size", "solver", "_edge_idx_counter"]
+                 "_vectorized", "_compiled", "_backend", "step_size", "solver", "_edge_idx_counter", "_partitions",
+                 "_io_vars"]
+
+    # estimated costs (in ns) of a single evaluation of a vectorized edge projection for each of its realizations (see
+    # `CircuitIR._edge_projection_costs`), given as (call overhead, costs per dense matrix entry, costs per edge, costs
+    # per target variable). Fitted to `timeit` measurements of `np.dot` (dense), `scipy.sparse.csr_matrix.dot`
+    # (sparse) and `pr_segment_sum` over the indexed source variables (gather) for projections with 10 to 2000 source
+    # and target variables (numpy 1.23, single x86-64 core). Only their ratios affect the chosen realization.
+    edge_projection_costs = {'dense': (1500., 0.2, 0., 0.),
+                             'sparse': (6000., 0., 1.1, 6.),
+                             'gather': (4000., 0., 5., 0.)}
 
     def __init__(self, label: str = "circuit", circuits: dict = None, nodes: Dict[str, NodeIR] = None,
                  edges: list = None, template: str = None):
@@ -95,7 +108,6 @@ class CircuitIR(AbstractBaseIR):
         if edges:
             self.add_edges_from(edges)
 
-        self._first_run = True
         self._vectorized = False
         self._compiled = False
         self._backend = None
@@ -103,6 +115,8 @@ class CircuitIR(AbstractBaseIR):
         self.solver = None
         self.step_size = None
         self._edge_idx_counter = 0
+        self._partitions = None
+        self._io_vars = None
 
     def _collect_references(self, edge_or_node):
         """Collect all references of nodes or edges to unique operator_graph instances in local `_reference_map`.
@@ -577,9 +591,11 @@ class CircuitIR(AbstractBaseIR):
         return from_circuit(self)
 
     def optimize_graph_in_place(self, max_node_idx: int = 100000, vectorize: bool = True, dde_approx: float = 0.0,
-                                verbose: bool = True):
+                                verbose: bool = True, n_ensemble: int = 1, ensemble_params: Optional[dict] = None):
         """Restructures network graph to collapse nodes and edges that share the same operator graphs. Variable values
-        get an additional vector dimension. References to the respective index is saved in the internal `label_map`."""
+        get an additional vector dimension. References to the respective index is saved in the internal `label_map`.
+        If `n_ensemble` is larger than 1, the vectorized network is replicated `n_ensemble` times along the vector
+        dimension (see `CircuitIR.compile`)."""
 
         if verbose:
             print("Starting automatic optimization of the network graph:")
@@ -593,6 +609,12 @@ class CircuitIR(AbstractBaseIR):
         if verbose:
             print("    ...nodes in the network have been vectorized.")
 
+        # ensemble creation
+        if n_ensemble > 1 or ensemble_params:
+            self._add_ensemble_in_place(n_ensemble, ensemble_params)
+            if verbose:
+                print(f"    ...the network has been replicated for an ensemble of {n_ensemble} members.")
+
         # edge vectorization
         if vectorize:
             for source in self.nodes:
@@ -698,6 +720,68 @@ class CircuitIR(AbstractBaseIR):
 
         return old_nodes
 
+    def _add_ensemble_in_place(self, n_ensemble: int, ensemble_params: Optional[dict] = None):
+        """Replicates all vectorized nodes and their edges `n_ensemble` times along the vector dimension. The original
+        node keys in `label_map` are replaced by the keys of the ensemble members: '{circuit_label}_{k}/{node_key}'.
+
+        Parameters
+        ----------
+        n_ensemble
+            Number of ensemble members.
+        ensemble_params
+            Key-value pairs, where each key refers to a node variable of the original network ('node/op/var') and each
+            value contains one value of this variable per ensemble member.
+
+        Returns
+        -------
+        None
+        """
+
+        # extend the variable vectors of each node
+        node_sizes = {}
+        for node_key, data in self.nodes(data=True):
+            node = data['node']
+            node_sizes[node_key] = len(node)
+            for op_key in node.op_graph:
+                for var in node.op_graph.operators[op_key]['variables'].values():
+                    if type(var.get('value', None)) is list:
+                        var['value'] = var['value'] * n_ensemble
+                        var['shape'] = np.shape(var['value'])
+            node._length *= n_ensemble
+
+        # add edges between the nodes of each ensemble member
+        edges = list(self.edges(data=True))
+        for k in range(1, n_ensemble):
+            for source, target, edge_data in edges:
+                data_tmp = deepcopy(edge_data)
+                data_tmp['source_idx'] = [idx + k * node_sizes[source] for idx in edge_data['source_idx']]
+                data_tmp['target_idx'] = [idx + k * node_sizes[target] for idx in edge_data['target_idx']]
+                self.graph.add_edge(source, target, **data_tmp)
+
+        # map original node keys to the nodes of each ensemble member
+        label_map = {}
+        for k in range(n_ensemble):
+            for node_key, (vnode_key, vnode_idx) in self.label_map.items():
+                label_map[f"{self.label}_{k}/{node_key}"] = (vnode_key, vnode_idx + k * node_sizes[vnode_key])
+
+        # set the member-specific parameters
+        if ensemble_params:
+            for key, values in ensemble_params.items():
+                *node_key, op, var = key.split('/')
+                try:
+                    vnode_key, vnode_idx = self.label_map["/".join(node_key)]
+                except KeyError:
+                    raise KeyError(f'Invalid ensemble parameter: {key}. Could not find node {"/".join(node_key)} '
+                                   f'in the network.')
+                if len(values) != n_ensemble:
+                    raise ValueError(f'Invalid ensemble parameter: {key}. Number of values ({len(values)}) does not '
+                                     f'match the number of ensemble members ({n_ensemble}).')
+                var_values = self[vnode_key].op_graph.operators[op]['variables'][var]['value']
+                for k, val in enumerate(values):
+                    var_values[vnode_idx + k * node_sizes[vnode_key]] = val
+
+        self.label_map = label_map
+
     def _vectorize_edges_in_place(self, max_node_idx):
         """
 
@@ -1057,17 +1141,8 @@ class CircuitIR(AbstractBaseIR):
             # get mapping from original network nodes to vectorized network nodes
             #####################################################################
 
-            # split original node keys
-            node_keys = [key.split('/') for key in self.label_map]
-
-            # remove all nodes from original node keys that are not referred to
-            for i, node_lvl in enumerate(node):
-                n_popped = 0
-                if node_lvl != 'all':
-                    for j, net_node in enumerate(node_keys.copy()):
-                        if net_node[i] != node_lvl:
-                            node_keys.pop(j - n_popped)
-                            n_popped += 1
+            # split original node keys and remove all nodes that are not referred to
+            node_keys = self._filter_node_keys(node, list(self.label_map))
 
             # collect variable indices for the remaining nodes
             vnode_indices = {}
@@ -1101,6 +1176,35 @@ class CircuitIR(AbstractBaseIR):
 
             return vnode_indices
 
+    @staticmethod
+    def _filter_node_keys(node: list, node_keys: list) -> list:
+        """Returns all node keys that match a node specification, where each hierarchical level of the specification
+        refers either to a specific node name or to all nodes ('all') at that level.
+
+        Parameters
+        ----------
+        node
+            Node specification, split into its hierarchical levels.
+        node_keys
+            Keys of the nodes of the network.
+
+        Returns
+        -------
+        list
+            Matching node keys, split into their hierarchical levels.
+
+        """
+
+        node_keys = [key.split('/') for key in node_keys]
+        for i, node_lvl in enumerate(node):
+            n_popped = 0
+            if node_lvl != 'all':
+                for j, net_node in enumerate(node_keys.copy()):
+                    if net_node[i] != node_lvl:
+                        node_keys.pop(j - n_popped)
+                        n_popped += 1
+        return node_keys
+
     def run(self,
             simulation_time: Optional[float] = None,
             step_size: Optional[float] = None,
@@ -1111,10 +1215,20 @@ class CircuitIR(AbstractBaseIR):
             out_dir: Optional[str] = None,
             verbose: bool = True,
             profile: bool = False,
+            out_file: Optional[str] = None,
+            checkpoint_file: Optional[str] = None,
+            checkpoint_interval: Optional[float] = None,
+            resume_from: Optional[str] = None,
+            noise: Optional[dict] = None,
             **kwargs
             ) -> Union[DataFrame, Tuple[DataFrame, float]]:
         """Simulate the backend behavior over time via a tensorflow session.
 
+        Repeated calls continue the simulation from the final state of the previous call. With the numpy backend, the
+        compiled right-hand side evaluation is re-used as long as the solver type and the structure of the inputs
+        (target variables and input dimensions) do not change. New input values are then bound to the compiled function
+        without generating code again.
+
         Parameters
         ----------
         simulation_time
@@ -1126,7 +1240,10 @@ class CircuitIR(AbstractBaseIR):
             via the following format: 'node_name/op_name/var_nam'. Thereby, the node name can consist of multiple node
             levels for hierarchical networks and either refer to a specific node name ('../node_lvl_name/..') or to
             all nodes ('../all/..') at each level. Each value is an array that defines the input for the input variable
-            over time (first dimension).
+            over time (first dimension). Instead of an array, a callable `f(start, stop)` that returns the input
+            values of the time steps `start` to `stop` or an iterator that yields consecutive blocks of input values
+            can be passed. Such inputs and inputs with a single column that target multiple nodes are read in blocks
+            of time steps during the simulation (numpy backend, see `pyrates.backend.numpy_backend.InputStream`).
         outputs
             Output variables that will be returned. Each key is the desired name of an output variable and each value is
             a string that specifies a variable in the graph in the same format as used for the input definition:
@@ -1136,15 +1253,56 @@ class CircuitIR(AbstractBaseIR):
         solver
             Numerical solving scheme to use for differential equations. Currently supported ODE solving schemes:
             - 'euler' for the explicit Euler method
+            - 'euler_maruyama' for the Euler-Maruyama method, which adds gaussian noise to the state variables passed
+              via `noise` (numpy backend only)
+            - 'heun' (or 'rk2') for the explicit Heun method (2nd order Runge-Kutta)
+            - 'rk4' for the classic 4th order Runge-Kutta method
+            - 'rk45' for the Dormand-Prince method (embedded Runge-Kutta 4(5) method with adaptive step-size)
             - 'scipy' for integration via the `scipy.integrate.solve_ivp` method.
+            All solvers except 'euler' evaluate the right-hand side at intermediate time points and therefore require
+            the solver to be passed to `CircuitIR.compile` as well, if the network contains edge delays.
+            The 'rk45' solver accepts the keyword arguments `rtol`, `atol`, `max_step` and `min_step` and uses the
+            integration step-size only as initial step-size. The 'euler_maruyama' solver accepts the keyword argument
+            `seed` to seed its random number generator.
         out_dir
             Directory in which to store outputs.
         verbose
             If true, status updates will be printed to the console.
         profile
             If true, the total graph execution time will be printed and returned.
+        out_file
+            Path of a `.npy` file. If passed, the outputs are written into this file during the simulation (via a
+            memory-mapped array) instead of being collected in memory, and the returned dataframe is a view on the
+            memory-mapped file, i.e. its values are loaded lazily. The file can be re-opened via
+            `numpy.load(out_file, mmap_mode='r')`. Outputs are only kept in memory, if they need to be interpolated at
+            the sampling time points (see `sampling_step_size`).
+        checkpoint_file
+            Path of a file into which the complete simulation state (state variables, delay buffers, time, input index
+            and the outputs collected so far) is written every `checkpoint_interval` seconds of simulation time
+            (numpy backend and 'euler' solver only). Each checkpoint replaces the previous one atomically. Outputs that
+            are written into an `out_file` are not stored in the checkpoints.
+        checkpoint_interval
+            Simulation time in seconds between two checkpoints. If not passed, a single checkpoint is written at the end
+            of the simulation.
+        resume_from
+            Path of a checkpoint file (see `checkpoint_file`). The simulation continues from the state stored in this
+            file instead of starting at the initial state of the network. The network, `simulation_time`,
+            `step_size`, `inputs` and `outputs` have to be the same as for the interrupted simulation, which is then
+            continued bit-exactly. If the interrupted simulation wrote its outputs into an `out_file`, the same
+            `out_file` has to be passed again.
+        noise
+            Additive noise of state variables for the 'euler_maruyama' solver. Each key specifies a state variable in the
+            same format as used for the input definition and each value is the noise intensity of this variable, i.e.
+            the standard deviation of its gaussian increments per square root of a second. The intensity can be a scalar
+            or an array with one entry per node of the variable.
         kwargs
-            Keyword arguments that are passed on to the chosen solver.
+            Keyword arguments that are passed on to the chosen solver. For `solver='euler'`, pass `fused=True` to
+            generate a single integration loop that evaluates the right-hand side in-line and is JIT-compiled via
+            numba, if available (numpy backend only). Pass `n_threads` to evaluate element-wise operations over large
+            vectorized nodes in chunks by multiple threads (numpy backend compiled with `inplace_ops=True` only, see
+            `NumpyBackend.compile`).
+            Networks that were compiled with `n_partitions > 1` are simulated by one process per partition via the
+            'euler' solver (on platforms that support forking processes only). Such networks require `outputs`.
 
         Returns
         -------
@@ -1157,6 +1315,136 @@ class CircuitIR(AbstractBaseIR):
 
         filterwarnings("ignore", category=FutureWarning)
 
+        if self._partitions:
+            if out_file:
+                raise ValueError('Outputs of networks with multiple partitions cannot be written to an output file.')
+            if checkpoint_file or resume_from:
+                raise ValueError('Simulations of networks with multiple partitions cannot be checkpointed.')
+            if noise:
+                raise ValueError('Noise cannot be added to networks with multiple partitions.')
+            if inputs and not all([isinstance(val, np.ndarray) for val in inputs.values()]):
+                raise ValueError('Inputs of networks with multiple partitions have to be provided as arrays.')
+            return self._run_partitioned(simulation_time=simulation_time, step_size=step_size, inputs=inputs,
+                                         outputs=outputs, sampling_step_size=sampling_step_size, solver=solver,
+                                         out_dir=out_dir, verbose=verbose, profile=profile, **kwargs)
+
+        outputs, times, sim_time = self._run(simulation_time=simulation_time, step_size=step_size, inputs=inputs,
+                                             outputs=outputs, sampling_step_size=sampling_step_size, solver=solver,
+                                             out_dir=out_dir, verbose=verbose, profile=profile, out_file=out_file,
+                                             checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval,
+                                             resume_from=resume_from, noise=noise, **kwargs)
+
+        # create data frame (as a view on the output file, if its columns match the output variables)
+        out_data = np.load(out_file, mmap_mode='r') if out_file else None
+        if out_data is not None and out_data.shape == (len(times), len(outputs)):
+            out_vars = DataFrame(out_data, index=times, columns=Index(list(outputs)), copy=False)
+        else:
+            out_vars = DataFrame(outputs, index=times)
+
+        # return results
+        ################
+
+        if profile:
+            return out_vars, sim_time
+        return out_vars
+
+    def run_iter(self,
+                 simulation_time: float,
+                 block_time: float,
+                 step_size: Optional[float] = None,
+                 inputs: Optional[dict] = None,
+                 outputs: Optional[dict] = None,
+                 sampling_step_size: Optional[float] = None,
+                 solver: str = 'euler',
+                 as_frame: bool = True,
+                 verbose: bool = True,
+                 **kwargs
+                 ) -> Iterator[Union[DataFrame, tuple]]:
+        """Simulates the network in consecutive time blocks and yields the outputs of each block as soon as it has been
+        simulated. Only the outputs of a single block are kept in memory. The blocks are simulated via repeated calls
+        of the backend with the same compiled network, such that the state variables, delay buffers and the time
+        persist between blocks.
+
+        Parameters
+        ----------
+        simulation_time
+            Total simulation time in seconds.
+        block_time
+            Simulation time of a single block in seconds. It is rounded to a multiple of the sampling step-size. The
+            last block may be shorter.
+        step_size
+            Simulation step size in seconds.
+        inputs
+            Inputs for the complete simulation time (see `CircuitIR.run`). Each block receives the respective time
+            steps of each input.
+        outputs
+            Output variables (see `CircuitIR.run`).
+        sampling_step_size
+            Time in seconds between sampling points of the output variables.
+        solver
+            Numerical solving scheme (see `CircuitIR.run`).
+        as_frame
+            If true, the outputs of each block are yielded as a pandas dataframe. If false, a tuple is yielded that
+            contains the sampling time points of the block and a dictionary with one output array per column of the
+            dataframe.
+        verbose
+            If true, status updates will be printed to the console while the first block is simulated.
+        kwargs
+            Keyword arguments that are passed on to the chosen solver (see `CircuitIR.run`).
+
+        Yields
+        ------
+        Union[DataFrame, tuple]
+            Outputs of a single block, with time points relative to the start of the simulation.
+
+        """
+
+        filterwarnings("ignore", category=FutureWarning)
+
+        if self._partitions:
+            raise ValueError('Networks with multiple partitions cannot be simulated in blocks, since each simulation '
+                             'of such a network starts from its initial state.')
+
+        # determine the number of integration steps per block
+        if self.step_size is not None:
+            step_size = self.step_size
+        if step_size is None:
+            raise ValueError('Step-size not provided. Please pass the desired initial simulation step-size to '
+                             '`run_iter()`.')
+        sampling_step = int(np.round(sampling_step_size / step_size, decimals=0)) if sampling_step_size else 1
+        block_steps = max(int(np.round(block_time / (sampling_step * step_size), decimals=0)), 1) * sampling_step
+        steps = int(np.round(simulation_time / step_size, decimals=0))
+
+        # provide the respective time steps of each input to each block (inputs that are provided by callables or
+        # iterators are read once for all blocks)
+        inputs = {key: val if isinstance(val, (np.ndarray, InputStream)) else InputStream(val, steps)
+                  for key, val in inputs.items()} if inputs else {}
+
+        def block_input(val, start, stop):
+            if isinstance(val, np.ndarray):
+                return val[start:stop]
+            return InputStream(lambda t0, t1: val.read(start + t0, start + t1), stop - start)
+
+        # simulate the blocks
+        for start in range(0, steps, block_steps):
+            stop = min(start + block_steps, steps)
+            block_outputs, times, _ = self._run(simulation_time=(stop - start) * step_size, step_size=step_size,
+                                                inputs={key: block_input(val, start, stop)
+                                                        for key, val in inputs.items()},
+                                                outputs=outputs, sampling_step_size=sampling_step_size, solver=solver,
+                                                verbose=verbose and start == 0, **kwargs)
+            times = times + start * step_size
+            yield DataFrame(block_outputs, index=times) if as_frame else (times, block_outputs)
+
+    def _run(self, simulation_time: Optional[float] = None, step_size: Optional[float] = None,
+             inputs: Optional[dict] = None, outputs: Optional[dict] = None, sampling_step_size: Optional[float] = None,
+             solver: str = 'euler', out_dir: Optional[str] = None, verbose: bool = True, profile: bool = False,
+             noise: Optional[dict] = None, **kwargs) -> tuple:
+        """Simulates the network via the backend (see `CircuitIR.run` for a description of the arguments) and returns
+        a dictionary with one output array per output variable and node, the sampling time points and the simulation
+        time (None, if `profile` is false).
+        """
+
         if verbose:
             print("Simulation Progress")
             print("-------------------")
@@ -1167,12 +1455,6 @@ class CircuitIR(AbstractBaseIR):
         if verbose:
             print("Preparing the simulation:")
 
-        if not self._first_run:
-            self._backend.remove_layer(0)
-            self._backend.remove_layer(self._backend.top_layer())
-        else:
-            self._first_run = False
-
         # basic simulation parameters initialization
         if self.solver is not None:
             solver = self.solver
@@ -1195,34 +1477,25 @@ class CircuitIR(AbstractBaseIR):
             for key, val in outputs.items():
                 # extract respective output variables from the network and store their information
                 outputs_col[key] = [[var_info['idx'], var_info['nodes']]
-                                    for var_info in self.get_node_var(val, apply_idx=False).values()]
+                                    for var_info in self._get_io_vars(val).values()]
 
             if verbose:
                 print("    ...user-defined output variables are logged.")
 
-        # collect backend input variables
-        #################################
+        elif self._io_vars is not None:
 
-        inputs_col = []
+            raise ValueError('Networks that have been loaded via `load_compiled` can only be simulated with outputs.')
 
-        if inputs:
+        # collect backend input variables
+        #################################
 
-            # go through passed inputs
-            for key, val in inputs.items():
+        inputs_col = self._collect_inputs(inputs, sim_steps) if inputs else []
 
-                in_shape = val.shape[1] if len(val.shape) > 1 else 1
+        # collect backend noise variables
+        #################################
 
-                # extract respective input variable from the network
-                for var_key, var_info in self.get_node_var(key, apply_idx=False).items():
-                    var_shape = int(np.max(var_info['var'].shape)) if tuple(var_info['var'].shape) else 1
-                    var_idx = var_info['idx'] if var_shape > 1 else None
-                    var_idx_shape = len(var_idx) if var_idx else 1
-                    if var_idx_shape == in_shape:
-                        inputs_col.append((val, var_info['var'], var_idx))
-                    elif (var_idx_shape % in_shape) == 0:
-                        inputs_col.append((np.tile(val, (1, var_idx_shape)), var_info['var'], var_idx))
-                    else:
-                        inputs_col.append((np.reshape(val, (sim_steps, var_idx_shape)), var_info['var'], var_idx))
+        if noise:
+            kwargs['noise'] = self._collect_noise(noise)
 
         # run simulation
         ################
@@ -1252,32 +1525,218 @@ class CircuitIR(AbstractBaseIR):
                     for k in range(out_val_tmp.shape[1]):
                         outputs[(outkey, node_key, str(k))] = np.squeeze(out_val_tmp[:, k])
 
-        # create data frame
+        # interpolate outputs at the sampling time points
         if sampling_step_size and not all(np.diff(times, 1) - sampling_step_size < step_size * 0.01):
             n = int(np.round(simulation_time / sampling_step_size, decimals=0))
             new_times = np.linspace(step_size, simulation_time, n + 1)
             for key, val in outputs.items():
                 outputs[key] = np.interp(new_times, times, val)
             times = new_times
-        out_vars = DataFrame(outputs, index=times)
 
-        # return results
-        ################
+        return outputs, times, time[0] if profile else None
 
-        if profile:
-            return out_vars, time[0]
-        return out_vars
+    def _collect_inputs(self, inputs: dict, sim_steps: int) -> list:
+        """Returns a list with one tuple of the input array, the backend variable and the variable indices per input
+        variable of the backend (see `CircuitIR.run` for the format of the inputs).
+        """
+
+        inputs_col = []
+
+        # go through passed inputs
+        for key, val in inputs.items():
+
+            # inputs that are provided by callables or iterators are read block-wise during the simulation
+            if not isinstance(val, (np.ndarray, InputStream)):
+                val = InputStream(val, sim_steps)
+            in_shape = val.shape[1] if len(val.shape) > 1 else 1
+
+            # extract respective input variable from the network
+            for var_key, var_info in self._get_io_vars(key).items():
+                var_shape = int(np.max(var_info['var'].shape)) if tuple(var_info['var'].shape) else 1
+                var_idx = var_info['idx'] if var_shape > 1 else None
+                var_idx_shape = len(var_idx) if var_idx else 1
+                if var_idx_shape == in_shape:
+                    inputs_col.append((val, var_info['var'], var_idx))
+                elif in_shape == 1 and isinstance(val, np.ndarray):
+                    # let a single input column drive all target nodes via a broadcasted view instead of a copy
+                    inp = np.broadcast_to(np.reshape(val, (val.shape[0], 1)), (val.shape[0], var_idx_shape))
+                    inputs_col.append((inp, var_info['var'], var_idx))
+                elif (var_idx_shape % in_shape) == 0:
+                    # tile multiple input columns block-wise during the simulation
+                    reps = var_idx_shape // in_shape
+                    inp = InputStream(val, val.shape[0], transform=lambda x, reps=reps:
+                                      np.tile(np.reshape(x, (x.shape[0], -1)), (1, reps)))
+                    inputs_col.append((inp, var_info['var'], var_idx))
+                elif isinstance(val, np.ndarray):
+                    inputs_col.append((np.reshape(val, (sim_steps, var_idx_shape)), var_info['var'], var_idx))
+                else:
+                    raise ValueError(f'Invalid input: {key}. The input provides {in_shape} columns, but its target '
+                                     f'variable requires {var_idx_shape} columns.')
+
+        return inputs_col
+
+    def _collect_noise(self, noise: dict) -> list:
+        """Returns a list with one tuple of the state vector indices and the noise intensities per state variable of the
+        backend that receives noise (see `CircuitIR.run` for the format of the noise definition).
+        """
+
+        noise_col = []
+        for key, sigma in noise.items():
+            var_infos = self._get_io_vars(key)
+            for vnode_key in var_infos:
+                if not self._is_state_var(vnode_key, key):
+                    raise ValueError(f'Invalid noise variable: {key}. Noise can only be added to state variables.')
+            var_infos = list(var_infos.values())
+            sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float64),
+                                    (sum([len(var_info['idx']) for var_info in var_infos]),))
+            n = 0
+            for var_info in var_infos:
+                noise_col.append((var_info['idx'], sigma[n:n+len(var_info['idx'])]))
+                n += len(var_info['idx'])
+        return noise_col
+
+    def _is_state_var(self, vnode_key: str, key: str) -> bool:
+        """Checks whether a variable (in the format of `CircuitIR.run`) of a vectorized node is a state variable, i.e.
+        whether it is realized as a slice of the state vector of the backend.
+        """
+        if self._io_vars is not None:
+            return self._io_vars[key][vnode_key].get('state', False)
+        op, var = key.split('/')[-2:]
+        value = self[f"{vnode_key}/{op}/{var}"]['value']
+        return getattr(value, 'name', None) == 'pyrates_index' and \
+            value.value.startswith(f"y{self._backend.idx_l}")
+
+    def _get_io_vars(self, key: str) -> dict:
+        """Returns the backend variables of a network variable together with their indices and node names (see
+        `CircuitIR.get_node_var`). Networks that have been loaded via `load_compiled` look them up in the variables that
+        have been saved with the compiled network.
+        """
+        if self._io_vars is None:
+            return self.get_node_var(key, apply_idx=False)
+        if key not in self._io_vars:
+            raise ValueError(f'Variable {key} has not been saved with the compiled network. Only the input and output '
+                             f'variables that were passed to `save_compiled` can be accessed.')
+        return self._io_vars[key]
+
+    def save_compiled(self, path: str, outputs: dict, inputs: Optional[dict] = None, step_size: Optional[float] = None,
+                      solver: str = 'euler', **kwargs) -> None:
+        """Saves the compiled network into a directory, such that it can be loaded via `CircuitIR.load_compiled` and
+        simulated without parsing templates, building the graph or generating code. Only the numpy backend is
+        supported. The network is saved in its current state.
+
+        Parameters
+        ----------
+        path
+            Directory to save the compiled network into.
+        outputs
+            Output variables in the format of `CircuitIR.run`. The loaded network can return these variables.
+        inputs
+            Inputs in the format of `CircuitIR.run`. Only the input variables and the shapes of the inputs (except for
+            the number of time steps) are saved. The loaded network can only be simulated with inputs of this
+            structure.
+        step_size
+            Simulation step size in seconds, if it has not been passed to `CircuitIR.compile`.
+        solver
+            Numerical solving scheme the network is saved for (see `CircuitIR.run`), if it has not been passed to
+            `CircuitIR.compile`.
+        kwargs
+            Options of the numpy backend that the loaded network is simulated with (`fused`, `n_threads`, see
+            `CircuitIR.run`).
+
+        Returns
+        -------
+        None
+
+        """
+
+        from pyrates.backend.numpy_backend import NumpyBackend
+
+        if not self._compiled or self._partitions:
+            raise ValueError('Only networks that have been compiled without partitions can be saved.')
+        if type(self._backend) is not NumpyBackend:
+            raise ValueError('Only networks that have been compiled for the numpy backend can be saved.')
+        solver = self.solver if self.solver is not None else solver
+        step_size = self.step_size if self.step_size is not None else step_size
+        if step_size is None:
+            raise ValueError('Step-size not provided. Please pass the desired simulation step-size to `save_compiled`.')
+
+        # compile and save the backend
+        sim_steps = max([len(val) for val in inputs.values()]) if inputs else 1
+        inputs_col = self._collect_inputs(inputs, sim_steps) if inputs else []
+        self._backend.save_compiled(path, T=sim_steps * step_size, inputs=inputs_col, solver=solver, **kwargs)
+
+        # save the backend variables of all input and output variables
+        io_vars = {}
+        for key in list(outputs.values()) + list(inputs if inputs else []):
+            io_vars[key] = {}
+            for var_key, var_info in self.get_node_var(key, apply_idx=False).items():
+                var = var_info['var']
+                io_vars[key][var_key] = {'idx': var_info['idx'], 'nodes': var_info['nodes'],
+                                         'var': (var.name, var.shape, var.dtype.name) if inputs and key in inputs
+                                         else None, 'state': self._is_state_var(var_key, key)}
+        with open(os.path.join(path, 'circuit.pkl'), 'wb') as f:
+            pickle.dump({'label': self.label, 'solver': solver, 'step_size': step_size, 'io_vars': io_vars}, f)
+
+    @classmethod
+    def load_compiled(cls, path: str, build_dir: Optional[str] = None) -> 'CircuitIR':
+        """Loads a compiled network that has been saved via `CircuitIR.save_compiled`. The returned network does not
+        contain any nodes or edges, but it can be simulated via `CircuitIR.run` with the saved input and output
+        variables.
+
+        Parameters
+        ----------
+        path
+            Directory the compiled network has been saved into.
+        build_dir
+            Directory in which to create the build directory of the backend.
+
+        Returns
+        -------
+        CircuitIR
+            Compiled network.
+
+        """
+
+        from pyrates.backend.numpy_backend import NumpyBackend
+
+        with open(os.path.join(path, 'circuit.pkl'), 'rb') as f:
+            info = pickle.load(f)
+
+        circuit = cls(label=info['label'])
+        circuit._backend = NumpyBackend.load_compiled(path, build_dir=build_dir)
+        circuit._compiled = True
+        circuit._vectorized = True
+        circuit.solver = info['solver']
+        circuit.step_size = info['step_size']
+
+        # create placeholders for the backend variables of the inputs
+        circuit._io_vars = {}
+        for key, var_infos in info['io_vars'].items():
+            circuit._io_vars[key] = {}
+            for var_key, var_info in var_infos.items():
+                var = var_info['var']
+                if var is not None:
+                    name, shape, dtype = var
+                    var, _ = circuit._backend._create_var(vtype='constant', dtype=dtype, shape=shape,
+                                                          value=np.zeros(shape, dtype=dtype), name=name,
+                                                          squeeze=False)
+                circuit._io_vars[key][var_key] = dict(var_info, var=var)
+
+        return circuit
 
     def compile(self,
                 vectorization: bool = True,
                 backend: str = 'numpy',
                 float_precision: str = 'float32',
-                matrix_sparseness: float = 0.5,
+                matrix_sparseness: Optional[float] = 0.5,
                 step_size: Optional[float] = None,
                 solver: Optional[str] = None,
                 dde_approximation_order: int = 0,
                 verbose: bool = True,
                 in_place: bool = False,
+                n_ensemble: int = 1,
+                ensemble_params: Optional[dict] = None,
+                n_partitions: int = 1,
                 **kwargs
                 ) -> AbstractBaseIR:
         """Parses IR into the backend. Returns an instance of the CircuitIR that allows for numerical simulations via
@@ -1296,13 +1755,20 @@ class CircuitIR(AbstractBaseIR):
             Default precision of float variables. This is only used for variables for which no precision was given.
         matrix_sparseness
             Only relevant if `vectorization` is True. All edges that are vectorized and do not contain discrete delays
-            can be realized internally via inner products between an edge weight matrix and the source variables.
-            The matrix sparseness indicated how sparse edge weight matrices are allowed to be. If the sparseness of an
-            edge weight matrix for a given projection would be higher, no edge weight matrix will be built/used.
+            can be realized internally via inner products between a (dense or sparse) edge weight matrix and the source
+            variables, or via gathering the source variables and summing them up at their targets. By default, the
+            cheapest realization is chosen based on the number of source and target variables and the number of edges
+            (see `CircuitIR._edge_projection_costs`). The matrix sparseness indicates how sparse dense edge weight
+            matrices are allowed to be. If the sparseness of an edge weight matrix for a given projection would be
+            higher, no dense edge weight matrix will be built/used. Pass None to choose between all realizations based
+            on their costs only.
         step_size
             Step-size with which the network should be simulated later on. Only needs to be passed here, if the edges of
             the network contain delays. Will be used to discretize the delays.
         solver
+            Numerical solver that will be used to simulate the network (see `CircuitIR.run` for valid options). Only
+            needs to be passed here, if the edges of the network contain delays. Discretized delay buffers are only
+            used for the 'euler' and 'euler_maruyama' solvers.
         dde_approximation_order
             Only relevant for delayed systems. If larger than zero, all discrete delays in the system will be
             automatically approximated by a system of (n+1) coupled ODEs that represent a convolution with a
@@ -1312,10 +1778,27 @@ class CircuitIR(AbstractBaseIR):
         in_place
             If true, all variable and equation attributes on operators in the graph will be overwritten, by their
             compiled, backend-compatible versions. If false, a deep copy of the graph will be made first.
+        n_ensemble
+            Number of ensemble members. If larger than 1 (or if `ensemble_params` are passed), the network is
+            vectorized once and then replicated along the vector dimension of each variable, such that all ensemble
+            members are simulated via a single right-hand side evaluation. The nodes of ensemble member k can be
+            referred to via '{circuit_label}_{k}/{node_key}', or via 'all/{node_key}' for all ensemble members.
+        ensemble_params
+            Key-value pairs, where each key refers to a node variable of the original network ('node/op/var') and each
+            value is a sequence with one value per ensemble member.
+        n_partitions
+            Number of processes to simulate the network with (numpy backend only). If larger than 1, the nodes of the
+            network are distributed over `n_partitions` partitions such that the number of edges between partitions is
+            small (see `partition_nodes`). Each partition is compiled separately, together with copies of all nodes
+            outside the partition that project to it. During `CircuitIR.run`, one process per partition integrates the
+            network via the 'euler' solver and the state variables of these copies are received from the processes
+            that own the respective nodes via shared memory at each integration step.
         kwargs
             Additional keyword arguments that will be passed on to the backend instance. For a full list of viable
             keyword arguments, see the documentation of the respective backend class (`numpy_backend.NumpyBackend` or
-            tensorflow_backend.TensorflowBackend).
+            tensorflow_backend.TensorflowBackend). The optimizations of the right-hand side evaluation of the numpy
+            backend can be toggled this way (`optimize_rhs`, `inplace_ops`, `remove_dead_ops`, `pack_constants`,
+            `ring_buffer`, `reuse_compiled`).
 
         """
 
@@ -1332,6 +1815,20 @@ class CircuitIR(AbstractBaseIR):
         G.solver = solver
         G.step_size = step_size
 
+        # distribute the network over multiple partitions that are compiled separately
+        if n_partitions > 1:
+            if backend != 'numpy':
+                raise ValueError(f'Invalid backend type: {backend}. Networks can only be partitioned for the numpy '
+                                 f'backend.')
+            if n_ensemble > 1 or ensemble_params:
+                raise ValueError('Ensembles cannot be distributed over multiple partitions.')
+            _check_fork_support()
+            G._compile_partitions(n_partitions, vectorization=vectorization, backend=backend,
+                                  float_precision=float_precision, matrix_sparseness=matrix_sparseness,
+                                  step_size=step_size, solver=solver, dde_approximation_order=dde_approximation_order,
+                                  verbose=verbose, **kwargs)
+            return G
+
         # instantiate the backend and set the backend default_device
         if backend == 'tensorflow':
             from pyrates.backend.tensorflow_backend import TensorflowBackend
@@ -1352,8 +1849,8 @@ class CircuitIR(AbstractBaseIR):
         G._backend = backend(**kwargs)
 
         # run graph optimization and vectorization
-        G._first_run = True
-        G.optimize_graph_in_place(vectorize=vectorization, dde_approx=dde_approximation_order, verbose=verbose)
+        G.optimize_graph_in_place(vectorize=vectorization, dde_approx=dde_approximation_order, verbose=verbose,
+                                  n_ensemble=n_ensemble, ensemble_params=ensemble_params)
 
         # move edge operations to nodes
         ###############################
@@ -1383,33 +1880,54 @@ class CircuitIR(AbstractBaseIR):
 
                 n, m = tval['shape'][0], sval['shape'][0]
 
-                # check whether the weight matrix is dense enough for this edge realization to be efficient
-                if 1 - len(weight) / (n * m) < matrix_sparseness and n > 1 and m > 1:
+                # choose the cheapest realization of the edge projection
+                costs = G._edge_projection_costs(n, m, len(weight))
+                if n < 2 or m < 2 or (matrix_sparseness is not None and 1 - len(weight) / (n * m) >= matrix_sparseness):
+                    costs.pop('dense')
+                if not G._backend.ops.get('sparse_dot', {}).get('call'):
+                    costs.pop('sparse')
+                realization = min(costs, key=costs.get)
 
-                    weight_mat = np.zeros((n, m), dtype=np.float32)
-                    if not tidx:
-                        tidx = [0 for _ in range(len(sidx))]
-                    for row, col, w in zip(tidx, sidx, weight):
-                        weight_mat[row, col] = w
+                if realization != 'gather':
+
+                    rows = np.asarray(tidx if tidx else [0 for _ in range(len(sidx))], dtype=np.int32)
+                    cols = np.asarray(sidx, dtype=np.int32)
+
+                    if realization == 'dense':
+                        weight_mat = np.zeros((n, m), dtype=np.float32)
+                        weight_mat[rows, cols] = weight
+                        eq = f"{tvar} = weight @ {svar}"
+                    else:
+                        from scipy.sparse import csr_matrix
+                        weight_mat = csr_matrix((np.asarray(weight, dtype=np.float32), (rows, cols)), shape=(n, m))
+                        eq = f"{tvar} = sparse_dot(weight, {svar})"
 
                     # set up weights and edge projection equation
-                    eq = f"{tvar} = weight @ {svar}"
                     weight = weight_mat
                     dot_edge = True
 
             # set up edge projection equation and edge indices for edges that cannot be realized via a matrix product
+            # (multiple edges per target are summed up via a segment sum over the target indices, if the backend
+            # supports it, and via a product with a one-hot target matrix otherwise)
             args = {}
+            segment_sum = False
             if len(tidx) > 1 and sum(tval['shape']) > 1:
-                d = np.zeros((tval['shape'][0], len(tidx)))
-                for i, t in enumerate(tidx):
-                    d[t, i] = 1
+                if G._backend.ops.get('segment_sum', {}).get('call'):
+                    d = tidx
+                    segment_sum = True
+                else:
+                    d = np.zeros((tval['shape'][0], len(tidx)))
+                    for i, t in enumerate(tidx):
+                        d[t, i] = 1
             elif len(tidx) and sum(tval['shape']) > 1:
                 d = tidx
             else:
                 d = []
             idx = "[source_idx]" if sidx and sum(sval['shape']) > 1 else ""
             if not dot_edge:
-                if len(d) > 1:
+                if segment_sum:
+                    eq = f"{tvar} = segment_sum({svar}{idx} * weight, target_idx, {tval['shape'][0]})"
+                elif len(d) > 1:
                     eq = f"{tvar} = target_idx @ ({svar}{idx} * weight)"
                 elif len(d):
                     eq = f"{tvar}[target_idx] = {svar}{idx} * weight"
@@ -1420,10 +1938,11 @@ class CircuitIR(AbstractBaseIR):
             dtype = sval["dtype"]
             args['weight'] = {'vtype': 'constant', 'dtype': dtype, 'value': weight}
             args[tvar] = tval
-            if len(d):
+            if len(d) and not dot_edge:
                 args['target_idx'] = {'vtype': 'constant',
-                                      'value': np.array(d, dtype=G._backend._float_def if len(d) > 1 else np.int32)}
-            if idx:
+                                      'value': np.array(d, dtype=G._backend._float_def if np.ndim(d) > 1 else
+                                                        np.int32)}
+            if idx and not dot_edge:
                 args['source_idx'] = {'vtype': 'constant', 'dtype': 'int32',
                                       'value': np.array(sidx, dtype=np.int32)}
 
@@ -1499,6 +2018,244 @@ class CircuitIR(AbstractBaseIR):
 
         return G
 
+    def _compile_partitions(self, n_partitions: int, verbose: bool = True, **kwargs) -> None:
+        """Distributes the nodes of the network over `n_partitions` partitions and compiles one network per partition.
+        Each of these networks contains the nodes of its partition, copies of all nodes that project to them from
+        other partitions (ghost nodes) and all edges that target nodes of the partition.
+
+        Parameters
+        ----------
+        n_partitions
+            Number of partitions.
+        verbose
+            If true, updates about the partitioning will be displayed in the terminal.
+        kwargs
+            Keyword arguments that are passed on to `CircuitIR.compile` for each partition.
+
+        Returns
+        -------
+        None
+
+        """
+
+        # partition the nodes such that few edges connect different partitions
+        #######################################################################
+
+        if verbose:
+            print("Partitioning the network:")
+
+        node_keys = list(self.nodes)
+        edges = []
+        for source, target, data in self.edges(data=True):
+            extra_sources = data.get('extra_sources') or {}
+            for s in [source] + [s.rsplit('/', 2)[0] for s in extra_sources.values()]:
+                edges.append((s, target, data))
+        parts = partition_nodes(node_keys, [(s, t) for s, t, _ in edges], n_partitions)
+
+        if verbose:
+            part_idx = {key: i for i, part in enumerate(parts) for key in part}
+            n_cut = sum([part_idx[s] != part_idx[t] for s, t, _ in edges])
+            print(f"    ...the nodes have been distributed over {n_partitions} partitions, connected by {n_cut} of "
+                  f"{len(edges)} edges.")
+
+        # compile one network per partition
+        ###################################
+
+        partitions = []
+        for i, part in enumerate(parts):
+
+            owned = set(part)
+            ghosts = {s for s, t, _ in edges if t in owned and s not in owned}
+
+            circuit = CircuitIR(label=f"{self.label}_part{i}")
+            circuit.sub_circuits = set(self.sub_circuits)
+            circuit.add_nodes_from({key: self.nodes[key]['node'] for key in node_keys
+                                    if key in owned or key in ghosts})
+            for source, target, data in self.edges(data=True):
+                if target in owned:
+                    circuit.graph.add_edge(source, target, **data)
+            circuit = circuit.compile(verbose=False, **kwargs)
+
+            partitions.append({'circuit': circuit, 'nodes': part,
+                               'own': circuit._get_state_indices(part, self),
+                               'ghosts': circuit._get_state_indices([key for key in node_keys if key in ghosts], self)})
+
+            if verbose:
+                print(f"    ...partition {i} with {len(part)} nodes and {len(ghosts)} ghost nodes has been compiled.")
+
+        # assign a position in the exchange buffer to each state variable of each node
+        ###############################################################################
+
+        buffer_idx = {}
+        for p in partitions:
+            for key in p['own']:
+                buffer_idx[key] = len(buffer_idx)
+        for p in partitions:
+            for which in ['own', 'ghosts']:
+                keys = [key for key in p[which] if key in buffer_idx]
+                p[which] = (np.asarray([p[which][key] for key in keys], dtype=np.int64),
+                            np.asarray([buffer_idx[key] for key in keys], dtype=np.int64))
+
+        self._partitions = partitions
+
+        if verbose:
+            print("Compilation finished!\n")
+
+    def _get_state_indices(self, nodes: list, circuit) -> dict:
+        """Returns the positions of the state variables of the passed (original) nodes in the state vector of the
+        compiled network. Only variables of operators that exist on the respective node in `circuit` are considered.
+
+        Parameters
+        ----------
+        nodes
+            Keys of nodes of the original network.
+        circuit
+            Original network, before vectorization.
+
+        Returns
+        -------
+        dict
+            Key-value pairs, where each key is a tuple (node, op, var) and each value is the index of the respective
+            state variable in the state vector.
+
+        """
+
+        state_idx = {}
+        y_starts = {}
+        idx_l = self._backend.idx_l
+        for node in nodes:
+            vnode, i = self.label_map[node]
+            op_graph = self[vnode].op_graph
+            for op in circuit[node].op_graph.nodes:
+                for var, var_info in op_graph.nodes[op]['variables'].items():
+                    key = (vnode, op, var)
+                    if key not in y_starts:
+                        value = var_info.get('value')
+                        start = None
+                        if getattr(value, 'name', None) == 'pyrates_index' and value.value.startswith(f"y{idx_l}"):
+                            idx = [int(idx) for idx in value.value[len(idx_l) + 1:-1].split(':')]
+                            start, stop = idx if len(idx) > 1 else (idx[0], idx[0] + 1)
+                            if stop - start != len(self[vnode]):
+                                raise ValueError(f'Invalid state variable: {node}/{op}/{var}. Only scalar state '
+                                                 f'variables of nodes can be exchanged between partitions.')
+                        y_starts[key] = start
+                    if y_starts[key] is not None:
+                        state_idx[(node, op, var)] = y_starts[key] + i
+        return state_idx
+
+    def _run_partitioned(self, simulation_time: float, inputs: Optional[dict] = None, outputs: Optional[dict] = None,
+                         solver: str = 'euler', verbose: bool = True, profile: bool = False, **kwargs
+                         ) -> Union[DataFrame, Tuple[DataFrame, float]]:
+        """Simulates a network that was compiled with multiple partitions (see `CircuitIR.compile`) via one process
+        per partition. See `CircuitIR.run` for a description of the arguments.
+        """
+
+        from multiprocessing import get_context
+        from multiprocessing.shared_memory import SharedMemory
+        from pandas import concat
+
+        _check_fork_support()
+        if not outputs:
+            raise ValueError('Outputs need to be passed to `CircuitIR.run` for networks with multiple partitions.')
+        if (self.solver or solver) != 'euler':
+            raise ValueError(f'Invalid solver type: {self.solver or solver}. Networks with multiple partitions can only '
+                             f'be simulated via the euler solver.')
+
+        if verbose:
+            print("Simulation Progress")
+            print("-------------------")
+            print(f"    ...starting {len(self._partitions)} processes.")
+
+        # shared memory for the exchange of state variables between partitions (one buffer for even and one for odd
+        # integration steps, such that a single barrier per step suffices)
+        n = sum([len(p['own'][0]) for p in self._partitions])
+        dtype = self._partitions[0]['circuit']._backend.vars['y'].dtype
+        shm = SharedMemory(create=True, size=max(2 * n * dtype.itemsize, 1))
+        buffer = np.ndarray((2, n), dtype=dtype, buffer=shm.buf)
+
+        try:
+
+            # start one process per partition (forked, such that the compiled networks do not need to be pickled)
+            ctx = get_context('fork')
+            barrier = ctx.Barrier(len(self._partitions))
+            workers = []
+            for p in self._partitions:
+                receiver, sender = ctx.Pipe(duplex=False)
+                part_inputs, part_outputs = self._partition_io(p, inputs or {}, outputs)
+                process = ctx.Process(target=_simulate_partition, daemon=True,
+                                      args=(p, part_inputs, part_outputs, buffer, barrier, sender,
+                                            dict(simulation_time=simulation_time, solver=solver, verbose=False,
+                                                 profile=profile, **kwargs)))
+                process.start()
+                sender.close()
+                workers.append((process, receiver))
+
+            # collect the results and abort the simulation if a process died
+            results = []
+            for process, receiver in workers:
+                while not receiver.poll(0.1):
+                    if any([w.exitcode for w, _ in workers]):
+                        barrier.abort()
+                    if process.exitcode is not None and not receiver.poll():
+                        results.append((None, f'Process exited with code {process.exitcode}.'))
+                        break
+                else:
+                    results.append(receiver.recv())
+                process.join()
+
+        finally:
+            del buffer
+            shm.close()
+            shm.unlink()
+
+        for i, (_, error) in enumerate(results):
+            if error:
+                raise PyRatesException(f'Simulation of partition {i} failed:\n{error}')
+        if not all([r for r, _ in results]):
+            raise PyRatesException('Simulation of the network partitions has been aborted.')
+
+        # continue the next run from the final state of each partition
+        for p, ((_, state, *_), _) in zip(self._partitions, results):
+            p['circuit']._backend.set_state(state)
+
+        if verbose:
+            print("Simulation finished!\n")
+
+        out_vars = concat([r for (r, *_), _ in results], axis=1)
+        if profile:
+            return out_vars, max([t for (_, _, t), _ in results])
+        return out_vars
+
+    def _partition_io(self, partition: dict, inputs: dict, outputs: dict) -> tuple:
+        """Selects the inputs and outputs that refer to nodes of a partition. Columns of inputs that target multiple
+        nodes are selected and re-ordered according to the nodes of the partition.
+        """
+
+        circuit, owned = partition['circuit'], set(partition['nodes'])
+
+        part_outputs = {}
+        for key, val in outputs.items():
+            if any([node in owned for info in circuit.get_node_var(val, apply_idx=False).values()
+                    for node in info['nodes']]):
+                part_outputs[key] = val
+
+        part_inputs = {}
+        for key, val in inputs.items():
+            node_col = [info['nodes'] for info in circuit.get_node_var(key, apply_idx=False).values()]
+            if not any([node in owned for nodes in node_col for node in nodes]):
+                continue
+            if len(val.shape) > 1 and val.shape[1] > 1:
+                nodes = ["/".join(node) for node in self._filter_node_keys(key.split('/')[:-2], list(self.nodes))]
+                if len(node_col) > 1 or val.shape[1] != len(nodes):
+                    raise ValueError(f'Invalid input: {key}. Inputs with multiple columns can only be distributed over '
+                                     f'partitions, if they contain one column per target node and all target nodes '
+                                     f'are of the same type.')
+                col_idx = {node: i for i, node in enumerate(nodes)}
+                val = val[:, [col_idx[node] for node in node_col[0]]]
+            part_inputs[key] = val
+
+        return part_inputs, part_outputs
+
     def generate_auto_def(self, dir: str) -> str:
         """Creates fortran files needed by auto (and pyauto) to run parameter continuaitons. The `run` method should be
         called at least once before calling this method to start parameter continuations from a well-defined
@@ -1717,7 +2474,7 @@ class CircuitIR(AbstractBaseIR):
         return means, stds, nodes, add_delay
 
     def _process_delays(self, d, discretize=True):
-        if self.step_size is None and self.solver == 'scipy':
+        if self.step_size is None and self.solver in continuous_solvers:
             raise ValueError('Step-size not passed for setting up edge delays. If delays are added to any '
                              'network edge, please pass the simulation `step-size` to the `compile` '
                              'method.')
@@ -1731,7 +2488,7 @@ class CircuitIR(AbstractBaseIR):
 
     def _preprocess_delay(self, delay, discretize=True):
         if discretize:
-            discretize = self.step_size is None or self.solver != 'scipy'
+            discretize = self.step_size is None or self.solver not in continuous_solvers
         return int(np.round(delay / self.step_size, decimals=0)) if discretize else delay
 
     @staticmethod
@@ -1815,6 +2572,21 @@ class CircuitIR(AbstractBaseIR):
 
         return edges_new
 
+    @classmethod
+    def _edge_projection_costs(cls, n: int, m: int, nnz: int) -> dict:
+        """Estimates the costs (in ns) of a single evaluation of an edge projection from m source variables onto n
+        target variables via nnz edges, for each possible realization of the projection:
+
+            - 'dense': product of a dense (n x m) weight matrix with the source variables
+            - 'sparse': product of a sparse CSR weight matrix with the source variables
+            - 'gather': indexing of the source variables and summation over the edges of each target
+
+        Each estimate consists of a constant call overhead and the costs per processed matrix entry, edge or target
+        variable (see `CircuitIR.edge_projection_costs`).
+        """
+        return {key: c0 + c_entry * n * m + c_edge * nnz + c_target * n
+                for key, (c0, c_entry, c_edge, c_target) in cls.edge_projection_costs.items()}
+
     def _add_edge_buffer(self, node: str, op: str, var: str, edges: list, delays: list, nodes: list,
                          spreads: Optional[list] = None, dde_approx: float = 0.0) -> None:
         """Adds a buffer variable to an edge.
@@ -1972,13 +2744,18 @@ class CircuitIR(AbstractBaseIR):
         # discretized edge buffers
         ##########################
 
-        elif self.step_size is None or self.solver != 'scipy':
+        elif self.step_size is None or self.solver not in continuous_solvers:
 
-            # create buffer variable shapes
+            # create buffer variable shapes (the time dimension comes first for ring buffers, such that the write
+            # head can address a full buffer row)
+            buffer_length = max_delay + 1
+            ring_buffer = self._backend.ring_buffer
             if len(target_shape) < 1 or (len(target_shape) == 1 and target_shape[0] == 1):
-                buffer_shape = (max_delay + 1,)
+                buffer_shape = (buffer_length,)
+            elif ring_buffer:
+                buffer_shape = (buffer_length, target_shape[0])
             else:
-                buffer_shape = (target_shape[0], max_delay + 1)
+                buffer_shape = (target_shape[0], buffer_length)
 
             # create buffer variable definitions
             var_dict = {f'{var}_buffer': {'vtype': 'state_var',
@@ -1997,7 +2774,27 @@ class CircuitIR(AbstractBaseIR):
                                         'value': source_idx}}
 
             # create buffer equations
-            if len(target_shape) < 1 or (len(target_shape) == 1 and target_shape[0] == 1):
+            if ring_buffer:
+
+                # ring buffer: the write head moves backwards by one position each step, such that the value from d
+                # steps ago is found at position head + d
+                var_dict[f'{var}_head'] = {'vtype': 'state_var',
+                                           'dtype': 'int32',
+                                           'shape': (1,),
+                                           'value': 0}
+                var_dict[f'{var}_read_idx'] = {'vtype': 'state_var',
+                                               'dtype': 'int32',
+                                               'shape': (len(delays),),
+                                               'value': 0}
+                buffer_eqs = [f"{var}_head = ({var}_head + {buffer_length - 1}) % {buffer_length}",
+                              f"{var}_buffer[{var}_head] = {var}",
+                              f"{var}_read_idx = ({var}_head + {var}_delays) % {buffer_length}"]
+                if len(target_shape) < 1 or (len(target_shape) == 1 and target_shape[0] == 1):
+                    buffer_eqs.append(f"{var}_buffered = {var}_buffer[{var}_read_idx]")
+                else:
+                    buffer_eqs.append(f"{var}_buffered = {var}_buffer[{var}_read_idx, source_idx]")
+
+            elif len(target_shape) < 1 or (len(target_shape) == 1 and target_shape[0] == 1):
                 buffer_eqs = [f"{var}_buffer[:] = roll({var}_buffer, 1, 0)",
                               f"{var}_buffer[0] = {var}",
                               f"{var}_buffered = {var}_buffer[{var}_delays]"]
@@ -2172,10 +2969,55 @@ class CircuitIR(AbstractBaseIR):
         s, t, e = edge
         self.edges[s, t, e]['target_var'] = f'{op}_{var}_col_{idx}/{var}_col_{idx}'
 
+    def set_params(self, params: dict) -> None:
+        """Changes the values of constants of a compiled network. The new values are written into the backend
+        variables in place, such that subsequent calls of `CircuitIR.run` use them without compiling the network again.
+
+        Parameters
+        ----------
+        params
+            Key-value pairs, where each key refers to a network variable via the format of `CircuitIR.get_node_var`
+            (e.g. 'all/PC/RPO_e_pc/h') and each value is the new value of that variable. For keys that refer to
+            multiple nodes, the value can either be a scalar or contain one entry per node. Scalar constants (e.g. the
+            weight of a single edge) require a scalar value.
+
+        Returns
+        -------
+        None
+
+        """
+
+        if self._backend is None:
+            raise AttributeError('Parameters can only be changed on compiled networks. Please call `CircuitIR.compile` '
+                                 'first.')
+
+        for key, val in params.items():
+
+            var_col = self.get_node_var(key, apply_idx=False)
+            if 'value' in var_col:
+                var_col = {key: {'var': var_col['value'], 'idx': None}}
+
+            for var_info in var_col.values():
+                var, idx = var_info['var'], var_info['idx']
+                if getattr(var, 'vtype', None) != 'constant':
+                    raise ValueError(f'Invalid parameter: {key}. Only constants of the compiled network can be changed.')
+                if not tuple(var.shape):
+                    # scalar constants (e.g. weights of single edges) are changed as a whole
+                    self._backend.set_var(var, np.reshape(val, ()))
+                else:
+                    self._backend.set_var(var, val, idx)
+
+        # re-evaluate operations that depend on the changed constants
+        self._backend.update_constants()
+
     def clear(self):
         """Clears the backend graph from all operations and variables.
         """
-        self._backend.clear()
+        if self._partitions:
+            for p in self._partitions:
+                p['circuit'].clear()
+        else:
+            self._backend.clear()
 
 
 class SubCircuitView(AbstractBaseIR):
@@ -2258,3 +3100,120 @@ def sort_equations(edge_eqs: list, node_eqs: list) -> list:
     eqs_new += node_eqs
 
     return eqs_new
+
+
+def partition_nodes(nodes: list, edges: list, n_parts: int, seed: int = 0) -> list:
+    """Distributes nodes over partitions of (almost) equal size, such that few edges connect nodes of different
+    partitions. Partitions are created via recursive Kernighan-Lin bisection, starting from the order of the nodes.
+
+    Parameters
+    ----------
+    nodes
+        Node keys.
+    edges
+        Tuples (source, target) of node keys. Multiple edges between the same nodes increase the weight of the cut.
+    n_parts
+        Number of partitions.
+    seed
+        Seed of the random number generator used by the bisection.
+
+    Returns
+    -------
+    list
+        One list of node keys per partition. The order of the nodes is preserved within each partition.
+
+    """
+
+    from networkx import Graph
+    from networkx.algorithms.community import kernighan_lin_bisection
+
+    if n_parts > len(nodes):
+        raise ValueError(f'Invalid number of partitions: {n_parts}. A network with {len(nodes)} nodes can be '
+                         f'distributed over at most {len(nodes)} partitions.')
+
+    # undirected graph with the number of edges between two nodes as weights
+    G = Graph()
+    G.add_nodes_from(nodes)
+    for source, target in edges:
+        if source != target:
+            if G.has_edge(source, target):
+                G[source][target]['weight'] += 1
+            else:
+                G.add_edge(source, target, weight=1)
+
+    def bisect(part: list, n: int) -> list:
+        if n == 1:
+            return [part]
+        n1 = n // 2
+        split = len(part) * n1 // n
+        part1, part2 = kernighan_lin_bisection(G.subgraph(part), partition=(set(part[:split]), set(part[split:])),
+                                               weight='weight', seed=seed)
+        if len(part1) != split:
+            part1 = part2
+        return bisect([node for node in part if node in part1], n1) + \
+            bisect([node for node in part if node not in part1], n - n1)
+
+    return bisect(list(nodes), n_parts)
+
+
+def _check_fork_support() -> None:
+    """Raises an error if worker processes cannot be forked on this platform, which is required to simulate networks
+    with multiple partitions (see `CircuitIR.compile`).
+    """
+    import sys
+    from multiprocessing import get_all_start_methods
+    if 'fork' not in get_all_start_methods():
+        raise PyRatesException(f'Networks with multiple partitions can only be simulated on platforms that support '
+                               f'forking processes, which {sys.platform} does not. Compile the network with '
+                               f'`n_partitions=1` instead.')
+
+
+def _simulate_partition(partition: dict, inputs: dict, outputs: dict, buffer: np.ndarray, barrier, conn,
+                        run_kwargs: dict) -> None:
+    """Simulates one partition of a network in a worker process. At the beginning of each integration step, the state
+    variables of the nodes of the partition are written to the shared `buffer` and, after all processes have done so,
+    the state variables of the ghost nodes are read from it. The outputs of the nodes of the partition, its final state
+    (see `NumpyBackend.get_state`) and the simulation time, if requested, or the traceback of an error are sent to the
+    main process via `conn`.
+    """
+
+    from threading import BrokenBarrierError
+
+    try:
+
+        own_idx, own_buffer_idx = partition['own']
+        ghost_idx, ghost_buffer_idx = partition['ghosts']
+        step = [0]
+
+        def exchange(y):
+            buffer_tmp = buffer[step[0] % 2]
+            step[0] += 1
+            buffer_tmp[own_buffer_idx] = y[own_idx]
+            barrier.wait()
+            y[ghost_idx] = buffer_tmp[ghost_buffer_idx]
+
+        results = partition['circuit'].run(inputs=inputs, outputs=outputs, exchange=exchange, **run_kwargs)
+        results, *sim_time = results if run_kwargs['profile'] else (results,)
+
+        # keep the outputs of the nodes of this partition only
+        owned = set(partition['nodes'])
+        results = results[[col for col in results.columns if "/".join(col[1:]) in owned or col[1] in owned]]
+        state = partition['circuit']._backend.get_state()
+        conn.send(((results, state, *sim_time), None))
+
+    except BrokenBarrierError:
+
+        # the simulation has been aborted due to an error in another process
+        conn.send((None, None))
+
+    except Exception:
+
+        from traceback import format_exc
+        barrier.abort()
+        conn.send((None, format_exc()))
+
+    finally:
+
+        # worker processes exit without running finalizers, thus the build directory is removed explicitly
+        partition['circuit']._backend._remove_build_dir()
+        conn.close()
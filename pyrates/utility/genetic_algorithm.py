@@ -673,34 +673,24 @@ class DifferentialEvolutionAlgorithm(GeneticAlgorithmTemplate):
 
         if run_func is None:
 
-            attempts = 1
-            while attempts < 100:
-
-                try:
-
-                    # load model template
-                    model_id = self.get_unique_id(int(attempts*1e6))
-                    if type(template) is str:
-                        template = CircuitTemplate.from_yaml(template)
-                    model = deepcopy(template).apply(label=f'model_{model_id}')
-
-                    # apply new parameters to model template
-                    params, param_map = dict(), dict()
-                    for i, (p, key) in enumerate(zip(genes, gene_map)):
-                        params[i] = p
-                        param_map[i] = key
-                    adapt_circuit(model, params=params, param_map=param_map)
-
-                    # compile model into backend
-                    model_compiled = model.compile(**compile_kwargs)
-
-                    # define run func
-                    run_func = model_compiled.run
-                    break
-
-                except (FileExistsError, FileNotFoundError):
-                    attempts += 1
-                    continue
+            # load model template
+            model_id = self.get_unique_id(int(1e6))
+            if type(template) is str:
+                template = CircuitTemplate.from_yaml(template)
+            model = deepcopy(template).apply(label=f'model_{model_id}')
+
+            # apply new parameters to model template
+            params, param_map = dict(), dict()
+            for i, (p, key) in enumerate(zip(genes, gene_map)):
+                params[i] = p
+                param_map[i] = key
+            adapt_circuit(model, params=params, param_map=param_map)
+
+            # compile model into backend
+            model_compiled = model.compile(**compile_kwargs)
+
+            # define run func
+            run_func = model_compiled.run
 
         results = run_func(**run_kwargs)
         return loss_func(results, **loss_kwargs)
@@ -59,7 +59,7 @@ __status__ = "development"
 def grid_search(circuit_template: Union[CircuitTemplate, str], param_grid: Union[dict, pd.DataFrame], param_map: dict,
                 step_size: float, simulation_time: float, inputs: dict, outputs: dict,
                 sampling_step_size: Optional[float] = None, permute_grid: bool = False, init_kwargs: dict = None,
-                **kwargs) -> tuple:
+                ensemble: bool = False, **kwargs) -> tuple:
     """Function that runs multiple parametrizations of the same circuit in parallel and returns a combined output.
 
     Parameters
@@ -83,6 +83,12 @@ def grid_search(circuit_template: Union[CircuitTemplate, str], param_grid: Union
     permute_grid
         If true, all combinations of the provided param_grid values will be realized. If false, the param_grid values
         will be traversed pairwise.
+    init_kwargs
+        Additional keyword arguments passed to `CircuitIR.compile`.
+    ensemble
+        If true, the circuit is compiled only once in ensemble mode (see argument `n_ensemble` of `CircuitIR.compile`)
+        instead of creating a copy of the circuit for each parametrization. Only supported for parameters on nodes.
+        The results are labeled like in the non-ensemble mode.
     kwargs
         Additional keyword arguments passed to the `:class:ComputeGraph` initialization.
 
@@ -115,26 +121,67 @@ def grid_search(circuit_template: Union[CircuitTemplate, str], param_grid: Union
     param_keys = list(param_grid.keys())
     N = param_grid.shape[0]
 
-    # assign parameter updates to each circuit, combine them to unconnected network and remember their parameters
-    circuit = CircuitIR()
-    circuit_names = []
-    for idx in param_grid.index:
-        new_params = {}
+    if ensemble:
+
+        # create a single circuit and collect its parameters for each ensemble member
+        circuit = circuit_template.apply()
+        ensemble_params = {}
         for key in param_keys:
-            new_params[key] = param_grid[key][idx]
-        circuit_key = f'{circuit_template.label}_{idx}'
-        circuit_tmp = adapt_circuit(deepcopy(circuit_template).apply(), new_params, param_map)
-        circuit.add_circuit(circuit_key, circuit_tmp)
-        circuit_names.append(circuit_key)
-    param_grid.index = circuit_names
+            if 'edges' in param_map[key]:
+                raise ValueError(f'Parameter {key} refers to edges of the circuit. Grid searches in ensemble mode are '
+                                 f'only supported for node parameters.')
+            n_params = len(ensemble_params)
+            for var in param_map[key]['vars']:
+                for node in param_map[key].get('nodes', []):
+                    ops = [var.split('/')[0]] if "/" in var else [op for op, _ in circuit[node]]
+                    for op in ops:
+                        var_name = var.split('/')[-1]
+                        if var_name in circuit[node].values[op]:
+                            ensemble_params[f"{node}/{op}/{var_name}"] = [float(val) for val in param_grid[key]]
+            if len(ensemble_params) == n_params:
+                raise ValueError(f'Parameter {key} could not be found on any node of the circuit. Please check the '
+                                 f'variables and nodes that it is mapped to via `param_map`.')
+        # ensemble members are labeled by their position in the ensemble, results are labeled like the circuits of
+        # the non-ensemble mode instead (via the original index of the parameter grid)
+        circuit_names = [f'{circuit_template.label}_{idx}' for idx in param_grid.index]
+        member_names = dict(zip([f'{circuit.label}_{idx}' for idx in range(N)], circuit_names))
+        param_grid.index = circuit_names
+
+        # create backend graph
+        net = circuit.compile(vectorization=vectorization, n_ensemble=N, ensemble_params=ensemble_params,
+                              **init_kwargs)
+
+    else:
 
-    # create backend graph
-    net = circuit.compile(vectorization=vectorization, **init_kwargs)
+        # assign parameter updates to each circuit, combine them to unconnected network and remember their parameters
+        circuit = CircuitIR()
+        circuit_names = []
+        for idx in param_grid.index:
+            new_params = {}
+            for key in param_keys:
+                new_params[key] = param_grid[key][idx]
+            circuit_key = f'{circuit_template.label}_{idx}'
+            circuit_tmp = adapt_circuit(deepcopy(circuit_template).apply(), new_params, param_map)
+            circuit.add_circuit(circuit_key, circuit_tmp)
+            circuit_names.append(circuit_key)
+        param_grid.index = circuit_names
+
+        # create backend graph
+        net = circuit.compile(vectorization=vectorization, **init_kwargs)
 
     # adjust input of simulation to combined network
     for inp_key, inp in inputs.copy().items():
-        inputs[f"all/{inp_key}"] = np.tile(inp, (1, N))
         inputs.pop(inp_key)
+        if callable(inp) or hasattr(inp, '__next__'):
+            # inputs that are provided block-wise are tiled block-wise by `CircuitIR.run`
+            inputs[f"all/{inp_key}"] = inp
+            continue
+        inp = np.asarray(inp)
+        if len(inp.shape) < 2 or inp.shape[1] == 1:
+            # drive all circuits by the same input column via a broadcasted view instead of copying it N times
+            inputs[f"all/{inp_key}"] = np.broadcast_to(np.reshape(inp, (inp.shape[0], 1)), (inp.shape[0], N))
+        else:
+            inputs[f"all/{inp_key}"] = np.tile(inp, (1, N))
 
     # adjust output of simulation to combined network
     for out_key, out in outputs.items():
@@ -150,8 +197,12 @@ def grid_search(circuit_template: Union[CircuitTemplate, str], param_grid: Union
     net.clear()
 
     # return results
+    duration = None
     if 'profile' in kwargs:
         results, duration = results
+    if ensemble:
+        results = results.rename(columns=member_names, level=1)
+    if 'profile' in kwargs:
         return results, param_grid, duration
     return results, param_grid
 
@@ -444,3 +444,48 @@ def test_1_7_equation_parsing():
         # numpy-based parsing
         result = parse_equations(equations=[[(eq, 'node/op')]], equation_args=args, backend=b)['node/op/a']
         #assert result == pytest.approx(target, rel=1e-6)
+
+
+def test_1_8_shape_inference():
+    """Testing the inference of output shapes and data-types of operations without evaluating them.
+    """
+
+    arg_dict = {'a': {'vtype': 'state_var', 'value': np.ones((3,)), 'dtype': 'float32', 'shape': (3,)},
+                'b': {'vtype': 'state_var', 'value': np.ones((3,)), 'dtype': 'float32', 'shape': (3,)},
+                'c': {'vtype': 'state_var', 'value': 2., 'dtype': 'float32', 'shape': ()},
+                'd': {'vtype': 'state_var', 'value': np.ones((3,)), 'dtype': 'float64', 'shape': (3,)},
+                'W': {'vtype': 'state_var', 'value': np.ones((4, 3)), 'dtype': 'float32', 'shape': (4, 3)},
+                'x': {'vtype': 'state_var', 'value': np.ones((4,)), 'dtype': 'float32', 'shape': (4,)}}
+    expressions = ["a + b", "a * 2.", "a / c", "sin(a) + b", "a > b", "a + d", "W @ a", "exp(W @ a) - 1."]
+
+    # the inferred shapes and data-types match the evaluated results
+    for expr in expressions:
+        b = NumpyBackend()
+        args = parse_dict(arg_dict, backend=b)
+        p = ExpressionParser(expr_str=expr, args=args, backend=b)
+        p.parse_expr()
+        result = p.rhs.numpy()
+        assert tuple(p.rhs.shape) == result.shape
+        assert np.dtype(p.rhs.dtype) == result.dtype
+
+    # operands of non-matching shapes are detected
+    b = NumpyBackend()
+    args = parse_dict(arg_dict, backend=b)
+    with pytest.raises(ValueError):
+        b._create_op('@', 'dot', args['W'], args['x'])
+
+
+def test_1_9_lazy_op_generation():
+    """Testing that the functions of operations are only generated once the operations are evaluated.
+    """
+
+    arg_dict = {'a': {'vtype': 'state_var', 'value': np.ones((3,)), 'dtype': 'float32', 'shape': (3,)},
+                'b': {'vtype': 'state_var', 'value': np.ones((3,)), 'dtype': 'float32', 'shape': (3,)}}
+    b = NumpyBackend()
+    args = parse_dict(arg_dict, backend=b)
+    p = ExpressionParser(expr_str="exp(a) + b", args=args, backend=b)
+    p.parse_expr()
+
+    assert p.rhs._func is None
+    assert p.rhs.numpy() == pytest.approx(np.exp(1.) + 1., rel=1e-6)
+    assert p.rhs._func is not None
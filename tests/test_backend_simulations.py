@@ -2,7 +2,8 @@
 """
 
 # external imports
-from typing import Union
+from importlib.util import find_spec
+from typing import Callable, Optional, Union
 
 import numpy as np
 import pytest
@@ -50,6 +51,43 @@ def nmrse(x: np.ndarray,
     return np.sqrt(np.sum(diff ** 2, axis=0)) / (max_val - min_val)
 
 
+def _jrc_circuit(label: str, n: int, weight: Optional[np.ndarray] = None, delay: Optional[np.ndarray] = None):
+    """Creates a circuit of `n` Jansen-Rit circuits `jrc_0`, ..., `jrc_{n-1}`. If `weight` is passed, their pyramidal
+    cell populations are coupled via edges with the given weight (and delay) matrix.
+    """
+
+    from pyrates.ir.circuit import CircuitIR
+
+    circuit = CircuitIR(label=label)
+    for idx in range(n):
+        circuit.add_circuit(f'jrc_{idx}', CircuitIR.from_yaml("model_templates.jansen_rit.simple_jansenrit.JRC"))
+    if weight is not None:
+        circuit.add_edges_from_matrix(source_var="PRO/m_out", target_var="RPO_e_pc/m_in",
+                                      nodes=[f'jrc_{idx}/PC' for idx in range(n)], weight=weight, delay=delay)
+    return circuit
+
+
+def _interrupt(write_checkpoint: Callable, at: float = 0.) -> Callable:
+    """Wraps the checkpoint writer of a backend, such that the simulation is interrupted (via `KeyboardInterrupt`) by
+    the first checkpoint that is written after the fraction `at` of all integration steps.
+    """
+
+    def write_checkpoint_and_interrupt(fn, func_args, results, step, steps, sampling_idx, fingerprint):
+        write_checkpoint(fn, func_args, results, step, steps, sampling_idx, fingerprint)
+        if step >= at * steps:
+            raise KeyboardInterrupt
+
+    return write_checkpoint_and_interrupt
+
+
+def assert_fused_jit(net) -> None:
+    """Asserts that the fused integration loop of a compiled network was JIT-compiled via numba (if numba is
+    installed) instead of falling back to the pure python loop.
+    """
+    if find_spec('numba') is not None:
+        assert net._backend._rhs_loop[0][0] is not None
+
+
 #########
 # Tests #
 #########
@@ -430,6 +468,7 @@ def test_2_4_vectorization():
         assert np.mean(error1) == pytest.approx(0., rel=1e-6, abs=1e-6)
 
 
+@pytest.mark.filterwarnings('error:.*JIT-compilation of the fused integration loop')
 def test_2_5_solver():
     """Testing different numerical solvers of pyrates.
 
@@ -469,6 +508,72 @@ def test_2_5_solver():
 
     assert np.mean(results.loc[:, 'a2'].values - results2.loc[:, 'a2'].values) == pytest.approx(0., rel=1e-4, abs=1e-4)
 
+    # fused euler solver: updated variables keep their type and are written in place, fancy indices become slices
+    from pyrates.backend.optimization import stabilize_types
+    namespace = {'np': np, 'x': np.zeros((3,), np.float32), 'c': np.asarray(2.0, np.float32), 's': 0.0,
+                 'y_delta': np.zeros((4,), np.float32)}
+    eqs = ["x = np.add(x, 0.5)",
+           "s = np.sum(x)",
+           "y_delta[0] = np.multiply(np.sum(x), c)",
+           "y_delta[[1, 2, 3]] = np.multiply(x, c)"]
+    lines, preamble = stabilize_types(eqs, dict(namespace), ['x', 's'])
+    assert lines == ["x[...] = np.add(x, np.float32(0.5))", "s[...] = np.sum(x)",
+                     "y_delta[0] = np.multiply(np.sum(x), c)", "y_delta[1:4] = np.multiply(x, c)"]
+    ns = _evaluate_equations(preamble + lines, namespace, n_evals=2)
+    ns_ref = _evaluate_equations(eqs, namespace, n_evals=2)
+    assert ns['s'].dtype == np.float32 and ns['s'] == ns_ref['s']
+    assert np.all(ns['y_delta'] == ns_ref['y_delta'])
+
+    # fused euler solver (tested)
+    net_config3 = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(label='net2')
+    net3 = net_config3.compile(vectorization=True, step_size=dt, backend=backend, solver='euler')
+    results3 = net3.run(sim_time,
+                        outputs={'a1': 'p1/op9/a',
+                                 'a2': 'p2/op9/a'},
+                        inputs={'p1/op9/I_ext': inp},
+                        fused=True)
+    assert_fused_jit(net3)
+    net3.clear()
+
+    assert np.mean(results.values - results3.values) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+    # runge-kutta solvers (tested)
+    sim_time2 = 10.
+    sim_steps2 = int(np.round(sim_time2 / dt, decimals=0))
+    for i, solver in enumerate(['heun', 'rk4', 'rk45']):
+        net_config4 = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(
+            label=f'net{i+3}')
+        net4 = net_config4.compile(vectorization=True, step_size=dt, backend=backend, solver=solver)
+        results4 = net4.run(sim_time2,
+                            outputs={'a1': 'p1/op9/a',
+                                     'a2': 'p2/op9/a'},
+                            inputs={'p1/op9/I_ext': inp[:sim_steps2]})
+        net4.clear()
+
+        assert results4.shape[0] == sim_steps2
+        assert np.mean(results4.loc[:, 'a2'].values - results2.loc[:, 'a2'].values[:sim_steps2]) == \
+            pytest.approx(0., rel=1e-3, abs=1e-3)
+
+    # orders of convergence of the fixed step-size solvers, estimated from the final states for two step-sizes
+    def simulate(label, solver, step_size, **kwargs):
+        net = CircuitTemplate.from_yaml("model_templates.jansen_rit.simple_jansenrit.JRC").apply(label=label).compile(
+            backend=backend, solver=solver, step_size=step_size, verbose=False)
+        r = net.run(0.1, outputs={'PSP': 'PC/RPO_e_pc/PSP'}, sampling_step_size=5e-3, verbose=False, **kwargs)
+        y = np.asarray(net._backend.vars['y'], dtype=np.float64)
+        net.clear()
+        return y, r
+
+    y_ref, r_ref = simulate('net_ref', 'rk4', 1e-4)
+    for solver, order in [('euler', 1), ('heun', 2), ('rk4', 4)]:
+        errors = [np.max(np.abs(simulate(f'net_{solver}{j}', solver, step_size)[0] - y_ref))
+                  for j, step_size in enumerate([5e-3, 2.5e-3])]
+        assert order - 0.3 < np.log2(errors[0] / errors[1]) < order + 0.5
+
+    # the adaptive solver samples the state at the same times as the fixed step-size solvers
+    _, r = simulate('net_rk45', 'rk45', 1e-4, rtol=1e-8, atol=1e-10)
+    assert r.shape == r_ref.shape
+    assert np.max(np.abs(r.values - r_ref.values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
 
 def test_2_6_inputs_outputs():
     """Tests the input-output interface of the run method in circuits of different hierarchical depth.
@@ -546,3 +651,975 @@ def test_2_6_inputs_outputs():
     n2.clear()
 
     assert np.mean(r1.values.flatten() - r2.values.flatten()) == pytest.approx(0., rel=1e-4, abs=1e-4)
+
+
+def test_2_7_ensemble():
+    """Tests the ensemble mode of the compile method, where multiple parametrizations of the same network are
+    simulated via a single right-hand side evaluation.
+
+    See Also
+    -------
+    :method:`CircuitIR.compile` detailed documentation of the arguments `n_ensemble` and `ensemble_params`.
+
+    """
+
+    backend = 'numpy'
+    dt = 1e-3
+    sim_time = 10.
+    sim_steps = int(np.round(sim_time / dt, decimals=0))
+    inp = np.zeros((sim_steps, 1)) + 0.5
+    taus = [5.0, 10.0, 20.0]
+
+    # simulate each parametrization separately
+    results = []
+    for i, tau in enumerate(taus):
+        net_config = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(
+            label=f'net{i}', node_values={'p1/op9/tau': tau})
+        net = net_config.compile(vectorization=True, step_size=dt, backend=backend, solver='euler')
+        results.append(net.run(sim_time, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp}))
+        net.clear()
+
+    # simulate all parametrizations as an ensemble
+    net_config = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(label='ens')
+    net = net_config.compile(vectorization=True, step_size=dt, backend=backend, solver='euler',
+                             n_ensemble=len(taus), ensemble_params={'p1/op9/tau': taus})
+    r = net.run(sim_time, outputs={'a': 'all/all/op9/a'}, inputs={'all/p1/op9/I_ext': inp})
+    net.clear()
+
+    assert r.shape[1] == 2 * len(taus)
+    for i, r_tmp in enumerate(results):
+        assert np.mean(r.loc[:, ('a', f'ens_{i}')].values - r_tmp.values) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+    # grid searches in ensemble mode label their results via the index of the parameter grid
+    import pandas as pd
+    from pyrates.utility.grid_search import grid_search
+
+    template = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13")
+    param_grid = pd.DataFrame({'tau': taus}, index=['slow', 'medium', 'fast'])
+    param_map = {'tau': {'vars': ['op9/tau'], 'nodes': ['p1']}}
+    grid_results = []
+    for ensemble in [False, True]:
+        r, grid = grid_search(template, param_grid=param_grid.copy(), param_map=param_map, simulation_time=sim_time,
+                              step_size=dt, inputs={'p1/op9/I_ext': inp}, outputs={'a': 'p1/op9/a'},
+                              init_kwargs={'solver': 'euler', 'step_size': dt, 'verbose': False}, ensemble=ensemble,
+                              verbose=False)
+        assert list(grid.index) == [f'{template.label}_{idx}' for idx in param_grid.index]
+        grid_results.append(r)
+    assert list(grid_results[0].columns) == list(grid_results[1].columns)
+    assert np.mean(np.abs(grid_results[0].values - grid_results[1].values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+    # parameters that cannot be found on any node are not ignored in ensemble mode
+    with pytest.raises(ValueError):
+        grid_search(template, param_grid=param_grid.copy(), param_map={'tau': {'vars': ['op9/tau_x'], 'nodes': ['p1']}},
+                    simulation_time=sim_time, step_size=dt, inputs={'p1/op9/I_ext': inp}, outputs={'a': 'p1/op9/a'},
+                    init_kwargs={'solver': 'euler', 'step_size': dt, 'verbose': False}, ensemble=True, verbose=False)
+
+
+def test_2_8_sparse_edges(monkeypatch):
+    """Tests the realization of vectorized edge projections via sparse edge weight matrices.
+
+    See Also
+    -------
+    :method:`CircuitIR._edge_projection_costs` cost model used to choose between dense, sparse and gather projections.
+
+    """
+
+    from pyrates.ir.circuit import CircuitIR
+
+    dt = 1e-4
+    sim_time = 0.1
+    n = 200
+    c = np.random.RandomState(0).uniform(size=(n, n))
+    c[c > 0.03] = 0.
+
+    # sparse matrices should be preferred for large, sparse projections only
+    costs = CircuitIR._edge_projection_costs(n, n, int(np.sum(c > 0)))
+    assert min(costs, key=costs.get) == 'sparse'
+    costs = CircuitIR._edge_projection_costs(10, 10, 30)
+    assert min(costs, key=costs.get) == 'dense'
+
+    # make dense matrices the cheapest realization, such that they are only excluded via `matrix_sparseness`
+    monkeypatch.setattr(CircuitIR, 'edge_projection_costs', {'dense': (0., 0., 0., 0.), 'sparse': (1., 0., 0., 0.),
+                                                             'gather': (2., 0., 0., 0.)})
+
+    def simulate(label, **kwargs):
+        circuit = _jrc_circuit(label, n, c)
+        net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=dt, **kwargs)
+        r = net.run(sim_time, outputs={'V': 'all/PC/OBS/V'}, sampling_step_size=1e-3)
+        net.clear()
+        return r
+
+    # compare the sparse realization (default `matrix_sparseness`) against dense edge weight matrices
+    r1 = simulate('net0')
+    r2 = simulate('net1', matrix_sparseness=None)
+
+    assert np.mean(np.abs(r1.values - r2.values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+
+def test_2_9_repeated_runs():
+    """Tests that repeated calls of `CircuitIR.run` continue the simulation with new inputs and re-use the compiled
+    right-hand side evaluation, if the structure of the inputs did not change.
+    """
+
+    dt = 1e-3
+    sim_time = 1.
+    sim_steps = int(np.round(sim_time / dt, decimals=0))
+    inputs = [np.random.RandomState(i).uniform(size=(sim_steps, 1)) for i in range(3)]
+
+    # simulate all inputs via a single call of run
+    net = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(label='net0').compile(
+        vectorization=True, step_size=dt, backend='numpy', solver='euler')
+    r0 = net.run(len(inputs) * sim_time, outputs={'a': 'all/op9/a'},
+                 inputs={'p1/op9/I_ext': np.concatenate(inputs, axis=0)})
+    net.clear()
+
+    # simulate each input via a separate call of run
+    net = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(label='net1').compile(
+        vectorization=True, step_size=dt, backend='numpy', solver='euler')
+    results, compiled = [], []
+    for inp in inputs:
+        results.append(net.run(sim_time, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp}))
+        compiled.append(net._backend._compiled[1][0])
+    net.clear()
+
+    assert all([c is compiled[0] for c in compiled])
+    r1 = np.concatenate([r.values for r in results], axis=0)
+    assert np.mean(np.abs(r0.values - r1)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+
+def test_2_10_set_params():
+    """Tests changing the parametrization of a compiled network via `CircuitIR.set_params`.
+    """
+
+    dt = 1e-3
+    sim_time = 10.
+    sim_steps = int(np.round(sim_time / dt, decimals=0))
+    inp = np.zeros((sim_steps, 1)) + 0.5
+
+    # compile network with the target parametrization
+    net_config = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(
+        label='net0', node_values={'p1/op9/tau': 5.0})
+    net = net_config.compile(vectorization=True, step_size=dt, backend='numpy', solver='euler')
+    r0 = net.run(sim_time, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp})
+    net.clear()
+
+    # change the parametrization of a compiled network
+    net_config = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(label='net1')
+    net = net_config.compile(vectorization=True, step_size=dt, backend='numpy', solver='euler')
+    net.set_params({'p1/op9/tau': 5.0})
+    r1 = net.run(sim_time, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp})
+
+    # only constants can be changed
+    with pytest.raises(ValueError):
+        net.set_params({'p1/op9/a': 1.0})
+    net.clear()
+
+    assert np.mean(np.abs(r0.values - r1.values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+    # scalar constants (here: the weight of the single edge from EIN to PC) can be changed as well
+    def simulate(label, weight=None, set_weight=None):
+        from pyrates.ir.circuit import CircuitIR
+        circuit = CircuitIR.from_yaml("model_templates.jansen_rit.simple_jansenrit.JRC")
+        circuit.label = label
+        if weight:
+            for source, target, data in circuit.edges(data=True):
+                if source.startswith('EIN') and target.startswith('PC'):
+                    data['weight'] = weight
+        net_tmp = circuit.compile(vectorization=True, step_size=1e-4, backend='numpy', solver='euler', verbose=False)
+        if set_weight:
+            var_col = net_tmp.get_node_var('PC/edge_from_vector_node1_0/weight', apply_idx=False)
+            assert all([var_info['var'].shape == () for var_info in var_col.values()])
+            net_tmp.set_params({'PC/edge_from_vector_node1_0/weight': set_weight})
+        r = net_tmp.run(0.1, outputs={'PSP': 'PC/RPO_e_pc/PSP'}, sampling_step_size=1e-3, verbose=False)
+        net_tmp.clear()
+        return r.values
+
+    assert np.mean(np.abs(simulate('net2', weight=150.) - simulate('net3', set_weight=150.))) == \
+        pytest.approx(0., rel=1e-6, abs=1e-6)
+
+
+def test_2_11_concurrent_compilation():
+    """Tests that multiple networks with the same label can be compiled and simulated concurrently without overwriting
+    each other's build files or generated functions.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    dt = 1e-3
+    sim_time = 1.
+    sim_steps = int(np.round(sim_time / dt, decimals=0))
+    taus = [1.0, 2.0, 5.0, 10.0]
+
+    def simulate(tau):
+        inp = np.zeros((sim_steps, 1)) + 0.5
+        net = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(
+            label='net0', node_values={'p1/op9/tau': tau}).compile(vectorization=True, step_size=dt, backend='numpy',
+                                                                  solver='euler')
+        build_dir = net._backend._build_dir
+        r = net.run(sim_time, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp})
+        net.clear()
+        return r.values, build_dir
+
+    # simulate the networks one after another
+    results_seq = [simulate(tau) for tau in taus]
+
+    # simulate the networks concurrently
+    with ThreadPoolExecutor(max_workers=len(taus)) as executor:
+        results_par = list(executor.map(simulate, taus))
+
+    assert len(set([build_dir for _, build_dir in results_par])) == len(taus)
+    for (r0, _), (r1, _) in zip(results_seq, results_par):
+        assert np.mean(np.abs(r0 - r1)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+
+def test_2_12_build_cache(tmp_path, monkeypatch):
+    """Tests that identical networks load their generated right-hand side evaluation from the persistent build cache.
+    """
+
+    from pyrates.backend.numpy_backend import get_build_key
+
+    monkeypatch.setenv('PYRATES_CACHE_DIR', str(tmp_path))
+    monkeypatch.delenv('PYRATES_BUILD_CACHE', raising=False)
+
+    dt = 1e-3
+    sim_time = 1.
+    sim_steps = int(np.round(sim_time / dt, decimals=0))
+    inp = np.zeros((sim_steps, 1)) + 0.5
+
+    def simulate(label, tau):
+        net = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(
+            label=label, node_values={'p1/op9/tau': tau}).compile(vectorization=True, step_size=dt, backend='numpy',
+                                                                  solver='euler')
+        r = net.run(sim_time, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp})
+        rhs_file = net._backend._compiled[1][0].__code__.co_filename
+        net.clear()
+        return r.values, rhs_file
+
+    # the build cache is disabled by default
+    simulate('net0', 1.0)
+    assert len(list(tmp_path.iterdir())) == 0
+
+    monkeypatch.setenv('PYRATES_BUILD_CACHE', '1')
+    r0, f0 = simulate('net0', 1.0)
+    r1, f1 = simulate('net1', 1.0)
+    assert f0 == f1
+    assert f0.startswith(str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    assert np.mean(np.abs(r0 - r1)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+    # builds of other numpy versions are not re-used
+    key = get_build_key('source', 'NumpyBackend', 'float32')
+    monkeypatch.setattr(np, '__version__', '0.0.0')
+    assert get_build_key('source', 'NumpyBackend', 'float32') != key
+
+
+def _evaluate_equations(lines: list, namespace: dict, n_evals: int = 1, **kwargs) -> dict:
+    """Evaluates lines of right-hand side code `n_evals` times in a copy of the namespace and returns the namespace.
+    """
+
+    ns = dict([(key, val.copy() if isinstance(val, np.ndarray) else val) for key, val in namespace.items()])
+    ns.update(kwargs)
+    code = compile("\n".join(lines), '<rhs>', 'exec')
+    for _ in range(n_evals):
+        exec(code, ns)
+    return ns
+
+
+def test_2_13_rhs_optimization():
+    """Tests common sub-expression elimination and hoisting of constant expressions in the right-hand side evaluation.
+    """
+
+    from pyrates.ir.circuit import CircuitIR
+    from pyrates.backend.optimization import optimize_equations
+
+    # common sub-expressions are replaced by earlier results, constant expressions are hoisted
+    eqs = ["a = np.add(x, c)",
+           "b = np.multiply(np.add(x, c), np.divide(1.0, c))",
+           "x = np.add(x, 1)",
+           "y_delta[0:2] = np.add(np.add(x, c), np.sin(x))",
+           "y_delta[2:4] = np.sin(x)"]
+    eqs_opt, hoisted, stats = optimize_equations(eqs, constants=['c'])
+    assert hoisted == [('_inv0', 'np.divide(1.0, c)')]
+    assert eqs_opt[1] == "b = np.multiply(a, _inv0)"
+    assert eqs_opt[2] == eqs[2] and eqs_opt[3] == "_cse0 = np.sin(x)" and eqs_opt[-1] == "y_delta[2:4] = _cse0"
+    assert stats['invariant'] == 1 and stats['cse'] == 2
+
+    # the optimized equations evaluate to the same values as the original ones
+    namespace = {'np': np, 'x': np.random.randn(2), 'c': np.random.rand(2) + 1.0, 'y_delta': np.zeros((4,))}
+    ns = _evaluate_equations(eqs_opt, namespace, **dict([(key, eval(val, namespace)) for key, val in hoisted]))
+    ns_ref = _evaluate_equations(eqs, namespace)
+    assert np.allclose(ns['y_delta'], ns_ref['y_delta']) and np.allclose(ns['b'], ns_ref['b'])
+
+    # expressions over variables that are changed are neither hoisted nor re-used after the change
+    eqs = ["a = np.exp(c)",
+           "c = np.add(c, 1.0)",
+           "y_delta[0:2] = np.add(np.exp(c), a)"]
+    eqs_opt, hoisted, stats = optimize_equations(eqs, constants=[])
+    assert eqs_opt == eqs and not hoisted and stats['cse'] == 0
+
+    # all right-hand side optimizations can be passed to the backend via `CircuitIR.compile`
+    c = np.random.RandomState(0).uniform(size=(4, 4))
+
+    def simulate(label, **kwargs):
+        circuit = _jrc_circuit(label, 4, c)
+        net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=1e-4, **kwargs)
+        r = net.run(0.1, outputs={'V': 'all/PC/OBS/V'}, sampling_step_size=1e-3)
+        stats = net._backend._rhs_stats
+        net.clear()
+        return r, stats
+
+    flags = ('optimize_rhs', 'inplace_ops', 'remove_dead_ops', 'pack_constants', 'ring_buffer', 'reuse_compiled')
+    r1, stats1 = simulate('net0', **dict([(key, True) for key in flags]))
+    r2, stats2 = simulate('net1', **dict([(key, False) for key in flags]))
+    assert stats1.get('dead', 0) > 0 and stats1.get('inplace', 0) > 0
+    assert stats2.get('dead', 0) == 0 and stats2.get('inplace', 0) == 0 and stats2.get('packed', 0) == 0
+    assert np.mean(np.abs(r1.values - r2.values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+    # optimizations that a backend does not support cannot be enabled
+    with pytest.raises(ValueError):
+        CircuitIR.from_yaml("model_templates.jansen_rit.simple_jansenrit.JRC").compile(
+            backend='fortran', solver='euler', step_size=1e-4, ring_buffer=True, verbose=False)
+
+
+def test_2_14_inplace_ops():
+    """Tests that numpy operations of the right-hand side evaluation write their results into pre-allocated buffers.
+    """
+
+    from pyrates.backend.optimization import allocate_buffers
+
+    # intermediate results and results assigned to variables are written into buffers, results assigned to slices of
+    # the state derivative vector are written into that slice directly
+    namespace = {'np': np, 'x': np.random.randn(3), 'c': np.random.randn(3), 'y_delta': np.zeros((6,))}
+    eqs = ["a = np.add(np.multiply(x, c), 1.0)",
+           "b = np.multiply(x, 2.0)",
+           "y_delta[0:3] = np.add(a, b)",
+           "y_delta[3:6] = np.sin(a)"]
+    eqs_new, buffers = allocate_buffers(eqs, namespace, persistent=['a'])
+    assert [name for name, _ in buffers] == ['_buf0', '_buf1']
+    assert eqs_new[0] == "a = np.add(np.multiply(x, c, _buf0), 1.0)"
+    assert eqs_new[1] == "b = np.multiply(x, 2.0, _buf1)"
+    assert eqs_new[2] == "np.add(a, b, y_delta[0:3])"
+    assert all(buf.shape == (3,) for _, buf in buffers)
+
+    # the rewritten equations evaluate to the same values as the original ones, also if they are evaluated repeatedly
+    ns_ref = _evaluate_equations(eqs, namespace)
+    ns = _evaluate_equations(eqs_new, namespace, n_evals=2, **dict(buffers))
+    assert np.allclose(ns['y_delta'], ns_ref['y_delta'])
+
+    # persistent variables are not aliased with the buffers, such that they keep their values between evaluations
+    assert not any(np.shares_memory(ns['a'], buf) for _, buf in buffers)
+
+
+def test_2_15_dead_code_elimination():
+    """Tests the removal of operations that do not affect the state variables from the right-hand side evaluation.
+    """
+
+    from pyrates.backend.optimization import find_live_equations
+
+    # variables can be read before they are updated, which makes their updates live
+    eqs = ["a = np.add(x, 1.0)",
+           "obs = np.multiply(a, 2.0)",
+           "y_delta[0:2] = np.subtract(a, b)",
+           "b = np.sin(c)",
+           "c = np.cos(d)",
+           "e = pr_identity(obs)"]
+    assert find_live_equations(eqs, ['y_delta']) == [True, False, True, True, True, False]
+
+    # all equations that (indirectly) write into a live output are live
+    assert find_live_equations(eqs, ['y_delta', 'e']) == [True] * len(eqs)
+    assert find_live_equations(eqs, ['obs']) == [True, True, False, False, False, False]
+    assert find_live_equations(eqs, []) == [False] * len(eqs)
+
+    # removing dead equations does not change the live outputs
+    namespace = {'np': np, 'pr_identity': lambda v: v, 'x': np.random.randn(2), 'b': np.zeros((2,)),
+                 'c': np.zeros((2,)), 'd': np.random.randn(2), 'y_delta': np.zeros((2,))}
+    live = find_live_equations(eqs, ['y_delta'])
+    ns_ref = _evaluate_equations(eqs, namespace)
+    ns = _evaluate_equations([eq for eq, is_live in zip(eqs, live) if is_live], namespace)
+    assert np.all(ns['y_delta'] == ns_ref['y_delta'])
+
+
+@pytest.mark.filterwarnings('error:.*JIT-compilation of the fused integration loop')
+def test_2_16_contiguous_outputs():
+    """Tests the sampling of output variables via contiguous ranges of the state vector.
+    """
+
+    from pyrates.backend.numpy_backend import NumpyBackend
+
+    # contiguous output indices are collapsed into (start, stop) ranges
+    assert NumpyBackend._collapse_index([3, 4, 5]) == (3, 6)
+    assert NumpyBackend._collapse_index([3]) == (3, 4)
+    assert NumpyBackend._collapse_index([3, 5, 6]) == [3, 5, 6]
+
+    # state variables are extracted from the state vector via basic slicing
+    circuit = _jrc_circuit('net0', 3)
+    net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=1e-4)
+    psp = net.get_node_var('all/PC/RPO_e_pc/PSP', apply_idx=False)
+    for vnode in psp.values():
+        assert all(np.diff(vnode['idx']) == 1)
+    net.clear()
+
+    # all nodes and a single node sampled via each solver
+    results = []
+    for i, (solver, fused) in enumerate([('euler', False), ('euler', True), ('scipy', False), ('rk45', False)]):
+        circuit = _jrc_circuit(f'net{i+1}', 3)
+        net = circuit.compile(vectorization=True, backend='numpy', solver=solver, step_size=1e-4)
+        r = net.run(0.1, outputs={'PSP': 'all/PC/RPO_e_pc/PSP', 'PSP1': 'jrc_1/PC/RPO_e_pc/PSP'},
+                    sampling_step_size=1e-3, fused=fused)
+        if fused:
+            assert_fused_jit(net)
+        net.clear()
+        assert r.shape == (100, 4)
+        assert np.mean(np.abs(r['PSP'].values[:, 1] - r['PSP1'].values[:, 0])) == pytest.approx(0., rel=1e-8, abs=1e-8)
+        results.append(r)
+
+    assert np.mean(np.abs(results[0].values - results[1].values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+
+@pytest.mark.filterwarnings('error:.*JIT-compilation of the fused integration loop')
+def test_2_17_packed_constants():
+    """Tests packing the constants of the right-hand side evaluation into contiguous memory blocks.
+    """
+
+    from pyrates.backend.optimization import find_constants, pack_arrays
+
+    # constants are variables that are neither changed directly nor via variables that refer to the same memory
+    eqs = ["a = np.add(x, c)",
+           "b = d",
+           "b[0] = 1.0",
+           "y_delta[0:2] = np.multiply(a, e)"]
+    assert find_constants(eqs, ['a', 'c', 'd', 'e', 'y_delta']) == ['c', 'e']
+    assert find_constants(eqs + ["e += 1.0"], ['c', 'e']) == ['c']
+
+    # arrays are packed into one aligned memory block per data type
+    arrays = [np.random.randn(3), np.ones((2, 2), dtype=np.int32), np.random.randn(2, 5), np.asarray(2.0)]
+    arenas, layout = pack_arrays(arrays)
+    assert len(arenas) == 2
+    for arr, (i, start, stop) in zip(arrays, layout):
+        view = arenas[i][start:stop].reshape(arr.shape)
+        assert np.all(view == arr)
+        assert view.dtype == arr.dtype
+        assert view.ctypes.data % 64 == 0
+
+    # views into the memory blocks do not overlap
+    for (i1, start1, stop1), (i2, start2, stop2) in zip(layout[:-1], layout[1:]):
+        assert i1 != i2 or stop1 <= start2 or stop2 <= start1
+
+    # equations evaluate to the same values if their constants are replaced by views into the memory blocks
+    namespace = {'np': np, 'x': np.random.randn(2), 'c': np.random.randn(2), 'e': np.random.randn(2),
+                 'd': np.zeros((2,)), 'y_delta': np.zeros((2,))}
+    arenas, ((i_c, start_c, stop_c), (i_e, start_e, stop_e)) = pack_arrays([namespace['c'], namespace['e']])
+    ns_ref = _evaluate_equations(eqs, namespace)
+    ns = _evaluate_equations(eqs, namespace, c=arenas[i_c][start_c:stop_c], e=arenas[i_e][start_e:stop_e])
+    assert np.all(ns['y_delta'] == ns_ref['y_delta'])
+
+    # simulations with and without packed constants (packing is disabled by default)
+    results = []
+    for i, (pack_constants, fused) in enumerate([(False, False), (True, False), (True, True)]):
+        circuit = _jrc_circuit(f'net{i}', 3)
+        net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=1e-4,
+                              pack_constants=pack_constants)
+        results.append(net.run(0.1, outputs={'V': 'all/PC/OBS/V'}, sampling_step_size=1e-3, fused=fused))
+        assert bool(net._backend._arenas) == pack_constants
+        if fused:
+            assert_fused_jit(net)
+        net.clear()
+    assert np.all(results[0].values == results[1].values)
+    assert np.mean(np.abs(results[0].values - results[2].values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+
+
+def test_2_18_multithreaded_rhs():
+    """Tests the evaluation of element-wise operations of the right-hand side in chunks by multiple threads.
+    """
+
+    import gc
+    from concurrent.futures import ThreadPoolExecutor
+    from pyrates.backend.numpy_backend import NumpyBackend
+    from pyrates.backend.optimization import parallelize_equations
+
+    # element-wise operations with output arguments are split into chunks, coupling operations are not
+    n = 10
+    namespace = {'np': np, 'a': np.random.randn(n), 'c': np.asarray(2.0), 'w': np.random.randn(3, n),
+                 'y_delta': np.zeros((2*n,)), '_buf0': np.zeros((n,)), '_buf1': np.zeros((n,)),
+                 '_buf2': np.zeros((3,))}
+    eqs = ["x = np.add(a, c, _buf0)",
+           "np.multiply(np.sin(x, _buf1), a, y_delta[0:10])",
+           "z = np.dot(w, x, _buf2)",
+           "np.subtract(y_delta[0:10], 1.0, y_delta[10:20])"]
+
+    lines, funcs, n_parallel = parallelize_equations(eqs, dict(namespace), 3, 5)
+    assert n_parallel == 3
+    assert "z = np.dot(w, x, _buf2)" in lines
+    assert all([line.startswith(('def _chunk', '\t')) for line in funcs])
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        ns = _evaluate_equations(funcs, namespace, _pmap=pool.map)
+        ns = _evaluate_equations(lines, ns, n_evals=2)
+    ns_ref = _evaluate_equations(eqs, namespace)
+    assert np.all(ns['y_delta'] == ns_ref['y_delta']) and np.all(ns['z'] == ns_ref['z'])
+
+    # the chunk functions are defined once, outside of the evaluated equations
+    assert not any([line.startswith('def ') for line in lines])
+
+    # operations whose first dimension is smaller than the minimum chunk size are not split
+    assert parallelize_equations(eqs, dict(namespace), 3, 20)[2] == 0
+
+    # simulations with a single and with multiple threads
+    results = []
+    for n_threads in [1, 3]:
+        circuit = _jrc_circuit(f'net{n_threads}', 5)
+        net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=1e-4, inplace_ops=True)
+        net._backend.parallel_min_size = 2
+        r1 = net.run(0.05, outputs={'PSP': 'all/PC/RPO_e_pc/PSP'}, sampling_step_size=1e-3, n_threads=n_threads)
+        r2 = net.run(0.05, outputs={'PSP': 'all/PC/RPO_e_pc/PSP'}, sampling_step_size=1e-3, n_threads=n_threads)
+        n_parallel = net._backend._rhs_stats.get('parallel', 0)
+        if n_threads > 1:
+            assert 'def _chunk0(_lo, _hi, _args):' in net._backend._rhs_source.split('def rhs_eval')[0]
+            pool = net._backend._pool
+        net.clear()
+        results.append(np.concatenate([r1.values, r2.values]))
+        assert (n_parallel > 0) == (n_threads > 1)
+
+    assert np.mean(np.abs(results[0] - results[1])) == pytest.approx(0., rel=1e-8, abs=1e-8)
+
+    # multiple threads require operations that write into pre-allocated buffers
+    circuit = _jrc_circuit('net4', 5)
+    net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=1e-4, inplace_ops=False)
+    with pytest.warns(UserWarning, match='Argument `n_threads` is ignored'):
+        net.run(0.01, outputs={'PSP': 'all/PC/RPO_e_pc/PSP'}, sampling_step_size=1e-3, n_threads=3)
+    assert net._backend._pool is None
+    net.clear()
+
+    # the thread pool is shut down when the backend is cleared or garbage collected
+    assert pool._shutdown
+    backend = NumpyBackend()
+    backend._start_pool(2)
+    pool = backend._pool
+    del backend
+    gc.collect()
+    assert pool._shutdown
+
+
+def test_2_19_partitioned_simulation(monkeypatch):
+    """Tests the simulation of networks that are distributed over multiple processes.
+
+    See Also
+    -------
+    :func:`partition_nodes`: partitioning of the network nodes.
+
+    """
+
+    from pyrates.ir.circuit import partition_nodes
+
+    # partitions are balanced and cut few edges
+    nodes = [f'n{i}' for i in range(12)]
+    edges = [(nodes[i], nodes[j]) for i in range(12) for j in range(12) if i != j and i // 4 == j // 4]
+    parts = partition_nodes(nodes[::2] + nodes[1::2], edges, 3)
+    assert sorted([len(p) for p in parts]) == [4, 4, 4]
+    assert all([len({int(n[1:]) // 4 for n in p}) == 1 for p in parts])
+
+    # simulations with a single and with multiple processes
+    dt = 1e-4
+    n = 6
+    c = np.random.RandomState(0).uniform(size=(n, n))
+    c[c > 0.5] = 0.
+    inp = np.random.RandomState(1).uniform(100., 300., size=(1000, n))
+
+    def create_circuit(label):
+        return _jrc_circuit(label, n, c, delay=c*0.01)
+
+    # consecutive runs continue from the final state (including the delay buffers) of the previous run
+    results = []
+    for n_partitions in [1, 3]:
+        net = create_circuit(f'net{n_partitions}').compile(vectorization=True, backend='numpy', solver='euler',
+                                                           step_size=dt, n_partitions=n_partitions)
+        r1 = net.run(0.05, outputs={'V': 'all/PC/OBS/V', 'PSP': 'all/EIN/RPO_e/PSP'},
+                     inputs={'all/PC/RPO_e_pc/u': inp[:500]}, sampling_step_size=1e-3)
+        r2 = net.run(0.05, outputs={'V': 'all/PC/OBS/V', 'PSP': 'all/EIN/RPO_e/PSP'},
+                     inputs={'all/PC/RPO_e_pc/u': inp[500:]}, sampling_step_size=1e-3)
+        net.clear()
+        results.append((r1, r2))
+
+    net = create_circuit('net_ref').compile(vectorization=True, backend='numpy', solver='euler', step_size=dt)
+    r = net.run(0.1, outputs={'V': 'all/PC/OBS/V', 'PSP': 'all/EIN/RPO_e/PSP'}, inputs={'all/PC/RPO_e_pc/u': inp},
+                sampling_step_size=1e-3)
+    net.clear()
+
+    for r1, r2 in results:
+        assert r1.shape == r2.shape == (50, r.shape[1])
+        r_tmp = np.concatenate([r1[r.columns].values, r2[r.columns].values])
+        assert np.mean(np.abs(r.values - r_tmp)) == pytest.approx(0., rel=1e-8, abs=1e-8)
+
+    # networks can only be partitioned on platforms that support forking processes
+    import multiprocessing
+    from pyrates import PyRatesException
+    monkeypatch.setattr(multiprocessing, 'get_all_start_methods', lambda: ['spawn'])
+    with pytest.raises(PyRatesException):
+        create_circuit('net_spawn').compile(vectorization=True, backend='numpy', solver='euler', step_size=dt,
+                                            n_partitions=2, verbose=False)
+
+
+def test_2_20_run_iter():
+    """Tests the simulation of a network in consecutive time blocks via `CircuitIR.run_iter`.
+    """
+
+    from pandas import concat
+
+    dt = 1e-3
+    sim_time = 3.
+    sim_steps = int(np.round(sim_time / dt, decimals=0))
+    inp = np.random.RandomState(0).uniform(size=(sim_steps, 1))
+
+    # simulate via a single call of run
+    net = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(label='net0').compile(
+        vectorization=True, step_size=dt, backend='numpy', solver='euler')
+    r0 = net.run(sim_time, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp}, sampling_step_size=1e-2)
+    net.clear()
+
+    # simulate in blocks
+    net = CircuitTemplate.from_yaml("model_templates.test_resources.test_backend.net13").apply(label='net1').compile(
+        vectorization=True, step_size=dt, backend='numpy', solver='euler')
+    blocks = list(net.run_iter(sim_time, block_time=0.7, outputs={'a': 'all/op9/a'}, inputs={'p1/op9/I_ext': inp},
+                               sampling_step_size=1e-2))
+    compiled = net._backend._compiled[1][0]
+    times, outputs = next(net.run_iter(0.5, block_time=0.5, outputs={'a': 'all/op9/a'},
+                                       inputs={'p1/op9/I_ext': inp[:500]}, sampling_step_size=1e-2, as_frame=False))
+    assert net._backend._compiled[1][0] is compiled
+    net.clear()
+
+    assert len(blocks) == 5
+    assert all([len(b) == 70 for b in blocks[:-1]])
+    r1 = concat(blocks)
+    assert np.allclose(r1.index.values, r0.index.values)
+    assert np.mean(np.abs(r0.values - r1.values)) == pytest.approx(0., rel=1e-6, abs=1e-6)
+    assert len(times) == 50 and list(outputs) == list(r0.columns)
+
+
+def test_2_21_output_file(tmp_path):
+    """Tests writing the outputs of a simulation into a memory-mapped output file.
+    """
+
+    results = []
+    for i, (out_file, solver) in enumerate([(None, 'euler'), ('out0.npy', 'euler'), ('out1.npy', 'heun')]):
+        circuit = _jrc_circuit(f'net{i}', 4)
+        net = circuit.compile(vectorization=True, backend='numpy', solver=solver, step_size=1e-4)
+        r = net.run(0.1, outputs={'V': 'all/PC/OBS/V', 'PSP': 'all/EIN/RPO_e/PSP'}, sampling_step_size=1e-3,
+                    out_file=str(tmp_path / out_file) if out_file else None)
+        net.clear()
+        results.append(r)
+
+    # the returned data frames are read-only views on the output files
+    for out_file, r in zip(['out0.npy', 'out1.npy'], results[1:]):
+        assert r.shape == (100, 8)
+        assert not r.values.flags['WRITEABLE']
+        assert np.all(np.load(str(tmp_path / out_file)) == r.values)
+
+    assert list(results[1].columns) == list(results[0].columns)
+    assert np.mean(np.abs(results[0].values - results[1].values)) == pytest.approx(0., rel=1e-8, abs=1e-8)
+    assert np.mean(np.abs(results[0].values - results[2].values)) == pytest.approx(0., rel=1e-4, abs=1e-4)
+
+
+def test_2_22_checkpoints(tmp_path):
+    """Tests writing checkpoints of a simulation and resuming an interrupted simulation from them.
+    """
+
+    dt = 1e-4
+    n = 4
+    c = np.random.RandomState(0).uniform(size=(n, n))
+    c[c > 0.5] = 0.
+    inp = np.random.RandomState(1).uniform(100., 300., size=(500, n))
+    outputs = {'V': 'all/PC/OBS/V', 'PSP': 'all/EIN/RPO_e/PSP'}
+
+    def create_net(label):
+        circuit = _jrc_circuit(label, n, c, delay=c*0.01)
+        return circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=dt)
+
+    # uninterrupted simulation
+    net = create_net('net0')
+    r0 = net.run(0.05, outputs=outputs, inputs={'all/PC/RPO_e_pc/u': inp}, sampling_step_size=1e-3)
+    net.clear()
+
+    for i, out_file in enumerate([None, str(tmp_path / 'out.npy')]):
+
+        # simulation that is interrupted after the second checkpoint
+        checkpoint = str(tmp_path / f'checkpoint{i}.npz')
+        net = create_net(f'net{i}_1')
+        net._backend._write_checkpoint = _interrupt(net._backend._write_checkpoint, at=0.5)
+        with pytest.raises(KeyboardInterrupt):
+            net.run(0.05, outputs=outputs, inputs={'all/PC/RPO_e_pc/u': inp}, sampling_step_size=1e-3,
+                    checkpoint_file=checkpoint, checkpoint_interval=0.0125, out_file=out_file)
+        net.clear()
+        with np.load(checkpoint) as f:
+            assert int(f['step']) == 250 and int(f['sampling_idx']) == 25
+            assert ('results' in f.files) == (out_file is None)
+
+        # resumed simulation
+        net = create_net(f'net{i}_2')
+        r1 = net.run(0.05, outputs=outputs, inputs={'all/PC/RPO_e_pc/u': inp}, sampling_step_size=1e-3,
+                     resume_from=checkpoint, out_file=out_file)
+        net.clear()
+
+        assert list(r1.columns) == list(r0.columns)
+        assert np.all(r1.values == r0.values)
+
+    # checkpoints cannot be resumed by a different network or with a different integration step size
+    net = create_net('net3')
+    net._backend._write_checkpoint = _interrupt(net._backend._write_checkpoint, at=0.5)
+    with pytest.raises(KeyboardInterrupt):
+        net.run(0.05, outputs=outputs, sampling_step_size=1e-3, checkpoint_file=checkpoint, checkpoint_interval=0.0125)
+    net.clear()
+    circuit = _jrc_circuit('net4', n)
+    net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=dt)
+    with pytest.raises(ValueError, match='different network'):
+        net.run(0.05, outputs=outputs, sampling_step_size=1e-3, resume_from=checkpoint)
+    net.clear()
+    net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=dt/2)
+    with pytest.raises(ValueError, match='different network'):
+        net.run(0.025, outputs=outputs, sampling_step_size=1e-3, resume_from=checkpoint)
+    net.clear()
+
+
+def test_2_23_save_compiled(tmp_path):
+    """Tests saving compiled networks and simulating them after loading them again.
+    """
+
+    from pyrates.ir.circuit import CircuitIR
+
+    dt = 1e-4
+    n = 4
+    c = np.random.RandomState(0).uniform(size=(n, n))
+    c[c > 0.5] = 0.
+    inp = np.random.RandomState(1).uniform(100., 300., size=(500, n))
+    outputs = {'V': 'all/PC/OBS/V', 'PSP': 'all/EIN/RPO_e/PSP'}
+
+    results = []
+    for i in range(2):
+        circuit = _jrc_circuit(f'net{i}', n, c, delay=c*0.01)
+        net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=dt)
+
+        # save the compiled network and simulate the loaded network instead
+        if i == 1:
+            net.save_compiled(str(tmp_path / 'net'), outputs=outputs, inputs={'all/PC/RPO_e_pc/u': inp})
+            net.clear()
+            net = CircuitIR.load_compiled(str(tmp_path / 'net'))
+            assert len(net.nodes) == 0
+
+        results.append(net.run(0.05, outputs=outputs, inputs={'all/PC/RPO_e_pc/u': inp}, sampling_step_size=1e-3))
+
+        # loaded networks can only be simulated with the saved input and output variables
+        if i == 1:
+            with pytest.raises(ValueError):
+                net.run(0.05, outputs={'V': 'all/PC/OBS/V'}, sampling_step_size=1e-3)
+            with pytest.raises(ValueError):
+                net.run(0.05, outputs={'m': 'all/PC/PRO/m_out'}, inputs={'all/PC/RPO_e_pc/u': inp},
+                        sampling_step_size=1e-3)
+        net.clear()
+
+    assert list(results[1].columns) == list(results[0].columns)
+    assert np.all(results[1].values == results[0].values)
+
+
+def test_2_24_euler_maruyama():
+    """Tests the simulation of networks with additive noise via the euler-maruyama solver.
+    """
+
+    from pyrates.backend.numpy_backend import NumpyBackend
+
+    dt = 1e-4
+    outputs = {'V': 'all/PC/OBS/V'}
+    noise = {'all/PC/RPO_e_pc/PSP': [0., 10., 20., 30.]}
+
+    def simulate(label, solver, **kwargs):
+        circuit = _jrc_circuit(label, 4)
+        net = circuit.compile(vectorization=True, backend='numpy', solver=solver, step_size=dt)
+        r = net.run(0.1, outputs=outputs, sampling_step_size=1e-3, **kwargs)
+        net.clear()
+        return r
+
+    # without noise, the euler-maruyama solver equals the euler solver
+    r0 = simulate('net0', 'euler')
+    r1 = simulate('net1', 'euler_maruyama')
+    assert np.all(r0.values == r1.values)
+
+    # noise is only added to variables with a positive noise intensity and does not depend on the noise block size
+    r2 = simulate('net2', 'euler_maruyama', noise=noise, seed=1)
+    block_size = NumpyBackend.noise_block_size
+    NumpyBackend.noise_block_size = 3
+    try:
+        r3 = simulate('net3', 'euler_maruyama', noise=noise, seed=1)
+    finally:
+        NumpyBackend.noise_block_size = block_size
+    r4 = simulate('net4', 'euler_maruyama', noise=noise, seed=2)
+    assert np.all(r2.values == r3.values)
+    assert np.all(r2.values[:, 0] == r0.values[:, 0])
+    assert np.all(r2.values[:, 1:] != r0.values[:, 1:])
+    assert np.any(r2.values != r4.values)
+
+    # noise can only be added by the euler-maruyama solver
+    with pytest.raises(ValueError):
+        simulate('net5', 'euler', noise=noise)
+
+    # noise can only be added to state variables, not to constants or inputs
+    for i, key in enumerate(['all/PC/RPO_i/h', 'all/PC/RPO_e_pc/u']):
+        with pytest.raises(ValueError):
+            simulate(f'net{6+i}', 'euler_maruyama', noise={key: 1.})
+
+
+@pytest.mark.filterwarnings('error:.*JIT-compilation of the fused integration loop')
+def test_2_25_input_streams(tmp_path):
+    """Tests inputs that are provided by callables, iterators and broadcasted arrays and read block-wise during the
+    simulation.
+    """
+
+    from pyrates.backend.numpy_backend import NumpyBackend
+    from pandas import concat
+
+    dt = 1e-4
+    steps = 500
+    inp = np.random.RandomState(0).uniform(100., 300., size=(steps, 1))
+    outputs = {'V': 'all/PC/OBS/V'}
+
+    def create_net(label):
+        circuit = _jrc_circuit(label, 4)
+        return circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=dt)
+
+    def simulate(label, u, **kwargs):
+        net = create_net(label)
+        r = net.run(steps * dt, outputs=outputs, inputs={'all/PC/RPO_e_pc/u': u}, sampling_step_size=1e-3, **kwargs)
+        if kwargs.get('fused'):
+            assert_fused_jit(net)
+        net.clear()
+        return r
+
+    def blocks():
+        start = 0
+        while start < steps:
+            stop = min(start + 7 + start % 13, steps)
+            yield inp[start:stop]
+            start = stop
+
+    block_size = NumpyBackend.input_block_size
+    NumpyBackend.input_block_size = 25
+    try:
+
+        # single input columns, callables and iterators yield the same results as materialized input arrays
+        for i, fused in enumerate([False, True]):
+            r0 = simulate(f'net{i}_0', np.tile(inp, (1, 4)), fused=fused)
+            r1 = simulate(f'net{i}_1', inp[:, 0], fused=fused)
+            r2 = simulate(f'net{i}_2', lambda start, stop: inp[start:stop], fused=fused)
+            r3 = simulate(f'net{i}_3', blocks(), fused=fused)
+            assert np.all(r0.values == r1.values)
+            assert np.all(r0.values == r2.values)
+            assert np.all(r0.values == r3.values)
+
+        # array inputs are read block-wise as well, if they are combined with input streams
+        def simulate_mixed(label, u):
+            circuit = _jrc_circuit(label, 2)
+            net = circuit.compile(vectorization=False, backend='numpy', solver='euler', step_size=dt)
+            r = net.run(steps * dt, outputs={'V0': 'jrc_0/PC/OBS/V', 'V1': 'jrc_1/PC/OBS/V'},
+                        inputs={'jrc_0/PC/RPO_e_pc/u': inp, 'jrc_1/PC/RPO_e_pc/u': u}, sampling_step_size=1e-3)
+            net.clear()
+            return r
+
+        r6 = simulate_mixed('net5_0', inp[::-1])
+        r7 = simulate_mixed('net5_1', lambda start, stop: inp[::-1][start:stop])
+        assert np.all(r6.values == r7.values)
+
+        # input streams are continued from checkpoints within an input block
+        checkpoint = str(tmp_path / 'checkpoint.npz')
+        net = create_net('net2_0')
+        net._backend._write_checkpoint = _interrupt(net._backend._write_checkpoint)
+        with pytest.raises(KeyboardInterrupt):
+            net.run(steps * dt, outputs=outputs, inputs={'all/PC/RPO_e_pc/u': blocks()}, sampling_step_size=1e-3,
+                    checkpoint_file=checkpoint, checkpoint_interval=0.01)
+        net.clear()
+        r4 = simulate('net2_1', blocks(), resume_from=checkpoint)
+        assert np.all(r0.values == r4.values)
+
+        # iterators are read across the blocks of `run_iter`
+        net = create_net('net3_0')
+        r5 = concat(list(net.run_iter(steps * dt, 0.013, inputs={'all/PC/RPO_e_pc/u': blocks()}, outputs=outputs,
+                                      sampling_step_size=1e-3, verbose=False)))
+        net.clear()
+        assert np.all(r0.values == r5.values)
+
+    finally:
+        NumpyBackend.input_block_size = block_size
+
+    # iterators that provide too few time steps are rejected
+    with pytest.raises(ValueError):
+        simulate('net4_0', iter([inp[:100]]))
+
+
+def test_2_26_ring_buffer_delays():
+    """Tests the realization of discretized edge delays via ring buffers against the buffers that are shifted each
+    step.
+    """
+
+    dt = 1e-4
+    n = 4
+    c = np.random.RandomState(0).uniform(size=(n, n))
+    c[c > 0.5] = 0.
+    d = np.random.RandomState(1).uniform(0.001, 0.01, size=(n, n)) * (c > 0.)
+    inp = np.random.RandomState(2).uniform(100., 300., size=(500, n))
+
+    for vectorization in [True, False]:
+        results = []
+        for ring_buffer in [True, False]:
+            circuit = _jrc_circuit(f'net_{vectorization}_{ring_buffer}', n, c, delay=d)
+            net = circuit.compile(vectorization=vectorization, backend='numpy', solver='euler', step_size=dt,
+                                  ring_buffer=ring_buffer)
+            r1 = net.run(0.025, outputs={'V': 'all/PC/OBS/V'}, inputs={'all/PC/RPO_e_pc/u': inp[:250]},
+                         sampling_step_size=1e-3)
+            r2 = net.run(0.025, outputs={'V': 'all/PC/OBS/V'}, inputs={'all/PC/RPO_e_pc/u': inp[250:]},
+                         sampling_step_size=1e-3)
+            source = net._backend._rhs_source
+            net.clear()
+
+            # ring buffers move a write head instead of shifting the buffer
+            assert ('_head' in source) == ring_buffer and ('roll(' in source) != ring_buffer
+            results.append(np.concatenate([r1.values, r2.values]))
+
+        assert np.all(results[0] == results[1])
+
+
+def test_2_27_segment_sum(monkeypatch):
+    """Tests the summation of edge projections over their targets via segment sums against the product with a dense
+    one-hot target matrix.
+    """
+
+    from pyrates.ir.circuit import CircuitIR
+    from pyrates.backend.funcs import pr_segment_sum
+
+    # segment sums equal the product with a one-hot matrix, also for segments without any entries
+    rng = np.random.RandomState(0)
+    for n_segments, n_entries in [(8, 20), (8, 3), (3, 0)]:
+        x = rng.randn(n_entries).astype(np.float32)
+        segment_ids = rng.randint(0, n_segments // 2, size=n_entries) * 2
+        one_hot = np.zeros((n_segments, n_entries), dtype=np.float32)
+        one_hot[segment_ids, np.arange(n_entries)] = 1.
+        result = pr_segment_sum(x, segment_ids, n_segments)
+        assert result.shape == (n_segments,) and result.dtype == x.dtype
+        assert np.all(result[1::2] == 0.)
+        assert np.allclose(result, one_hot @ x, rtol=1e-6, atol=1e-6)
+
+    # make gather projections the cheapest realization of the edges
+    monkeypatch.setattr(CircuitIR, 'edge_projection_costs', {'dense': (2., 0., 0., 0.), 'sparse': (1., 0., 0., 0.),
+                                                             'gather': (0., 0., 0., 0.)})
+
+    # simulations with segment sums and with one-hot target matrices (some nodes do not receive any edges)
+    dt = 1e-4
+    n = 6
+    c = np.random.RandomState(1).uniform(size=(n, n))
+    c[c > 0.5] = 0.
+    c[[0, 3], :] = 0.
+    results, sources = [], []
+    for i, ops in enumerate([None, {'segment_sum': {'name': "pyrates_segment_sum", 'call': ""}}]):
+        circuit = _jrc_circuit(f'net{i}', n, c)
+        kwargs = {'ops': ops} if ops else {}
+        net = circuit.compile(vectorization=True, backend='numpy', solver='euler', step_size=dt, **kwargs)
+        results.append(net.run(0.05, outputs={'V': 'all/PC/OBS/V'}, sampling_step_size=1e-3).values)
+        sources.append(net._backend._rhs_source)
+        net.clear()
+
+    assert 'pr_segment_sum' in sources[0] and 'pr_segment_sum' not in sources[1]
+    assert np.mean(np.abs(results[0] - results[1])) == pytest.approx(0., rel=1e-6, abs=1e-6)